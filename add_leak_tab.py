@@ -16,17 +16,24 @@ from pathlib import Path
 
 # Add project dir to path for local imports
 sys.path.insert(0, str(Path(__file__).parent))
+import leak_pipeline
 from leak_tab_html import build_leak_html
 from leak_tab_js import build_leak_js
-from store_assets import store_assets_json
+from store_assets import store_assets_blocks
+from org_tree import inject_org_tree
+from payload import dumps, dumps_map, dumps_rows, dumps_series, store_key, write_jsonl
+from shared_js import inject_shared_js
 
 DASHBOARD = Path(__file__).parent / 'index.html'
 BQ = Path.home() / 'bigquery_results'
 
+# Fallbacks until leak_pipeline.py has pulled its partitions and store dimension
 STORE_FILE = BQ / 'leak-store-corrected.csv'
 CUMUL_FILE = BQ / 'leak-monthly-cumulative-corrected.csv'
 
 THRESHOLD = 9
+# LK_MONTHLY rows [year, month, lbs], packed per store (SeriesTable on the page)
+MONTHLY_COLUMNS = [('y', 'i16'), ('m', 'u8'), ('q', 'f32')]
 # Walmart brand colors
 WM_BLUE = '#0053e2'     # blue.100
 WM_SPARK = '#ffc220'    # spark.100
@@ -127,12 +134,42 @@ def calc_burn_rate(cy_tq, fleet_charge):
     }
 
 
+def burn_projections(stores, burn):
+    """Per-store burn projections, using the day count from calc_burn_rate.
+
+    Each store gets bpt (projected EOY lbs), bpr (projected EOY rate %)
+    and bcx (day of year it crosses THRESHOLD, -1 if it doesn't). The
+    projection is linear in CY lbs, so any group's projected lbs is the
+    sum of its own stores' bpt; the page and the PDF matrix sum bpt / sc
+    over exactly the stores they show.
+    """
+    elapsed, factor = burn['days_elapsed'], burn['days_in_year'] / burn['days_elapsed']
+    for d in stores:
+        daily = d['cytq'] / elapsed
+        thresh = d['sc'] * THRESHOLD / 100
+        cross = elapsed + (thresh - d['cytq']) / daily if daily > 0 and d['cytq'] < thresh else -1
+        d['bpt'] = round(d['cytq'] * factor, 1)
+        d['bpr'] = round(d['cytq'] * factor / d['sc'] * 100, 2) if d['sc'] else 0
+        d['bcx'] = round(cross)
+
+
 def main():
     print('\U0001f9ca Loading Leak Management data (v5 — Burn Rate)...')
-    stores = compress_stores(load_csv(STORE_FILE))
-    cumul = build_cumul_data(load_csv(CUMUL_FILE))
-    leak_wos = load_leak_wos(BQ / 'leak-wo-cy2026.json')
-    monthly_by_store = load_json(BQ / 'leak-monthly-by-store.json')
+    if leak_pipeline.has_partitions():
+        # Store dimension from BQ; leak totals, monthly series and CY events from the local monthly partitions
+        print('   Leak events: monthly partitions (leak_pipeline.py)')
+        stores = compress_stores(load_csv(leak_pipeline.STORE_FILE))
+        built = leak_pipeline.build(stores)
+        cumul = build_cumul_data(built['cumul'])
+        leak_wos = built['wos']
+        monthly_by_store = built['monthly']
+    else:
+        if leak_pipeline.ENABLED:
+            print('   \u26a0\ufe0f  No leak partitions yet (run leak_pipeline.py); using the hand-pulled exports')
+        stores = compress_stores(load_csv(STORE_FILE))
+        cumul = build_cumul_data(load_csv(CUMUL_FILE))
+        leak_wos = load_leak_wos(BQ / 'leak-wo-cy2026.json')
+        monthly_by_store = load_json(BQ / 'leak-monthly-by-store.json')
     mgmt = []
 
     fleet_charge = sum(d['sc'] for d in stores)
@@ -141,6 +178,7 @@ def main():
     cy_rate = round((cy_tq / fleet_charge * 100), 2) if fleet_charge else 0
     threshold_lbs = round(fleet_charge * THRESHOLD / 100)
     burn = calc_burn_rate(cy_tq, fleet_charge)
+    burn_projections(stores, burn)
 
     print(f'   Stores: {len(stores):,}')
     print(f'   Fleet charge: {fleet_charge:,.0f} lbs')
@@ -148,13 +186,21 @@ def main():
     print(f'   Daily burn: {burn["daily_burn_lbs"]:,.0f} lbs/day')
     print(f'   Day {burn["days_elapsed"]} of {burn["days_in_year"]}')
 
-    store_json = json.dumps(stores, separators=(',', ':'))
-    mgmt_json = json.dumps(mgmt, separators=(',', ':'))  # empty, computed client-side
-    cumul_json = json.dumps(cumul, separators=(',', ':'))
-    burn_json = json.dumps(burn, separators=(',', ':'))
-    wo_json = json.dumps(leak_wos, separators=(',', ':'))
-    monthly_store_json = json.dumps(monthly_by_store, separators=(',', ':'))
-    assets_json = store_assets_json()
+    stores.sort(key=store_key('s'))
+    write_jsonl('leak_stores', stores)
+    write_jsonl('leak_wos', leak_wos)
+    write_jsonl('leak_monthly', monthly_by_store)
+
+    # Embedded as JSON blocks in the tab markup; the page parses each on first read
+    datasets = {
+        'LK_STORES': dumps_rows(stores),
+        'LK_MGMT': dumps(mgmt),  # empty, computed client-side
+        'LK_CUMUL': dumps(cumul),
+        'LK_BURN': dumps(burn),
+        'LK_WOS': dumps_map(leak_wos),
+        'LK_MONTHLY': dumps_series(monthly_by_store, MONTHLY_COLUMNS),
+    }
+    datasets.update(store_assets_blocks())   # index + per-range shards, parsed when a store panel needs them
 
     print('\n\U0001f4dd Reading dashboard HTML...')
     html = DASHBOARD.read_text(encoding='utf-8')
@@ -171,11 +217,13 @@ def main():
                 </button>'''
         html = html.replace('</nav>\n        </div>\n    </div>', btn + '\n            </nav>\n        </div>\n    </div>', 1)
 
-    leak_html = build_leak_html(fleet_charge, cy_tq, cy_rate, cy_leaks, threshold_lbs, burn)
-    leak_js = build_leak_js(store_json, mgmt_json, cumul_json, burn_json, wo_json, monthly_store_json, assets_json)
+    leak_html = build_leak_html(fleet_charge, cy_tq, cy_rate, cy_leaks, threshold_lbs, burn, datasets)
+    leak_js = build_leak_js(list(datasets))
 
     html = re.sub(r'(\s*<!-- Footer -->)', '\n' + leak_html + '\n\n    <!-- Footer -->', html, count=1)
     html = html.replace('</body>', leak_js + '\n</body>')
+    html = inject_shared_js(html)
+    html = inject_org_tree(html, 'leak', stores)
 
     DASHBOARD.write_text(html, encoding='utf-8')
     print(f'\n\u2705 Leak Management tab updated (v5 — Burn Rate + Walmart colors)!')
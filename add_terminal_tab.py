@@ -17,12 +17,29 @@ import csv
 import re
 import sys
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
 from pathlib import Path
 
+import bundle_size
+import terminal_history
+from bq import bq_csv
+from org_tree import inject_org_tree
+from payload import atomic_write_text, dumps, dumps_rows, json_script, store_key, write_jsonl
+from shared_js import inject_shared_js
+
 DASHBOARD = Path(__file__).parent / 'index.html'
 DATA_FILE = Path(__file__).parent / 'terminal_cases.csv'
 WO_FILE = Path(__file__).parent / 'terminal_wos.csv'
-SENSOR_FILE = Path(__file__).parent / 'terminal_sensors.csv'
+SENSOR_FILE = Path(__file__).parent / 'terminal_sensors.csv'   # old full dump, seeds the index once
+SENSOR_INDEX_FILE = Path(__file__).parent / 'terminal_sensor_index.json'
+SENSOR_TTL_DAYS = 30       # re-check a known sensor ID after this long
+SENSOR_MISS_TTL_DAYS = 3   # cases BQ had no sensor for are asked again sooner
+SENSOR_BATCH = 1000        # case keys per sensor query; keeps each --parameter well under the 128 KB argv limit
+WO_CACHE_FILE = Path(__file__).parent / 'terminal_wo_cache.json'
+WO_WINDOW_DAYS = 30
+WO_OVERLAP = timedelta(days=1)  # re-read the watermark's last day: WOs can land in ODS late
+OPEN_STATUSES = ('Open', 'In Progress')
 SC_URL = 'https://www.servicechannel.com/sc/wo/Workorders/index?id='
 
 
@@ -171,6 +188,7 @@ def build_terminal_html(total_cases, total_stores, run_stamp):
             <div class="bg-white rounded-lg shadow p-4 border-l-4 border-red-700">
                 <p class="text-xs text-gray-500 uppercase tracking-wide">Total Cases</p>
                 <p class="text-3xl font-bold text-red-700" id="termTotalCases">--</p>
+                <p class="text-xs text-gray-400" id="termNewCases"></p>
             </div>
             <div class="bg-white rounded-lg shadow p-4 border-l-4 border-amber-600">
                 <p class="text-xs text-gray-500 uppercase tracking-wide">Total Stores</p>
@@ -242,7 +260,7 @@ def build_terminal_html(total_cases, total_stores, run_stamp):
             </div>
             <div class="overflow-x-auto" style="max-height: 600px; overflow-y: auto;">
                 <table class="min-w-full divide-y divide-gray-200 text-xs">
-                    <thead class="bg-gray-50 sticky top-0">
+                    <thead class="bg-gray-50 sticky top-0 z-10">
                         <tr>
                             <th class="px-2 py-2 text-left font-medium text-gray-600 cursor-pointer" onclick="sortTermTable('sn')">Store</th>
                             <th class="px-2 py-2 text-left font-medium text-gray-600 cursor-pointer" onclick="sortTermTable('fsm')">Sub Mkt</th>
@@ -277,14 +295,19 @@ def build_terminal_html(total_cases, total_stores, run_stamp):
 def build_terminal_js(data_json):
     """Build the JS for the Terminal Cases tab."""
     return f'''<!-- Terminal JS Start -->
+{json_script('TERMINAL_DATA', data_json)}
 <script>
-// Terminal Cases Data
-const TERMINAL_DATA = {data_json};
-console.log('TERMINAL_DATA loaded:', TERMINAL_DATA.length, 'records');
-</script>
-<script>
-let termFiltered = [...TERMINAL_DATA];
+// Terminal Cases Data: parsed from the JSON block above when the tab first opens
+lazyData('TERMINAL_DATA');
+let termFiltered = [];
+STORE_INDEX.register('terminal', () => TERMINAL_DATA, 'sn');
+// Column orders over all of TERMINAL_DATA, built on first use
+const termSortCache = new SortCache(() => TERMINAL_DATA, {{
+    sn: 'num', cd: 'num', dt: 'num', mt: 'num', ow: 'num', pt: 'num', sp: 'num',
+    cn: 'str', dir: 'str', fsm: 'str', mgr: 'str', rm: 'str', tech: 'str'
+}}, 'TERMINAL_DATA');
 let termSort = {{ field: 'cd', dir: 'desc' }};
+let termTable = null;
 let termDonutChart, termDaysChart, termSubMktChart, termDirChart;
 
 function initTerminalTab() {{
@@ -292,6 +315,7 @@ function initTerminalTab() {{
     window._termInit = true;
     try {{
         populateTerminalFilters();
+        applyTerminalState(URL_STATE.read('t'), false);
         applyTerminalFilters();
         console.log('Terminal tab initialized:', TERMINAL_DATA.length, 'cases');
     }} catch(e) {{
@@ -312,87 +336,105 @@ function populateTerminalFilters() {{
         }});
         sel.value = cur;
     }};
-    fill('termSrDir', [...new Set(data.map(r => r.srd))]);
-    fill('termDir', [...new Set(data.map(r => r.dir))]);
-    fill('termRM', [...new Set(data.map(r => r.rm))]);
-    fill('termFSM', [...new Set(data.map(r => r.mgr))]);
-    fill('termMarket', [...new Set(data.map(r => r.fm))]);
-    fill('termSubMkt', [...new Set(data.map(r => r.fsm))]);
     fill('termCaseClass', [...new Set(data.map(r => r.cc))]);
     fill('termTech', [...new Set(data.map(r => r.tech))]);
     fill('termStore', [...new Set(data.map(r => r.sn))]);
     fill('termOpsRegion', [...new Set(data.map(r => r.rn))]);
 }}
 
-function cascadeTerminalFilters() {{
-    const srd = document.getElementById('termSrDir').value;
-    const dir = document.getElementById('termDir').value;
-    const rm = document.getElementById('termRM').value;
-    const fsm = document.getElementById('termFSM').value;
-    let data = TERMINAL_DATA;
-    if (srd) data = data.filter(r => r.srd === srd);
-    if (dir) data = data.filter(r => r.dir === dir);
-    if (rm) data = data.filter(r => r.rm === rm);
-    if (fsm) data = data.filter(r => r.mgr === fsm);
+// TERMINAL_DATA lives in the compute worker (filters, cascade options, day buckets)
+COMPUTE.define('terminal', () => TERMINAL_DATA, {{
+    fields: {{
+        srd: r => r.srd, dir: r => r.dir, rm: r => r.rm, mgr: r => r.mgr,
+        fm: r => r.fm, fsm: r => r.fsm, cc: r => r.cc, tech: r => r.tech,
+        sn: r => r.sn, rn: r => r.rn,
+        cdb: r => r.cd >= 3 ? '3+' : String(r.cd),
+        wo: r => r.ow > 0 ? 'yes' : r.ow === 0 ? 'no' : ''
+    }},
+    text: r => (r.sn + ' ' + r.cn + ' ' + r.dir + ' ' + r.rm + ' ' + r.mgr + ' ' + r.tech + ' ' + r.fsm).toLowerCase(),
+    block: 'TERMINAL_DATA'
+}});
+
+// Org dropdowns cascade from ORG_TREE (Sr Dir → Dir → RM → FS Mgr → Market → Sub-Mkt)
+const TERM_ORG = {{ srd: 'termSrDir', dir: 'termDir', rm: 'termRM', mgr: 'termFSM', fm: 'termMarket', fsm: 'termSubMkt' }};
+// Non-org dropdowns narrowed by the org selections in the worker
+const TERM_CASCADE = {{ termTech: 'tech', termStore: 'sn', termOpsRegion: 'rn' }};
 
+// Returns true if a selected value dropped out of its list (and was cleared)
+function cascadeTerminalFilters(options) {{
+    let cleared = false;
     const fill = (id, vals) => {{
         const sel = document.getElementById(id);
         const cur = sel.value;
         while (sel.options.length > 1) sel.remove(1);
-        vals.sort().forEach(v => {{
+        vals.forEach(v => {{
             if (v) {{ const o = document.createElement('option'); o.value = v; o.textContent = v; sel.appendChild(o); }}
         }});
         if ([...sel.options].some(o => o.value === cur)) sel.value = cur;
-        else sel.value = '';
+        else {{ sel.value = ''; cleared = cleared || !!cur; }}
     }};
-    if (!srd) fill('termSrDir', [...new Set(TERMINAL_DATA.map(r => r.srd))]);
-    fill('termDir', [...new Set(data.map(r => r.dir))]);
-    fill('termRM', [...new Set(data.map(r => r.rm))]);
-    fill('termFSM', [...new Set(data.map(r => r.mgr))]);
-    fill('termMarket', [...new Set(data.map(r => r.fm))]);
-    fill('termSubMkt', [...new Set(data.map(r => r.fsm))]);
-    fill('termTech', [...new Set(data.map(r => r.tech))]);
-    fill('termStore', [...new Set(data.map(r => r.sn))]);
-    fill('termOpsRegion', [...new Set(data.map(r => r.rn))]);
+    Object.entries(TERM_CASCADE).forEach(([id, f]) => fill(id, options[f]));
+    return cleared;
 }}
 
+// Filter state as stored in the URL hash (t.dir=..., t.cdb=3%2B, ...): state key → select
+const TERM_STATE = {{ ...Object.fromEntries(Object.entries(TERM_CASCADE).map(([id, f]) => [f, id])), ...TERM_ORG,
+                      cc: 'termCaseClass', cdb: 'termConsecDays', wo: 'termOpenWO' }};
+
+function terminalState() {{
+    const state = {{ q: document.getElementById('termTableSearch').value }};
+    Object.entries(TERM_STATE).forEach(([f, id]) => {{ state[f] = document.getElementById(id).value; }});
+    return state;
+}}
+
+function applyTerminalState(state, refilter = true) {{
+    Object.entries(TERM_STATE).forEach(([f, id]) => UrlState.setSelect(id, state[f]));
+    document.getElementById('termTableSearch').value = state.q || '';
+    if (refilter) applyTerminalFilters();
+}}
+
+URL_STATE.register('t', {{ tab: 'terminal', read: terminalState, apply: applyTerminalState, ready: () => !!window._termInit }});
+
 function applyTerminalFilters() {{
-    cascadeTerminalFilters();
-    let data = [...TERMINAL_DATA];
+    ORG_TREE.cascade('terminal', TERM_ORG);
     const v = id => document.getElementById(id).value;
-    if (v('termSrDir')) data = data.filter(r => r.srd === v('termSrDir'));
-    if (v('termDir')) data = data.filter(r => r.dir === v('termDir'));
-    if (v('termRM')) data = data.filter(r => r.rm === v('termRM'));
-    if (v('termFSM')) data = data.filter(r => r.mgr === v('termFSM'));
-    if (v('termMarket')) data = data.filter(r => r.fm === v('termMarket'));
-    if (v('termSubMkt')) data = data.filter(r => r.fsm === v('termSubMkt'));
-    if (v('termCaseClass')) data = data.filter(r => r.cc === v('termCaseClass'));
-    if (v('termTech')) data = data.filter(r => r.tech === v('termTech'));
-    if (v('termStore')) data = data.filter(r => r.sn === v('termStore'));
-    if (v('termOpsRegion')) data = data.filter(r => r.rn === v('termOpsRegion'));
-
-    const cd = v('termConsecDays');
-    if (cd === '0') data = data.filter(r => r.cd === 0);
-    else if (cd === '1') data = data.filter(r => r.cd === 1);
-    else if (cd === '2') data = data.filter(r => r.cd === 2);
-    else if (cd === '3+') data = data.filter(r => r.cd >= 3);
-
-    const wo = v('termOpenWO');
-    if (wo === 'yes') data = data.filter(r => r.ow > 0);
-    else if (wo === 'no') data = data.filter(r => r.ow === 0);
-
-    // Search
     const q = (document.getElementById('termTableSearch').value || '').toLowerCase();
-    if (q) data = data.filter(r => 
-        (r.sn + ' ' + r.cn + ' ' + r.dir + ' ' + r.rm + ' ' + r.mgr + ' ' + r.tech + ' ' + r.fsm).toLowerCase().includes(q)
-    );
-
-    termFiltered = data;
-    updateTerminalKPIs(data);
-    updateTerminalCharts(data);
-    updateTerminalTable(data);
+    const org = {{ srd: v('termSrDir'), dir: v('termDir'), rm: v('termRM'), mgr: v('termFSM') }};
+    const options = {{}};
+    Object.values(TERM_CASCADE).forEach(f => {{ options[f] = org; }});
+    COMPUTE.query('terminal', {{
+        clauses: {{
+            ...org,
+            fm: v('termMarket'), fsm: v('termSubMkt'), cc: v('termCaseClass'), tech: v('termTech'),
+            sn: v('termStore'), rn: v('termOpsRegion'),
+            cdb: v('termConsecDays'), wo: v('termOpenWO')
+        }},
+        text: q,
+        options,
+        group: {{ by: 'cdb' }},
+        channel: 'terminal'
+    }}).then(res => {{
+        if (!res) return;  // superseded by a newer filter change
+        if (cascadeTerminalFilters(res.options)) return applyTerminalFilters();
+        URL_STATE.save('t');   // once the cascade has settled
+        termFiltered = res.rows;
+        termIds = res.ids;
+        termGroups = res.groups;
+        termVersion++;
+        termView.invalidate();
+    }});
 }}
 
+// Repaint once per frame; sorting only touches the table
+let termIds = null;
+let termGroups = {{}};
+let termVersion = 0;
+const termView = new RenderScheduler(() => ({{ version: termVersion }}), {{
+    kpis: {{ select: m => m.version, render: () => updateTerminalKPIs(termFiltered) }},
+    charts: {{ select: m => m.version, render: () => updateTerminalCharts(termFiltered, termGroups) }},
+    table: {{ select: m => [m.version, termSort.field, termSort.dir], render: updateTerminalTable }}
+}});
+
 function clearTerminalFilters() {{
     ['termSrDir','termDir','termRM','termFSM','termMarket','termSubMkt',
      'termCaseClass','termConsecDays','termOpenWO','termTech','termStore','termOpsRegion'].forEach(id => {{
@@ -408,6 +450,8 @@ function updateTerminalKPIs(data) {{
     const withWO = data.filter(r => r.ow > 0).length;
     const noWO = data.length - withWO;
     document.getElementById('termTotalCases').textContent = data.length.toLocaleString();
+    const entered = data.filter(r => r.nw).length;
+    document.getElementById('termNewCases').textContent = entered ? '+' + entered.toLocaleString() + ' new since the previous snapshot' : '';
     document.getElementById('termTotalStores').textContent = stores.toLocaleString();
     document.getElementById('termWithWO').textContent = withWO.toLocaleString();
     document.getElementById('termNoWO').textContent = noWO.toLocaleString();
@@ -432,15 +476,13 @@ function updateTerminalKPIs(data) {{
     document.getElementById('termCaseClassCards').innerHTML = cards;
 }}
 
-function updateTerminalCharts(data) {{
+function updateTerminalCharts(data, cdGroups) {{
     try {{
     const withWO = data.filter(r => (r.wos && r.wos.length > 0) || r.ow > 0).length;
     const noWO = data.length - withWO;
 
     // Donut
-    if (termDonutChart) termDonutChart.destroy();
-    const dCtx = document.getElementById('termDonutChart').getContext('2d');
-    termDonutChart = new Chart(dCtx, {{
+    termDonutChart = CHARTS.render('termDonutChart', {{
         type: 'doughnut',
         data: {{
             labels: ['With Open WOs (' + withWO + ')', 'No Open WOs (' + noWO + ')'],
@@ -460,16 +502,12 @@ function updateTerminalCharts(data) {{
         }}
     }});
 
-    // Consecutive days bar
-    const day1 = data.filter(r => r.cd === 1).length;
-    const day2 = data.filter(r => r.cd === 2).length;
-    const day3p = data.filter(r => r.cd >= 3).length;
-    const day0 = data.filter(r => r.cd === 0).length;
+    // Consecutive days bar (bucket counts come from the compute worker)
+    const bucket = k => (cdGroups[k] || {{}}).n || 0;
+    const day0 = bucket('0'), day1 = bucket('1'), day2 = bucket('2'), day3p = bucket('3+');
 
-    if (termDaysChart) termDaysChart.destroy();
-    const bCtx = document.getElementById('termDaysChart').getContext('2d');
     const dayBuckets = ['0','1','2','3+'];
-    termDaysChart = new Chart(bCtx, {{
+    termDaysChart = CHARTS.render('termDaysChart', {{
         type: 'bar',
         data: {{
             labels: ['0 Days', '1 Day', '2 Days', '3+ Days'],
@@ -500,9 +538,7 @@ function updateTerminalCharts(data) {{
     data.forEach(r => {{ const k = r.fsm || 'Unknown'; smMap[k] = (smMap[k] || 0) + 1; }});
     const smSorted = Object.entries(smMap).sort((a, b) => b[1] - a[1]).slice(0, 15);
 
-    if (termSubMktChart) termSubMktChart.destroy();
-    const sCtx = document.getElementById('termSubMktChart').getContext('2d');
-    termSubMktChart = new Chart(sCtx, {{
+    termSubMktChart = CHARTS.render('termSubMktChart', {{
         type: 'bar',
         data: {{
             labels: smSorted.map(e => e[0]),
@@ -534,9 +570,7 @@ function updateTerminalCharts(data) {{
     data.forEach(r => {{ const k = r.dir || 'Unknown'; dirMap[k] = (dirMap[k] || 0) + 1; }});
     const dirSorted = Object.entries(dirMap).sort((a, b) => b[1] - a[1]).slice(0, 15);
 
-    if (termDirChart) termDirChart.destroy();
-    const dcCtx = document.getElementById('termDirChart').getContext('2d');
-    termDirChart = new Chart(dcCtx, {{
+    termDirChart = CHARTS.render('termDirChart', {{
         type: 'bar',
         data: {{
             labels: dirSorted.map(e => e[0].length > 18 ? e[0].substring(0, 18) + '...' : e[0]),
@@ -569,7 +603,7 @@ function updateTerminalCharts(data) {{
 function sortTermTable(field) {{
     if (termSort.field === field) termSort.dir = termSort.dir === 'asc' ? 'desc' : 'asc';
     else {{ termSort.field = field; termSort.dir = 'desc'; }}
-    updateTerminalTable(termFiltered);
+    termView.invalidate(false);
 }}
 
 function termFilterByCard(type, value) {{
@@ -592,22 +626,27 @@ function termFilterByCard(type, value) {{
     document.getElementById('termTableBody')?.closest('.bg-white')?.scrollIntoView({{ behavior: 'smooth', block: 'start' }});
 }}
 
-function updateTerminalTable(data) {{
-    const sorted = [...data].sort((a, b) => {{
-        let av = a[termSort.field], bv = b[termSort.field];
-        if (typeof av === 'string') return termSort.dir === 'asc' ? av.localeCompare(bv) : bv.localeCompare(av);
-        av = av ?? -999; bv = bv ?? -999;
-        return termSort.dir === 'asc' ? av - bv : bv - av;
-    }});
+function updateTerminalTable() {{
+    const sorted = termSortCache.sorted(termSort.field, termSort.dir === 'asc', termIds);
 
     document.getElementById('termRowCount').textContent = sorted.length + ' cases';
 
-    const tbody = document.getElementById('termTableBody');
+    // Store sorted data for email lookup
+    window._termSorted = sorted;
+    if (!termTable) termTable = new VirtualTable('termTableBody', {{
+        colspan: 18,
+        rowHeight: 37,
+        rowClass: () => 'hover:bg-gray-50',
+        row: terminalRowHtml,
+    }});
+    termTable.setRows(sorted);
+}}
+
+function terminalRowHtml(r, rowIdx) {{
     const pctColor = v => v >= 90 ? 'bg-red-100 text-red-800 font-bold' : v >= 50 ? 'bg-amber-50 text-amber-800' : 'text-gray-700';
     const daysColor = d => d >= 3 ? 'bg-red-100 text-red-800 font-bold' : d >= 1 ? 'bg-amber-50 text-amber-800' : 'text-gray-500';
 
     const SC = 'https://www.servicechannel.com/sc/wo/Workorders/index?id=';
-    let html = '';
     function woDropdown(wos, label, btnClass) {{
         if (!wos || wos.length === 0) return '<span class="text-gray-300">&mdash;</span>';
         const csv = wos.map(w => w.t || w).join(', ');
@@ -634,42 +673,35 @@ function updateTerminalTable(data) {{
             </div>
         </div>`;
     }}
-    let rowIdx = 0;
-    sorted.forEach(r => {{
-        const variance = (r.mt != null && r.sp != null) ? (r.mt - r.sp).toFixed(1) : '--';
-        const varNum = parseFloat(variance);
-        const varColor = isNaN(varNum) ? '' : varNum > 10 ? 'text-red-600 font-bold' : varNum > 5 ? 'text-amber-600' : 'text-gray-600';
-        const openWoHtml = woDropdown(r.wos, 'Open', 'bg-red-50 border-red-200 text-red-700');
-        const recentWoHtml = woDropdown(r.wos30, 'WOs', 'bg-blue-50 border-blue-200 text-blue-700');
-        const firstName = (r.mgr || '').split(' ')[0] || 'Team';
-        html += `<tr class="hover:bg-gray-50">
-            <td class="px-2 py-1.5 font-medium text-gray-900">${{r.sn}}</td>
-            <td class="px-2 py-1.5 text-gray-600">${{r.fsm || '--'}}</td>
-            <td class="px-2 py-1.5 text-gray-600">${{r.dir || '--'}}</td>
-            <td class="px-2 py-1.5 text-gray-600">${{r.rm || '--'}}</td>
-            <td class="px-2 py-1.5 text-gray-600">${{r.mgr || '--'}}</td>
-            <td class="px-2 py-1.5 text-gray-600">${{r.tech || '--'}}</td>
-            <td class="px-2 py-1.5 font-medium">${{r.cn}}</td>
-            <td class="px-2 py-1.5 text-center">${{r.sid ? `<a href="https://crystal.walmart.com/us/stores/search/${{r.sn}}?view=telemetry&uniqueIds=${{encodeURIComponent(r.sid)}}&fromDate=${{Date.now() - 3*86400000}}&toDate=${{Date.now()}}" target="_blank" class="inline-flex items-center gap-1 px-2 py-0.5 bg-indigo-50 border border-indigo-200 text-indigo-700 rounded hover:bg-indigo-100 hover:shadow transition-all text-xs font-semibold" title="View ${{r.cn}} telemetry in Crystal">\U0001f52c Crystal</a>` : '<span class="text-gray-300">&mdash;</span>'}}</td>
-            <td class="px-2 py-1.5"><span class="px-1.5 py-0.5 rounded text-xs font-medium ${{r.cc === 'LT' ? 'bg-blue-100 text-blue-700' : r.cc === 'MT' ? 'bg-amber-100 text-amber-700' : 'bg-gray-100 text-gray-600'}}">${{r.cc || '--'}}</span></td>
-            <td class="px-2 py-1.5 text-center">${{openWoHtml}}</td>
-            <td class="px-2 py-1.5 text-center">${{recentWoHtml}}</td>
-            <td class="px-2 py-1.5 text-center ${{pctColor(r.pt)}}">${{r.pt != null ? r.pt.toFixed(1) + '%' : '--'}}</td>
-            <td class="px-2 py-1.5 text-center ${{daysColor(r.cd)}}">${{r.cd}}</td>
-            <td class="px-2 py-1.5 text-center text-gray-600">${{r.dt}}</td>
-            <td class="px-2 py-1.5 text-center text-gray-700">${{r.mt != null ? r.mt + '\u00b0F' : '--'}}</td>
-            <td class="px-2 py-1.5 text-center text-gray-500">${{r.sp != null ? r.sp + '\u00b0F' : '--'}}</td>
-            <td class="px-2 py-1.5 text-center ${{varColor}}">${{variance !== '--' ? variance + '\u00b0' : '--'}}</td>
-            <td class="px-2 py-1.5 text-center">
-                <button onclick="emailTerminalFSM(${{rowIdx}})" 
-                    class="px-2 py-1 bg-blue-600 hover:bg-blue-700 text-white text-xs rounded" title="Email ${{r.mgr}}">\u2709</button>
-            </td>
-        </tr>`;
-        rowIdx++;
-    }});
-    tbody.innerHTML = html;
-    // Store sorted data for email lookup
-    window._termSorted = sorted;
+    const variance = (r.mt != null && r.sp != null) ? (r.mt - r.sp).toFixed(1) : '--';
+    const varNum = parseFloat(variance);
+    const varColor = isNaN(varNum) ? '' : varNum > 10 ? 'text-red-600 font-bold' : varNum > 5 ? 'text-amber-600' : 'text-gray-600';
+    const openWoHtml = woDropdown(r.wos, 'Open', 'bg-red-50 border-red-200 text-red-700');
+    const recentWoHtml = woDropdown(r.wos30, 'WOs', 'bg-blue-50 border-blue-200 text-blue-700');
+    const firstName = (r.mgr || '').split(' ')[0] || 'Team';
+    return `
+        <td class="px-2 py-1.5 font-medium text-gray-900">${{r.sn}}</td>
+        <td class="px-2 py-1.5 text-gray-600">${{r.fsm || '--'}}</td>
+        <td class="px-2 py-1.5 text-gray-600">${{r.dir || '--'}}</td>
+        <td class="px-2 py-1.5 text-gray-600">${{r.rm || '--'}}</td>
+        <td class="px-2 py-1.5 text-gray-600">${{r.mgr || '--'}}</td>
+        <td class="px-2 py-1.5 text-gray-600">${{r.tech || '--'}}</td>
+        <td class="px-2 py-1.5 font-medium">${{r.cn}}</td>
+        <td class="px-2 py-1.5 text-center">${{r.sid ? `<a href="https://crystal.walmart.com/us/stores/search/${{r.sn}}?view=telemetry&uniqueIds=${{encodeURIComponent(r.sid)}}&fromDate=${{Date.now() - 3*86400000}}&toDate=${{Date.now()}}" target="_blank" class="inline-flex items-center gap-1 px-2 py-0.5 bg-indigo-50 border border-indigo-200 text-indigo-700 rounded hover:bg-indigo-100 hover:shadow transition-all text-xs font-semibold" title="View ${{r.cn}} telemetry in Crystal">\U0001f52c Crystal</a>` : '<span class="text-gray-300">&mdash;</span>'}}</td>
+        <td class="px-2 py-1.5"><span class="px-1.5 py-0.5 rounded text-xs font-medium ${{r.cc === 'LT' ? 'bg-blue-100 text-blue-700' : r.cc === 'MT' ? 'bg-amber-100 text-amber-700' : 'bg-gray-100 text-gray-600'}}">${{r.cc || '--'}}</span></td>
+        <td class="px-2 py-1.5 text-center">${{openWoHtml}}</td>
+        <td class="px-2 py-1.5 text-center">${{recentWoHtml}}</td>
+        <td class="px-2 py-1.5 text-center ${{pctColor(r.pt)}}">${{r.pt != null ? r.pt.toFixed(1) + '%' : '--'}}</td>
+        <td class="px-2 py-1.5 text-center ${{daysColor(r.cd)}}">${{r.cd}}${{r.nw ? ' <span class="px-1 rounded bg-red-100 text-red-700 text-[10px] font-semibold" title="Entered terminal state on the latest snapshot">NEW</span>' : ''}}</td>
+        <td class="px-2 py-1.5 text-center text-gray-600" title="Local history: ${{r.t7 || 0}} of 7 / ${{r.t30 || 0}} of 30 / ${{r.t90 || 0}} of 90 days terminal">${{r.dt}}</td>
+        <td class="px-2 py-1.5 text-center text-gray-700">${{r.mt != null ? r.mt + '\u00b0F' : '--'}}</td>
+        <td class="px-2 py-1.5 text-center text-gray-500">${{r.sp != null ? r.sp + '\u00b0F' : '--'}}</td>
+        <td class="px-2 py-1.5 text-center ${{varColor}}">${{variance !== '--' ? variance + '\u00b0' : '--'}}</td>
+        <td class="px-2 py-1.5 text-center">
+            <button onclick="emailTerminalFSM(${{rowIdx}})" 
+                class="px-2 py-1 bg-blue-600 hover:bg-blue-700 text-white text-xs rounded" title="Email ${{r.mgr}}">\u2709</button>
+        </td>
+    `;
 }}
 
 function emailTerminalFSM(idx) {{
@@ -725,90 +757,151 @@ document.addEventListener('click', function() {{
     document.querySelectorAll('#termTableBody .relative > div:not(.hidden)').forEach(d => d.classList.add('hidden'));
 }});
 
-console.log('Terminal tab JS loaded, TERMINAL_DATA:', TERMINAL_DATA.length, 'records');
+console.log('Terminal tab JS loaded');
 </script>
 <!-- Terminal JS End -->'''
 
 
-def pull_sensor_ids():
-    """Pull case_temp_sensor_id from BQ case_score_curr for terminal cases only."""
-    # Get store numbers from terminal data to limit query scope
-    if not DATA_FILE.exists():
-        return {}
-    stores = set()
-    for r in load_csv(DATA_FILE):
-        stores.add(r['store_number'])
-    store_list = ','.join(stores)
-    query = f"""
-    SELECT CAST(store_nbr AS STRING) as store_number, case_name, case_temp_sensor_id
-    FROM `re-ods-prod.us_re_ods_prod_pub.case_score_curr`
-    WHERE case_temp_sensor_id IS NOT NULL
-    AND store_nbr IN ({store_list})
+def load_store_numbers(rows):
+    """Distinct numeric store numbers from the terminal case rows, sorted."""
+    return sorted({int(r['store_number']) for r in rows if str(r.get('store_number', '')).strip().isdigit()})
+
+
+def load_sensor_index():
+    """Persistent 'store|case' -> [case_temp_sensor_id ('' if BQ had none), checked ISO date].
+
+    Seeded once from the old terminal_sensors.csv dump if there is no index yet.
     """
     try:
-        result = subprocess.run(
-            ['bq', 'query', '--use_legacy_sql=false', '--format=csv', '--max_rows=100000', query],
-            capture_output=True, text=True, timeout=30
-        )
-        if result.returncode != 0:
-            print(f'   ⚠️  BQ sensor query failed: {result.stderr[:200]}')
-            return {}
-        lines = [l for l in result.stdout.strip().split('\n')
-                 if l and not l.startswith('WARNING') and 'Python 3.9' not in l
-                 and 'gcloud components' not in l and 'CLOUDSDK' not in l
-                 and 'compatible' not in l and 'reinstall' not in l
-                 and 'officially supported' not in l and 'may not function' not in l
-                 and 'prompt to install' not in l and '$ gcloud' not in l
-                 and 'point to it' not in l]
-        if len(lines) < 2:
-            print('   ⚠️  No sensor data returned from BQ')
-            return {}
-        # Save to CSV
-        with open(SENSOR_FILE, 'w') as f:
-            f.write('\n'.join(lines) + '\n')
-        # Build map: store|case -> sensor_id
-        sensor_map = {}
-        reader = csv.DictReader(lines)
-        for r in reader:
-            key = f"{r['store_number']}|{r['case_name']}"
-            sensor_map[key] = r['case_temp_sensor_id']
-        print(f'   Crystal sensor IDs: {len(sensor_map):,} mappings')
-        return sensor_map
-    except subprocess.TimeoutExpired:
-        print('   ⚠️  BQ sensor query timed out')
-        return {}
-    except Exception as e:
-        print(f'   ⚠️  Sensor pull error: {e}')
-        return {}
+        return json.loads(SENSOR_INDEX_FILE.read_text(encoding='utf-8'))
+    except (OSError, json.JSONDecodeError):
+        pass
+    index = {}
+    if SENSOR_FILE.exists():
+        checked = date.fromtimestamp(SENSOR_FILE.stat().st_mtime).isoformat()
+        for r in load_csv(SENSOR_FILE):
+            index[f"{r['store_number']}|{r['case_name']}"] = [r['case_temp_sensor_id'], checked]
+    return index
+
+
+def sensor_age(entry, today):
+    return (today - date.fromisoformat(entry[1])).days
+
+
+def stale_sensor_keys(index, keys, today):
+    """Cases never looked up, or whose lookup is past its TTL (shorter for cases with no sensor)."""
+    def stale(k):
+        entry = index.get(k)
+        if not entry:
+            return True
+        return sensor_age(entry, today) >= (SENSOR_TTL_DAYS if entry[0] else SENSOR_MISS_TTL_DAYS)
+    return sorted(k for k in keys if stale(k))
 
 
-def load_sensor_map():
-    """Load sensor IDs from cached CSV (fallback if BQ unavailable)."""
-    if not SENSOR_FILE.exists():
+def pull_sensor_ids(keys):
+    """Crystal sensor IDs for the terminal cases: 'store|case' -> case_temp_sensor_id.
+
+    Sensor IDs almost never change, so they come from terminal_sensor_index.json;
+    only cases not seen before or past SENSOR_TTL_DAYS are asked of
+    case_score_curr. If BQ is unavailable the index is used as is.
+    """
+    if not keys:
         return {}
-    sensor_map = {}
-    for r in load_csv(SENSOR_FILE):
-        key = f"{r['store_number']}|{r['case_name']}"
-        sensor_map[key] = r['case_temp_sensor_id']
+    today = date.today()
+    index = load_sensor_index()
+    todo = stale_sensor_keys(index, keys, today)
+    found = {}
+    if todo:
+        query = """
+        SELECT CAST(store_nbr AS STRING) as store_number, case_name, case_temp_sensor_id
+        FROM `re-ods-prod.us_re_ods_prod_pub.case_score_curr`
+        WHERE case_temp_sensor_id IS NOT NULL
+        AND store_nbr IN UNNEST(@stores)
+        AND CONCAT(CAST(store_nbr AS STRING), '|', case_name) IN UNNEST(@cases)
+        """
+        try:
+            for i in range(0, len(todo), SENSOR_BATCH):
+                batch = todo[i:i + SENSOR_BATCH]
+                stores = sorted({int(k.split('|', 1)[0]) for k in batch if k.split('|', 1)[0].isdigit()})
+                lines = bq_csv(query, {'stores': ('ARRAY<INT64>', stores), 'cases': ('ARRAY<STRING>', batch)},
+                               max_rows=100000, timeout=30)
+                found.update((f"{r['store_number']}|{r['case_name']}", r['case_temp_sensor_id'])
+                             for r in csv.DictReader(lines))
+            for k in todo:
+                index[k] = [found.get(k, ''), today.isoformat()]
+            # Forget cases that left the terminal list and are past their TTL anyway
+            index = {k: e for k, e in index.items() if k in keys or sensor_age(e, today) < SENSOR_TTL_DAYS}
+            atomic_write_text(SENSOR_INDEX_FILE, dumps(index) + '\n')
+        except subprocess.TimeoutExpired:
+            print('   ⚠️  BQ sensor query timed out, using cached sensor IDs')
+        except RuntimeError as e:
+            print(f'   ⚠️  BQ sensor query failed: {e}, using cached sensor IDs')
+        except Exception as e:
+            print(f'   ⚠️  Sensor pull error: {e}, using cached sensor IDs')
+
+    sensor_map = {k: index[k][0] for k in keys if k in index and index[k][0]}
+    hits = len(keys) - len(todo)
+    print(f'   Crystal sensor IDs: {len(sensor_map):,}/{len(keys):,} cases '
+          f'({hits:,} cache hits = {hits / len(keys):.0%}, {len(todo):,} looked up, {len(found):,} found)')
     return sensor_map
 
 
-def load_wo_map():
-    """Pull case-level WOs from ODS by matching 'Systems Affected' in problem_desc.
+def load_wo_cache():
+    """The local case↔WO store ({} before the first pull).
+
+    {'watermark': latest call_date pulled, 'stores': stores with a full window,
+     'wos': {tracking_nbr: {'sn', 'c': case ref, 's': status, 'd': call_date}}}
+    """
+    try:
+        return json.loads(WO_CACHE_FILE.read_text(encoding='utf-8'))
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def expire_wos(wos, now):
+    """Drop WOs called in before the WO_WINDOW_DAYS window."""
+    cutoff = (now - timedelta(days=WO_WINDOW_DAYS)).strftime('%Y-%m-%d %H:%M:%S')
+    return {tn: w for tn, w in wos.items() if w['d'] >= cutoff}
+
+
+def build_wo_map(wos, today):
+    """'store|case' -> {'open': [{t, a}...], 'recent': [{t, a}...]}, newest call first."""
+    wo_map = {}
+    for tn, w in sorted(wos.items(), key=lambda kv: (kv[1]['d'], kv[0]), reverse=True):
+        entry = {'t': tn, 'a': str((today - date.fromisoformat(w['d'][:10])).days)}
+        slot = wo_map.setdefault(f"{w['sn']}|{w['c']}", {'open': [], 'recent': []})
+        slot['recent'].append(entry)
+        if w['s'] in OPEN_STATUSES:
+            slot['open'].append(entry)
+    return wo_map
+
+
+def load_wo_map(stores):
+    """Case-level WOs from ODS, matched on 'Systems Affected' in problem_desc.
     Returns dict: 'store|case_name' -> {'open': [tn...], 'recent': [tn...]}
     'open' = Open/In Progress status, 'recent' = all statuses last 30 days.
+
+    Incremental: terminal_wo_cache.json keeps every matched WO of the window
+    plus a call_date watermark. A refresh pulls only WOs called in since the
+    watermark (full window for stores new to the list), re-reads the status
+    of cached WOs still open, and expires the rest past 30 days. If BQ is
+    unreachable the cached map is used as is.
     """
-    if not DATA_FILE.exists():
+    if not stores:
         return {}
-    # Get unique store numbers
-    stores = set()
-    for r in load_csv(DATA_FILE):
-        stores.add(r['store_number'])
-    store_list = ','.join(stores)
-    
+    now = datetime.now()
+    cache = load_wo_cache()
+    wos = expire_wos(cache.get('wos', {}), now)
+    known_stores = set(cache.get('stores', []))
+    new_stores = [s for s in stores if s not in known_stores]
+    since = now - timedelta(days=WO_WINDOW_DAYS)
+    if cache.get('watermark'):
+        since = max(since, datetime.fromisoformat(cache['watermark']) - WO_OVERLAP)
+    open_tns = sorted(tn for tn, w in wos.items() if w['s'] in OPEN_STATUSES)
+
     query = f"""
     SELECT 
-      store_nbr AS sn,
+      CAST(store_nbr AS STRING) AS sn,
       CAST(tracking_nbr AS STRING) AS tn,
       REGEXP_REPLACE(
         REGEXP_EXTRACT(problem_desc, r'Systems Affected: ([A-Za-z0-9]+)'),
@@ -816,62 +909,79 @@ def load_wo_map():
         r'\\1\\2'
       ) AS case_ref,
       status_name,
-      CAST(DATE_DIFF(CURRENT_DATE(), DATE(call_date), DAY) AS STRING) AS age_days
+      FORMAT_DATETIME('%Y-%m-%d %H:%M:%S', call_date) AS call_date
     FROM `re-ods-prod.us_re_ods_prod_pub.sc_walmart_workorder`
-    WHERE store_nbr IN ({store_list})
-    AND LOWER(sc_trade_name) LIKE '%refrig%'
-    AND problem_desc LIKE '%Systems Affected%'
-    AND call_date >= DATETIME_SUB(CURRENT_DATETIME(), INTERVAL 30 DAY)
-    ORDER BY call_date DESC
+    WHERE call_date >= DATETIME_SUB(CURRENT_DATETIME(), INTERVAL {WO_WINDOW_DAYS} DAY)
+      AND (
+        (
+          store_nbr IN UNNEST(@stores)
+          AND LOWER(sc_trade_name) LIKE '%refrig%'
+          AND problem_desc LIKE '%Systems Affected%'
+          AND (store_nbr IN UNNEST(@new_stores) OR call_date >= @since)
+        )
+        OR CAST(tracking_nbr AS STRING) IN UNNEST(@open_tns)
+      )
     """
+    params = {
+        'stores': ('ARRAY<INT64>', stores),
+        'new_stores': ('ARRAY<INT64>', new_stores),
+        'since': ('DATETIME', since.strftime('%Y-%m-%d %H:%M:%S')),
+        'open_tns': ('ARRAY<STRING>', open_tns),
+    }
     try:
-        result = subprocess.run(
-            ['bq', 'query', '--use_legacy_sql=false', '--format=csv', '--max_rows=50000', query],
-            capture_output=True, text=True, timeout=60
-        )
-        if result.returncode != 0:
-            print(f'   \u26a0\ufe0f  BQ case WO query failed, falling back to store-level')
-            return _load_wo_file()
-        lines = [l for l in result.stdout.strip().split('\n')
-                 if l and not l.startswith('WARNING') and 'Python 3.9' not in l
-                 and 'gcloud components' not in l and 'CLOUDSDK' not in l
-                 and 'compatible' not in l and 'reinstall' not in l
-                 and 'officially supported' not in l and 'may not function' not in l
-                 and 'prompt to install' not in l and '$ gcloud' not in l
-                 and 'point to it' not in l and 'Waiting on' not in l]
-        if len(lines) < 2:
-            print('   \u26a0\ufe0f  No case-level WO data, falling back to store-level')
-            return _load_wo_file()
-        
-        # Save updated WO file
-        with open(WO_FILE, 'w') as f:
-            f.write('\n'.join(lines) + '\n')
-        
-        # Build map: store|case -> {open: [{tn, age}...], recent: [{tn, age}...]}
-        wo_map = {}
-        reader = csv.DictReader(lines)
-        for r in reader:
-            case_ref = r.get('case_ref', '')
-            if not case_ref:
-                continue
-            key = f"{r['sn']}|{case_ref}"
-            if key not in wo_map:
-                wo_map[key] = {'open': [], 'recent': []}
-            entry = {'t': r['tn'], 'a': r.get('age_days', '?')}
-            wo_map[key]['recent'].append(entry)
-            if r['status_name'] in ('Open', 'In Progress'):
-                wo_map[key]['open'].append(entry)
-        
-        total_wos = sum(len(v['recent']) for v in wo_map.values())
-        open_wos = sum(len(v['open']) for v in wo_map.values())
-        print(f'   Case-level WOs: {total_wos} total, {open_wos} open/in-progress, {len(wo_map)} case matches')
-        return wo_map
+        lines = bq_csv(query, params, max_rows=50000, timeout=60)
     except subprocess.TimeoutExpired:
-        print('   \u26a0\ufe0f  BQ case WO query timed out, falling back to store-level')
-        return _load_wo_file()
+        print('   \u26a0\ufe0f  BQ case WO query timed out')
+        return _cached_wo_map(wos, now)
     except Exception as e:
-        print(f'   \u26a0\ufe0f  Case WO pull error: {e}, falling back to store-level')
+        print(f'   \u26a0\ufe0f  BQ case WO query failed: {str(e)[:200]}')
+        return _cached_wo_map(wos, now)
+
+    before, updated = set(wos), 0
+    watermark = cache.get('watermark', '')
+    for r in csv.DictReader(lines):
+        tn = r['tn']
+        if tn in wos:
+            updated += wos[tn]['s'] != r['status_name']
+            wos[tn]['s'] = r['status_name']
+        elif r.get('case_ref'):
+            wos[tn] = {'sn': r['sn'], 'c': r['case_ref'], 's': r['status_name'], 'd': r['call_date']}
+        watermark = max(watermark, r['call_date'])
+    wos = expire_wos(wos, now)
+    added = len(wos.keys() - before)
+    atomic_write_text(WO_CACHE_FILE, dumps({'watermark': watermark, 'stores': stores, 'wos': wos}) + '\n')
+
+    wo_map = build_wo_map(wos, now.date())
+    total_wos = sum(len(v['recent']) for v in wo_map.values())
+    open_wos = sum(len(v['open']) for v in wo_map.values())
+    print(f'   Case-level WOs: {total_wos} total, {open_wos} open/in-progress, {len(wo_map)} case matches '
+          f'({added} new, {updated} status changes since {since:%Y-%m-%d %H:%M})')
+    return wo_map
+
+
+def _cached_wo_map(wos, now):
+    """Fallback: the case↔WO store as of its last pull, else store-level terminal_wos.csv."""
+    if not wos:
+        print('   \u26a0\ufe0f  No case WO cache, falling back to store-level')
         return _load_wo_file()
+    print(f'   Using cached case-level WOs: {len(wos):,} (statuses as of the last pull)')
+    return build_wo_map(wos, now.date())
+
+
+def enrich(rows):
+    """Case-level WOs and Crystal sensor IDs for the terminal cases, pulled concurrently.
+
+    Both lookups are independent BQ round trips, so they run side by side
+    on the store / case lists read from the case rows already loaded.
+    Returns (wo_map, sensor_map).
+    """
+    stores = load_store_numbers(rows)
+    keys = {f"{r['store_number']}|{r['case_name']}" for r in rows}
+    print(f'   Pulling case WOs + Crystal sensor IDs for {len(stores):,} stores...')
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        wo_future = pool.submit(load_wo_map, stores)
+        sensor_future = pool.submit(pull_sensor_ids, keys)
+        return wo_future.result(), sensor_future.result()
 
 
 def _load_wo_file():
@@ -896,15 +1006,7 @@ def main():
         sys.exit(1)
 
     rows = load_csv(DATA_FILE)
-    wo_map = load_wo_map()
-
-    # Pull Crystal sensor IDs (try BQ first, fallback to cached CSV)
-    print('   Pulling Crystal sensor IDs...')
-    sensor_map = pull_sensor_ids()
-    if not sensor_map:
-        sensor_map = load_sensor_map()
-        if sensor_map:
-            print(f'   Using cached sensor IDs: {len(sensor_map):,} mappings')
+    wo_map, sensor_map = enrich(rows)
 
     data = compress(rows)
     # Inject WO tracking numbers and Crystal sensor IDs
@@ -917,6 +1019,15 @@ def main():
         if sid:
             d['sid'] = sid
     run_stamp = rows[0].get('run_stamp', '') if rows else ''
+
+    # Local terminal-state history: fold in this snapshot's day, then derive entries and 7/30/90-day counts
+    try:
+        day = date.fromisoformat(run_stamp[:10]).isoformat()
+    except ValueError:
+        day = date.today().isoformat()
+    history = terminal_history.record(day, {f"{d['sn']}|{d['cn']}" for d in data})
+    for d in data:
+        d.update(terminal_history.case_metrics(history, f"{d['sn']}|{d['cn']}"))
     cases_with_wos = sum(1 for d in data if d['wos'] or d['wos30'])
     total_cases = len(data)
     total_stores = len(set(r['sn'] for r in data))
@@ -928,8 +1039,13 @@ def main():
     print(f'   Stores: {total_stores}')
     print(f'   Run stamp: {run_stamp[:10]}')
 
-    data_json = json.dumps(data, separators=(',', ':'))
+    data.sort(key=store_key('sn', 'cn'))
+    write_jsonl('terminal', data)
+    data_json = dumps_rows(data)
     print(f'   Data size: {len(data_json):,} chars')
+    budget = bundle_size.budget_for('data:TERMINAL_DATA')
+    if len(data_json.encode('utf-8')) > budget:
+        print(f'   \u26a0\ufe0f  TERMINAL_DATA over its {bundle_size.fmt(budget)} size budget')
 
     print('\n\U0001f4dd Reading dashboard HTML...')
     html = DASHBOARD.read_text(encoding='utf-8')
@@ -967,6 +1083,8 @@ def main():
     # Insert JS before </body>
     term_js = build_terminal_js(data_json)
     html = html.replace('</body>', term_js + '\n</body>')
+    html = inject_shared_js(html)
+    html = inject_org_tree(html, 'terminal', data)
 
     if len(html) < 1000000:  # Safety: dashboard should be >1MB
         print('   \u274c HTML too small, aborting write to prevent data loss!')
@@ -1,11 +1,14 @@
 #!/usr/bin/env python3
 """Add Win-the-Winter tab to TNT Dashboard - Enhanced Version"""
 
-import json
 import csv
 import re
+import sys
 from pathlib import Path
-from datetime import datetime
+
+from org_tree import inject_org_tree
+from payload import apply_stamp, data_stamp, dumps, dumps_rows, json_script, store_key, write_jsonl
+from shared_js import inject_shared_js
 
 # Paths
 DASHBOARD_PATH = Path(__file__).parent / 'index.html'
@@ -73,6 +76,10 @@ def main():
             'techs': wo.get('num_techs', ''),
         })
     
+    # Stable order (store, tracking #) so unchanged data rebuilds byte-identical
+    compressed_wtw.sort(key=store_key('s', 't'))
+    write_jsonl('wtw', compressed_wtw)
+    
     # Calculate summary stats with phase breakdown
     phase_counts = {'PH1': 0, 'PH2': 0, 'PH3': 0}
     phase_status = {
@@ -556,8 +563,8 @@ def main():
     wtw_js = f'''
     <script>
     // WTW Data
-    const WTW_DATA = {json.dumps(compressed_wtw, separators=(',', ':'))};
-    const WTW_SUMMARY = {json.dumps(summary, separators=(',', ':'))};
+    // JSON blocks in the tab markup, parsed on first read (initWtwTab)
+    lazyData('WTW_DATA', 'WTW_SUMMARY');
     
     // WTW State
     let wtwCurrentPhase = '';
@@ -600,14 +607,12 @@ def main():
         wtwInitialized = true;
         
         try {{
-            // Populate filter dropdowns
-            console.log('Populating filters...');
-            populateWtwFilters();
             // Initialize charts
             console.log('Initializing charts...');
             initWtwCharts();
-            // Initial data filter
+            // Initial data filter (a shared link's hash state first)
             console.log('Filtering data...');
+            applyWtwState(URL_STATE.read('w'), false);
             filterWtwData();
             console.log('initWtwTab complete!');
         }} catch (e) {{
@@ -615,74 +620,54 @@ def main():
         }}
     }}
     
-    // Populate filter dropdowns dynamically (cascading)
-    function populateWtwFilters() {{
-        updateCascadingFilters();
-    }}
+    STORE_INDEX.register('wtw', () => WTW_DATA, 's');
     
-    function updateCascadingFilters() {{
-        const srDir = document.getElementById('wtwFilterSrDirector').value;
-        const fmDir = document.getElementById('wtwFilterDirector').value;
-        const rm = document.getElementById('wtwFilterManager').value;
-        const fsm = document.getElementById('wtwFilterFSManager').value;
-        const mkt = document.getElementById('wtwFilterMarket').value;
-        
-        const getValidOptions = (excludeField) => {{
-            return WTW_DATA.filter(wo => {{
-                if (excludeField !== 'srd' && srDir && wo.srd !== srDir) return false;
-                if (excludeField !== 'fm' && fmDir && wo.fm !== fmDir) return false;
-                if (excludeField !== 'rm' && rm && wo.rm !== rm) return false;
-                if (excludeField !== 'fsm' && fsm && wo.fsm !== fsm) return false;
-                if (excludeField !== 'mkt' && mkt && wo.mkt !== mkt) return false;
-                return true;
-            }});
-        }};
-        
-        const updateSelect = (id, field, excludeField, currentVal) => {{
-            const sel = document.getElementById(id);
-            const validData = getValidOptions(excludeField);
-            const options = [...new Set(validData.map(wo => wo[field]).filter(Boolean))].sort();
-            sel.innerHTML = '<option value="">All</option>';
-            options.forEach(v => {{
-                const opt = new Option(v, v);
-                if (v === currentVal) opt.selected = true;
-                sel.add(opt);
-            }});
-            if (currentVal && !options.includes(currentVal)) sel.value = '';
-        }};
-        
-        updateSelect('wtwFilterSrDirector', 'srd', 'srd', srDir);
-        updateSelect('wtwFilterDirector', 'fm', 'fm', fmDir);
-        updateSelect('wtwFilterManager', 'rm', 'rm', rm);
-        updateSelect('wtwFilterFSManager', 'fsm', 'fsm', fsm);
-        updateSelect('wtwFilterMarket', 'mkt', 'mkt', mkt);
-    }}
+    // WTW_DATA lives in the compute worker; org dropdowns cascade from ORG_TREE
+    const WTW_ORG_FIELDS = {{ srd: 'wtwFilterSrDirector', fm: 'wtwFilterDirector', rm: 'wtwFilterManager',
+                             fsm: 'wtwFilterFSManager', mkt: 'wtwFilterMarket' }};
+    (() => {{
+        const pmThreshold = wo => (wo.banner || '').includes('Sam') ? 87 : 90;
+        const failCount = wo => [wo.rackP, wo.tntP, wo.dewP].filter(x => x === 'FAIL').length;
+        COMPUTE.define('wtw', () => WTW_DATA, {{
+            fields: ['ph', 'srd', 'fm', 'rm', 'fsm', 'mkt', 'st'],
+            flags: {{
+                // Ready to complete: Not Completed + all PM pass
+                ready: wo => wo.st !== 'COMPLETED' && wo.allP === 'PASS',
+                // Review needed: Completed + PM >= banner threshold but failing 1+ criteria (exclude Div1)
+                review: wo => wo.st === 'COMPLETED' && wo.allP !== 'PASS' && (parseFloat(wo.pm) || 0) >= pmThreshold(wo) && wo.div1 !== 'Y',
+                // Critical reopen: Completed + PM below banner threshold
+                // + failing 2+ of 3 metrics + repair < 8 hrs (exclude Div1)
+                critical: wo => wo.st === 'COMPLETED' && (parseFloat(wo.pm) || 0) < pmThreshold(wo) && failCount(wo) >= 2
+                    && (parseFloat(wo.repH) || 0) < 8 && wo.div1 !== 'Y',
+                div1: wo => wo.div1 === 'Y'
+            }},
+            text: wo => (wo.s + ' ' + wo.city + ' ' + wo.t + ' ' + wo.fm + ' ' + wo.loc).toLowerCase(),
+            block: 'WTW_DATA'
+        }});
+    }})();
     
-    // Set phase filter
-    function setWtwPhase(phase) {{
-        wtwCurrentPhase = phase;
-        // Update button styles
-        document.querySelectorAll('.wtw-phase-btn').forEach(btn => {{
+    // Highlight the active button of a group ('phase', 'status', 'pm')
+    function markWtwButton(group, value) {{
+        document.querySelectorAll('.wtw-' + group + '-btn').forEach(btn => {{
             btn.classList.remove('ring-2', 'ring-offset-2', 'ring-walmart-blue');
         }});
-        const activeBtn = document.getElementById('wtw-phase-' + (phase || 'all'));
+        const activeBtn = document.getElementById('wtw-' + group + '-' + (value || 'all'));
         if (activeBtn) {{
             activeBtn.classList.add('ring-2', 'ring-offset-2', 'ring-walmart-blue');
         }}
+    }}
+    
+    // Set phase filter
+    function setWtwPhase(phase) {{
+        wtwCurrentPhase = phase;
+        markWtwButton('phase', phase);
         filterWtwData();
     }}
     
     // Set status filter (button toggle)
     function setWtwStatus(status) {{
         wtwCurrentStatus = status;
-        // Update button styles
-        document.querySelectorAll('.wtw-status-btn').forEach(btn => {{
-            btn.classList.remove('ring-2', 'ring-offset-2', 'ring-walmart-blue');
-        }});
-        const activeBtn = document.getElementById('wtw-status-' + (status || 'all'));
-        if (activeBtn) {{
-            activeBtn.classList.add('ring-2', 'ring-offset-2', 'ring-walmart-blue');
-        }}
+        markWtwButton('status', status);
         // Clear the dropdown filter to avoid confusion
         document.getElementById('wtwFilterStatus').value = '';
         filterWtwData();
@@ -691,159 +676,210 @@ def main():
     // Set PM readiness filter
     function setWtwPmFilter(filter) {{
         wtwPmFilter = filter;
-        // Update button styles
-        document.querySelectorAll('.wtw-pm-btn').forEach(btn => {{
-            btn.classList.remove('ring-2', 'ring-offset-2', 'ring-walmart-blue');
-        }});
-        const activeBtn = document.getElementById('wtw-pm-' + (filter || 'all'));
-        if (activeBtn) {{
-            activeBtn.classList.add('ring-2', 'ring-offset-2', 'ring-walmart-blue');
-        }}
+        markWtwButton('pm', filter);
         filterWtwData();
     }}
     
     // Clear all WTW filters
     function clearWtwFilters() {{
-        wtwCurrentPhase = '';
-        wtwCurrentStatus = '';
-        wtwPmFilter = '';
-        document.getElementById('wtwFilterSrDirector').value = '';
-        document.getElementById('wtwFilterDirector').value = '';
-        document.getElementById('wtwFilterManager').value = '';
-        document.getElementById('wtwFilterFSManager').value = '';
-        document.getElementById('wtwFilterMarket').value = '';
-        document.getElementById('wtwFilterStatus').value = '';
-        document.getElementById('wtwSearch').value = '';
-        document.querySelectorAll('.wtw-phase-btn').forEach(btn => {{
-            btn.classList.remove('ring-2', 'ring-offset-2', 'ring-walmart-blue');
-        }});
-        document.querySelectorAll('.wtw-status-btn').forEach(btn => {{
-            btn.classList.remove('ring-2', 'ring-offset-2', 'ring-walmart-blue');
-        }});
-        document.querySelectorAll('.wtw-pm-btn').forEach(btn => {{
-            btn.classList.remove('ring-2', 'ring-offset-2', 'ring-walmart-blue');
-        }});
-        document.getElementById('wtw-phase-all').classList.add('ring-2', 'ring-offset-2', 'ring-walmart-blue');
-        document.getElementById('wtw-status-all').classList.add('ring-2', 'ring-offset-2', 'ring-walmart-blue');
-        document.getElementById('wtw-pm-all').classList.add('ring-2', 'ring-offset-2', 'ring-walmart-blue');
-        filterWtwData();
+        applyWtwState({{}});
+    }}
+    
+    // Filter state as stored in the URL hash (w.fm=..., w.ph=PH2, ...) and the result caches
+    function wtwState() {{
+        const state = {{ ph: wtwCurrentPhase, sb: wtwCurrentStatus, pm: wtwPmFilter,
+                        st: document.getElementById('wtwFilterStatus').value,
+                        q: document.getElementById('wtwSearch').value }};
+        Object.entries(WTW_ORG_FIELDS).forEach(([field, id]) => {{ state[field] = document.getElementById(id).value; }});
+        return state;
+    }}
+    
+    function applyWtwState(state, refilter = true) {{
+        wtwCurrentPhase = state.ph || '';
+        wtwCurrentStatus = state.sb || '';
+        wtwPmFilter = state.pm || '';
+        markWtwButton('phase', wtwCurrentPhase);
+        markWtwButton('status', wtwCurrentStatus);
+        markWtwButton('pm', wtwPmFilter);
+        Object.entries(WTW_ORG_FIELDS).forEach(([field, id]) => UrlState.setSelect(id, state[field]));
+        UrlState.setSelect('wtwFilterStatus', state.st);
+        document.getElementById('wtwSearch').value = state.q || '';
+        if (refilter) filterWtwData();
     }}
     
+    URL_STATE.register('w', {{ tab: 'wtw', read: wtwState, apply: applyWtwState, ready: () => wtwInitialized }});
+    
     // Filter WTW data
     function filterWtwData() {{
-        const srDir = document.getElementById('wtwFilterSrDirector').value;
-        const fmDir = document.getElementById('wtwFilterDirector').value;
-        const rm = document.getElementById('wtwFilterManager').value;
-        const fsm = document.getElementById('wtwFilterFSManager').value;
-        const mkt = document.getElementById('wtwFilterMarket').value;
+        // Each org dropdown keeps the values that still have work orders under the other selections
+        ORG_TREE.cascade('wtw', WTW_ORG_FIELDS);
+        const org = {{}};
+        Object.entries(WTW_ORG_FIELDS).forEach(([field, id]) => {{ org[field] = document.getElementById(id).value; }});
         const status = document.getElementById('wtwFilterStatus').value;
         const search = document.getElementById('wtwSearch').value.toLowerCase();
+        const key = canonicalState(wtwState());
+        URL_STATE.save('w');
         
-        wtwFilteredData = WTW_DATA.filter(wo => {{
-            if (wtwCurrentPhase && wo.ph !== wtwCurrentPhase) return false;
-            if (srDir && wo.srd !== srDir) return false;
-            if (fmDir && wo.fm !== fmDir) return false;
-            if (rm && wo.rm !== rm) return false;
-            if (fsm && wo.fsm !== fsm) return false;
-            if (mkt && wo.mkt !== mkt) return false;
-            // Status button filter (takes priority)
-            if (wtwCurrentStatus === 'COMPLETED' && wo.st !== 'COMPLETED') return false;
-            if (wtwCurrentStatus === 'IN_PROGRESS' && wo.st !== 'IN PROGRESS') return false;
-            if (wtwCurrentStatus === 'OPEN' && wo.st !== 'OPEN') return false;
-            // Dropdown filter (if no button selected)
-            if (!wtwCurrentStatus && status) {{
-                if (wo.st !== status) return false;
-            }}
-            if (search) {{
-                const searchStr = (wo.s + ' ' + wo.city + ' ' + wo.t + ' ' + wo.fm + ' ' + wo.loc).toLowerCase();
-                if (!searchStr.includes(search)) return false;
-            }}
-            // PM Readiness filter
-            if (wtwPmFilter === 'ready') {{
-                // Ready to complete: Not Completed + all PM pass
-                if (wo.st === 'COMPLETED' || wo.allP !== 'PASS') return false;
-            }}
-            if (wtwPmFilter === 'review') {{
-                // Review needed: Completed + PM >= banner threshold but failing 1+ criteria (exclude Div1)
-                const pmScore = parseFloat(wo.pm) || 0;
-                const isSams = (wo.banner || '').includes('Sam');
-                const threshold = isSams ? 87 : 90;
-                if (wo.st !== 'COMPLETED' || wo.allP === 'PASS' || pmScore < threshold || wo.div1 === 'Y') return false;
+        // Status button takes priority over the dropdown
+        const statusBtn = {{ COMPLETED: 'COMPLETED', IN_PROGRESS: 'IN PROGRESS', OPEN: 'OPEN' }}[wtwCurrentStatus];
+        COMPUTE.query('wtw', {{
+            clauses: {{ ...org, ph: wtwCurrentPhase, st: wtwCurrentStatus ? (statusBtn || '') : status }},
+            flags: wtwPmFilter ? [wtwPmFilter] : [],
+            text: search,
+            channel: 'wtw'
+        }}).then(res => {{
+            if (!res) return;  // superseded by a newer filter change
+            wtwFilteredData = res.rows;
+            wtwIds = res.ids;
+            wtwKey = key;
+            wtwMarks = new Uint8Array(WTW_DATA.length);
+            res.ids.forEach(i => {{ wtwMarks[i] = 1; }});
+            wtwVersion++;
+            wtwView.invalidate();
+        }});
+    }}
+    
+    // ── One fused pass per filter change; each widget re-renders only if its numbers changed ──
+    let wtwIds = null;                 // WTW_DATA indexes of wtwFilteredData
+    let wtwMarks = new Uint8Array(0);  // 1 = WTW_DATA[i] is in wtwFilteredData
+    let wtwVersion = 0;                // bumps whenever wtwFilteredData is replaced
+    let wtwKey = '';                   // canonical filter state of wtwFilteredData
+    const WTW_MODELS = new LruCache('wtw model', 16);
+    
+    const wtwView = new RenderScheduler(computeWtwModel, {{
+        kpis: {{ select: m => m.kpis, render: renderWtwKpis }},
+        phaseCards: {{ select: m => m.phases, render: renderPhaseCards }},
+        pmButtons: {{ select: m => m.pm, render: renderPmButtons }},
+        charts: {{ select: m => m.charts, render: updateWtwCharts }},
+        table: {{ select: m => [m.version, wtwSortField, wtwSortAsc], render: renderWtwTable }},
+        fsmTable: {{ select: m => [m.fsmRows, fsmSortField, fsmSortDesc], render: ([rows]) => {{
+            if (rows !== fsmRowsData) {{ fsmRowsData = rows; fsmSort = new SortCache(() => rows, COMPLETION_SORT); }}
+            renderFsmTable();
+        }} }},
+        rfmTable: {{ select: m => [m.rfmRows, rfmSortField, rfmSortDesc], render: ([rows]) => {{
+            if (rows !== rfmRowsData) {{ rfmRowsData = rows; rfmSort = new SortCache(() => rows, COMPLETION_SORT); }}
+            renderRfmTable();
+        }} }},
+        dirSummary: {{ select: m => [m.dir, dirSummarySortField, dirSummarySortAsc], render: ([dir]) => renderDirSummary(dir) }}
+    }});
+    
+    // Models are cached per filter state: revisiting a state (back/forward, toggling a button
+    // off and on) skips the pass and hands the widgets the same slices, so nothing re-renders
+    function computeWtwModel() {{
+        if (!wtwIds) return buildWtwModel();
+        const cached = WTW_MODELS.get(wtwKey);
+        if (cached) return {{ ...cached, version: wtwVersion }};
+        return WTW_MODELS.set(wtwKey, buildWtwModel());
+    }}
+    
+    function buildWtwModel() {{
+        // Completion tables only respond to the Sr Dir & FM Dir filters
+        const srDir = document.getElementById('wtwFilterSrDirector').value;
+        const fmDir = document.getElementById('wtwFilterDirector').value;
+        const statusCounts = () => ({{ total: 0, 'COMPLETED': 0, 'IN PROGRESS': 0, 'OPEN': 0 }});
+        const phases = {{ all: statusCounts(), PH1: statusCounts(), PH2: statusCounts(), PH3: statusCounts() }};
+        const labor = {{ totalHrs: 0, repairHrs: 0, travelHrs: 0, totalVisits: 0, wosWithHrs: 0 }};
+        const pm = {{ total: 0, ready: 0, review: 0, critical: 0 }};
+        const fsmStats = {{}}, rfmStats = {{}};
+        const drMap = {{}}, dirTotals = {{}};
+        const byPhase = () => ({{ PH1: {{ total: 0, completed: 0 }}, PH2: {{ total: 0, completed: 0 }}, PH3: {{ total: 0, completed: 0 }} }});
+        const dirRow = (name, region) => ({{ name, region, total: 0, completed: 0, ip: 0, stores: new Set(),
+            hours: 0, ready: 0, ph1: 0, ph1Done: 0, ph2: 0, ph2Done: 0, ph3: 0, ph3Done: 0 }});
+        
+        for (let i = 0; i < WTW_DATA.length; i++) {{
+            const wo = WTW_DATA[i];
+            const done = wo.st === 'COMPLETED';
+            if ((!srDir || wo.srd === srDir) && (!fmDir || wo.fm === fmDir)) {{
+                const f = fsmStats[wo.fsm || 'Unknown'] || (fsmStats[wo.fsm || 'Unknown'] = byPhase());
+                const r = rfmStats[wo.rm || 'Unknown'] || (rfmStats[wo.rm || 'Unknown'] = byPhase());
+                if (f[wo.ph]) {{ f[wo.ph].total++; if (done) f[wo.ph].completed++; }}
+                if (r[wo.ph]) {{ r[wo.ph].total++; if (done) r[wo.ph].completed++; }}
             }}
-            if (wtwPmFilter === 'critical') {{
-                // Critical reopen: Completed + PM below banner threshold
-                // + failing 2+ of 3 metrics + repair < 8 hrs (exclude Div1)
+            if (!wtwMarks[i]) continue;
+            
+            // Status / phase counts
+            const st = done || wo.st === 'IN PROGRESS' ? wo.st : 'OPEN';
+            phases.all.total++; phases.all[st]++;
+            if (phases[wo.ph]) {{ phases[wo.ph].total++; phases[wo.ph][st]++; }}
+            
+            // Labor hours
+            const tot = parseFloat(wo.totH) || 0;
+            labor.totalHrs += tot;
+            labor.repairHrs += parseFloat(wo.repH) || 0;
+            labor.travelHrs += parseFloat(wo.trvH) || 0;
+            labor.totalVisits += parseInt(wo.vis) || 0;
+            if (tot > 0) labor.wosWithHrs++;
+            
+            // PM readiness buttons
+            pm.total++;
+            const isDiv1 = wo.div1 === 'Y';
+            if (!done && wo.allP === 'PASS') pm.ready++;
+            if (done && wo.allP === 'FAIL' && !isDiv1) {{
                 const pmScore = parseFloat(wo.pm) || 0;
-                const isSams = (wo.banner || '').includes('Sam');
-                const threshold = isSams ? 87 : 90;
+                const threshold = (wo.banner || '').includes('Sam') ? 87 : 90;
                 const failCount = [wo.rackP, wo.tntP, wo.dewP].filter(x => x === 'FAIL').length;
-                const repairHrs = parseFloat(wo.repH) || 0;
-                if (wo.st !== 'COMPLETED' || pmScore >= threshold || failCount < 2 || repairHrs >= 8 || wo.div1 === 'Y') return false;
+                if (pmScore < threshold && failCount >= 2 && (parseFloat(wo.repH) || 0) < 8) pm.critical++;  // PM below banner threshold + 2+ fails + <8 repair hrs
+                else if (pmScore >= threshold) pm.review++;  // PM above threshold but failing 1+ criteria
             }}
-            if (wtwPmFilter === 'div1') {{
-                // Div1 stores only
-                if (wo.div1 !== 'Y') return false;
+            
+            // Director x realty region matrix
+            const dir = wo.fm || 'Unknown';
+            const region = storeRegionMap[wo.s] || '\u2014';
+            const key = dir + '||' + region;
+            const d = drMap[key] || (drMap[key] = dirRow(dir, region));
+            const dt = dirTotals[dir] || (dirTotals[dir] = dirRow(dir));
+            for (const x of [d, dt]) {{
+                x.total++;
+                x.stores.add(wo.s);
+                if (done) x.completed++;
+                else if (wo.st === 'IN PROGRESS') {{ x.ip++; if (wo.allP === 'PASS') x.ready++; }}
+                x.hours += tot;
+                if (wo.ph === 'PH1') {{ x.ph1++; if (done) x.ph1Done++; }}
+                if (wo.ph === 'PH2') {{ x.ph2++; if (done) x.ph2Done++; }}
+                if (wo.ph === 'PH3') {{ x.ph3++; if (done) x.ph3Done++; }}
             }}
-            return true;
-        }});
-        
-        // Update filtered count
-        document.getElementById('wtwFilteredCount').textContent = wtwFilteredData.length.toLocaleString();
-        
-        // Update cascading filter dropdowns
-        updateCascadingFilters();
-        
-        // Update KPIs based on filtered data
-        updateWtwKpis();
-        
-        // Update phase cards based on filtered data
-        updatePhaseCards();
-        
-        // Update PM readiness buttons based on filtered data
-        updatePmButtons();
-        
-        // Update charts
-        updateWtwCharts();
-        
-        // Render table
-        renderWtwTable();
+        }}
         
-        // Update completion tables (only responds to Sr Dir & FM Dir filters)
-        updateCompletionTables();
+        // Sets → counts so the model compares structurally
+        const dirRegions = {{}};
+        Object.values(drMap).forEach(d => {{
+            d.storeCount = d.stores.size; delete d.stores;
+            (dirRegions[d.name] || (dirRegions[d.name] = [])).push(d.region);
+        }});
+        Object.values(dirTotals).forEach(d => {{
+            d.storeCount = d.stores.size; delete d.stores;
+            d.regionCount = (dirRegions[d.name] || []).length;
+        }});
         
-        // Update director summary table
-        updateDirSummary();
+        const ps = ph => phases[ph];
+        return {{
+            version: wtwVersion,
+            kpis: {{ completed: phases.all['COMPLETED'], inProgress: phases.all['IN PROGRESS'], open: phases.all['OPEN'],
+                    total: phases.all.total, labor }},
+            phases,
+            pm,
+            charts: {{
+                status: [phases.all['COMPLETED'], phases.all['IN PROGRESS'], phases.all['OPEN']],
+                phase: ['COMPLETED', 'IN PROGRESS', 'OPEN'].map(st => ['PH1', 'PH2', 'PH3'].map(ph => ps(ph)[st]))
+            }},
+            fsmRows: completionRows(fsmStats),
+            rfmRows: completionRows(rfmStats),
+            dir: {{ drMap, dirTotals, dirRegions }}
+        }};
     }}
     
     // Update KPIs
-    function updateWtwKpis() {{
-        const counts = {{'COMPLETED': 0, 'IN PROGRESS': 0, 'OPEN': 0}};
-        wtwFilteredData.forEach(wo => {{
-            if (wo.st === 'COMPLETED') counts['COMPLETED']++;
-            else if (wo.st === 'IN PROGRESS') counts['IN PROGRESS']++;
-            else counts['OPEN']++;
-        }});
-        const total = wtwFilteredData.length;
-        const completionRate = total > 0 ? ((counts['COMPLETED'] / total) * 100).toFixed(1) : 0;
-        document.getElementById('wtwKpiCompleted').textContent = counts['COMPLETED'].toLocaleString();
+    function renderWtwKpis(k) {{
+        const completionRate = k.total > 0 ? ((k.completed / k.total) * 100).toFixed(1) : 0;
+        document.getElementById('wtwFilteredCount').textContent = k.total.toLocaleString();
+        document.getElementById('wtwKpiCompleted').textContent = k.completed.toLocaleString();
         document.getElementById('wtwKpiCompletionRate').textContent = completionRate + '% complete';
-        document.getElementById('wtwKpiInProgress').textContent = counts['IN PROGRESS'].toLocaleString();
-        document.getElementById('wtwKpiOpen').textContent = counts['OPEN'].toLocaleString();
-        document.getElementById('wtwKpiTotal').textContent = total.toLocaleString();
+        document.getElementById('wtwKpiInProgress').textContent = k.inProgress.toLocaleString();
+        document.getElementById('wtwKpiOpen').textContent = k.open.toLocaleString();
+        document.getElementById('wtwKpiTotal').textContent = k.total.toLocaleString();
         
         // Labor hours KPIs
-        let totalHrs = 0, repairHrs = 0, travelHrs = 0, totalVisits = 0, wosWithHrs = 0;
-        wtwFilteredData.forEach(wo => {{
-            const tot = parseFloat(wo.totH) || 0;
-            const rep = parseFloat(wo.repH) || 0;
-            const trv = parseFloat(wo.trvH) || 0;
-            const vis = parseInt(wo.vis) || 0;
-            totalHrs += tot;
-            repairHrs += rep;
-            travelHrs += trv;
-            totalVisits += vis;
-            if (tot > 0) wosWithHrs++;
-        }});
+        const {{ totalHrs, repairHrs, travelHrs, totalVisits, wosWithHrs }} = k.labor;
         const avgHrs = wosWithHrs > 0 ? (totalHrs / wosWithHrs).toFixed(1) : 0;
         const avgVisits = wosWithHrs > 0 ? (totalVisits / wosWithHrs).toFixed(1) : 0;
         document.getElementById('wtwKpiTotalHrs').textContent = Math.round(totalHrs).toLocaleString();
@@ -855,32 +891,7 @@ def main():
     }}
     
     // Update Phase Cards based on filtered data
-    function updatePhaseCards() {{
-        // Calculate phase stats from filtered data
-        const phaseStats = {{
-            'all': {{'total': 0, 'COMPLETED': 0, 'IN PROGRESS': 0, 'OPEN': 0}},
-            'PH1': {{'total': 0, 'COMPLETED': 0, 'IN PROGRESS': 0, 'OPEN': 0}},
-            'PH2': {{'total': 0, 'COMPLETED': 0, 'IN PROGRESS': 0, 'OPEN': 0}},
-            'PH3': {{'total': 0, 'COMPLETED': 0, 'IN PROGRESS': 0, 'OPEN': 0}}
-        }};
-        
-        wtwFilteredData.forEach(wo => {{
-            const ph = wo.ph;
-            const st = wo.st;
-            phaseStats['all'].total++;
-            phaseStats[ph].total++;
-            if (st === 'COMPLETED') {{
-                phaseStats['all']['COMPLETED']++;
-                phaseStats[ph]['COMPLETED']++;
-            }} else if (st === 'IN PROGRESS') {{
-                phaseStats['all']['IN PROGRESS']++;
-                phaseStats[ph]['IN PROGRESS']++;
-            }} else {{
-                phaseStats['all']['OPEN']++;
-                phaseStats[ph]['OPEN']++;
-            }}
-        }});
-        
+    function renderPhaseCards(phaseStats) {{
         // Update each phase card
         ['all', 'PH1', 'PH2', 'PH3'].forEach(phase => {{
             const stats = phaseStats[phase];
@@ -911,40 +922,11 @@ def main():
     }}
     
     // Update PM Readiness button counts based on filtered data
-    function updatePmButtons() {{
-        let ready = 0, review = 0, critical = 0, div1 = 0;
-        const total = wtwFilteredData.length;
-        
-        wtwFilteredData.forEach(wo => {{
-            const pmScore = parseFloat(wo.pm) || 0;
-            const isDiv1 = wo.div1 === 'Y';
-            
-            if (isDiv1) {{
-                div1++;
-            }}
-            
-            if (wo.st !== 'COMPLETED' && wo.allP === 'PASS') {{
-                ready++;
-            }}
-            
-            if (wo.st === 'COMPLETED' && wo.allP === 'FAIL' && !isDiv1) {{
-                const isSams = (wo.banner || '').includes('Sam');
-                const threshold = isSams ? 87 : 90;
-                const failCount = [wo.rackP, wo.tntP, wo.dewP].filter(x => x === 'FAIL').length;
-                const repairHrs = parseFloat(wo.repH) || 0;
-                if (pmScore < threshold && failCount >= 2 && repairHrs < 8) {{
-                    critical++;  // PM below banner threshold + 2+ fails + <8 repair hrs
-                }} else if (pmScore >= threshold) {{
-                    review++;  // PM above threshold but failing 1+ criteria
-                }}
-            }}
-        }});
-        
-        // Update button counts
-        document.getElementById('wtw-pm-all-count').textContent = total.toLocaleString();
-        document.getElementById('wtw-pm-ready-count').textContent = ready.toLocaleString();
-        document.getElementById('wtw-pm-review-count').textContent = review.toLocaleString();
-        document.getElementById('wtw-pm-critical-count').textContent = critical.toLocaleString();
+    function renderPmButtons(pm) {{
+        document.getElementById('wtw-pm-all-count').textContent = pm.total.toLocaleString();
+        document.getElementById('wtw-pm-ready-count').textContent = pm.ready.toLocaleString();
+        document.getElementById('wtw-pm-review-count').textContent = pm.review.toLocaleString();
+        document.getElementById('wtw-pm-critical-count').textContent = pm.critical.toLocaleString();
     }}
     
     // Sort WTW table
@@ -955,7 +937,7 @@ def main():
             wtwSortField = field;
             wtwSortAsc = true;
         }}
-        renderWtwTable();
+        wtwView.invalidate(false);
     }}
     
     // Render WTW table
@@ -1004,136 +986,133 @@ def main():
     
     function renderWtwTable() {{
         console.log('renderWtwTable called, data count:', wtwFilteredData.length);
-        // Sort data
-        const sorted = [...wtwFilteredData].sort((a, b) => {{
-            let aVal = a[wtwSortField] || '';
-            let bVal = b[wtwSortField] || '';
-            if (['s', 'totH', 'vis', 'pm', 'rack', 'tnt'].includes(wtwSortField)) {{
-                aVal = parseFloat(aVal) || 0;
-                bVal = parseFloat(bVal) || 0;
-            }}
-            if (aVal < bVal) return wtwSortAsc ? -1 : 1;
-            if (aVal > bVal) return wtwSortAsc ? 1 : -1;
-            return 0;
+        getWtwTable().setRows(wtwSort.sorted(wtwSortField, wtwSortAsc, wtwIds));
+    }}
+    
+    // Column orders over all of WTW_DATA, built on first use; the filtered view is a linear walk
+    const wtwSort = new SortCache(() => WTW_DATA, {{
+        s: 'num', totH: 'num', vis: 'num', pm: 'num', rack: 'num', tnt: 'num',
+        exp: 'date', banner: 'str', est: 'str', ph: 'str'
+    }}, 'WTW_DATA');
+
+    // One virtualized table for the WO list (rows are drawn on demand while scrolling)
+    let wtwTable = null;
+    function getWtwTable() {{
+        if (!wtwTable) wtwTable = new VirtualTable('wtwWoTable', {{
+            colspan: 15,
+            rowHeight: 49,
+            rowClass: wo => `hover:bg-gray-50 ${{wo.div1 === 'Y' ? 'bg-orange-50' : ''}}`,
+            row: wtwRowHtml,
         }});
-        
-        // Limit display
-        const display = sorted.slice(0, 300);
-        
-        const table = document.getElementById('wtwWoTable');
-        table.innerHTML = display.map(wo => {{
-            const phaseClass = wo.ph === 'PH1' ? 'bg-blue-100 text-blue-800' : 
-                               wo.ph === 'PH2' ? 'bg-green-100 text-green-800' : 
-                               'bg-purple-100 text-purple-800';
-            const statusClass = wo.st === 'COMPLETED' ? 'text-green-600 font-semibold' : 
-                               wo.st === 'IN PROGRESS' ? 'text-yellow-600 font-semibold' : 'text-gray-600';
-            const statusText = wo.st === 'COMPLETED' ? '✓ COMPLETED' : wo.st;
-            const div1Badge = wo.div1 === 'Y' ? '<span class="ml-1 px-1 py-0.5 rounded text-xs bg-orange-100 text-orange-700" title="Div1 - Small format store">D1</span>' : '';
-            return `
-                <tr class="hover:bg-gray-50 ${{wo.div1 === 'Y' ? 'bg-orange-50' : ''}}">
-                    <td class="px-3 py-2 text-sm font-medium text-walmart-blue">${{wo.s}}${{div1Badge}}</td>
-                    <td class="px-3 py-2 text-sm text-gray-600">${{wo.city}}${{wo.city && wo.state ? ', ' : ''}}${{wo.state}}</td>
-                    <td class="px-3 py-2 text-center">
-                        <span class="px-2 py-1 rounded-full text-xs font-semibold ${{phaseClass}}">${{wo.ph}}</span>
-                    </td>
-                    <td class="px-3 py-2 text-sm ${{statusClass}}">${{statusText}}</td>
-                    <td class="px-3 py-2 text-center">
-                        ${{wo.banner && wo.banner.includes('Sam') ? 
-                            '<span class="px-2 py-0.5 rounded text-xs font-semibold bg-blue-800 text-white">Sam&#39;s</span>' : 
-                            '<span class="px-2 py-0.5 rounded text-xs font-semibold bg-yellow-400 text-blue-900">WM</span>'}}
-                    </td>
-                    <td class="px-3 py-2 text-sm text-gray-600">
-                        <div class="flex items-center gap-1">
-                            <span>${{wo.rm || '-'}}</span>
-                            ${{wo.rm ? `<a href="${{buildMailto(wo.rm, 'RM', wo)}}" class="inline-flex items-center justify-center w-6 h-6 rounded hover:bg-blue-100" title="Email ${{wo.rm}} about Store ${{wo.s}}"><svg width="16" height="16" viewBox="0 0 32 32" fill="none"><rect x="2" y="6" width="28" height="20" rx="2" fill="#0078d4"/><path d="M2 8l14 9 14-9" stroke="#fff" stroke-width="2" fill="none"/><rect x="18" y="15" width="12" height="11" rx="1" fill="#0053e2"/></svg></a>` : ''}}
-                        </div>
-                    </td>
-                    <td class="px-3 py-2 text-sm text-gray-600">
-                        <div class="flex items-center gap-1">
-                            <span>${{wo.fsm || '-'}}</span>
-                            ${{wo.fsm && !wo.fsm.includes('-FS') ? `<a href="${{buildMailto(wo.fsm, 'FSM', wo)}}" class="inline-flex items-center justify-center w-6 h-6 rounded hover:bg-blue-100" title="Email ${{wo.fsm}} about Store ${{wo.s}}"><svg width="16" height="16" viewBox="0 0 32 32" fill="none"><rect x="2" y="6" width="28" height="20" rx="2" fill="#0078d4"/><path d="M2 8l14 9 14-9" stroke="#fff" stroke-width="2" fill="none"/><rect x="18" y="15" width="12" height="11" rx="1" fill="#0053e2"/></svg></a>` : ''}}
-                        </div>
-                    </td>
-                    <td class="px-3 py-2 text-sm text-center">
-                        ${{wo.pm ? `
-                            <div class="flex items-center justify-center gap-1">
-                                <span class="px-2 py-1 rounded text-xs font-bold ${{parseFloat(wo.pm) >= 87 ? 'bg-green-500 text-white' : 'bg-red-500 text-white'}}">
-                                    ${{parseFloat(wo.pm).toFixed(1)}}%
-                                </span>
-                                <span class="text-sm ${{parseFloat(wo.pm) >= 87 ? 'text-green-600' : 'text-red-600'}}">
-                                    ${{parseFloat(wo.pm) >= 87 ? '✓' : '✗'}}
-                                </span>
-                            </div>
-                        ` : '-'}}
-                    </td>
-                    <td class="px-3 py-2 text-sm text-center">
-                        ${{wo.rackP === 'NO DATA' ? `
-                            <span class="px-2 py-0.5 rounded text-xs bg-gray-100 text-gray-500">No Data</span>
-                        ` : wo.rack ? `
-                            <span class="px-2 py-0.5 rounded text-xs ${{wo.rackP === 'PASS' ? 'bg-green-100 text-green-800' : 'bg-red-100 text-red-800'}}">
-                                ${{parseFloat(wo.rack).toFixed(1)}}% ${{wo.rackP === 'PASS' ? '✓' : '✗'}}
-                            </span>
-                        ` : '-'}}
-                    </td>
-                    <td class="px-3 py-2 text-sm text-center">
-                        ${{wo.tntP === 'NO DATA' ? `
-                            <span class="px-2 py-0.5 rounded text-xs bg-gray-100 text-gray-500">No Data</span>
-                        ` : wo.tnt ? `
-                            <span class="px-2 py-0.5 rounded text-xs ${{wo.tntP === 'PASS' ? 'bg-green-100 text-green-800' : 'bg-red-100 text-red-800'}}">
-                                ${{parseFloat(wo.tnt).toFixed(1)}}% ${{wo.tntP === 'PASS' ? '✓' : '✗'}}
-                            </span>
-                        ` : '-'}}
-                    </td>
-                    <td class="px-3 py-2 text-sm text-center">
-                        ${{wo.dewP === 'NO DATA' ? `
-                            <span class="px-2 py-0.5 rounded text-xs bg-gray-100 text-gray-500">No Data</span>
-                        ` : wo.dew ? `
-                            <span class="px-2 py-0.5 rounded text-xs ${{wo.dewP === 'PASS' ? 'bg-green-100 text-green-800' : 'bg-red-100 text-red-800'}}">
-                                ${{parseFloat(wo.dew).toFixed(0)}}°F ${{wo.dewP === 'PASS' ? '✓' : '✗'}}
-                            </span>
-                        ` : '-'}}
-                    </td>
-                    <td class="px-3 py-2 text-sm text-center">
-                        ${{wo.totH ? `
-                            <div class="text-xs">
-                                <span class="font-bold text-gray-800">${{parseFloat(wo.totH).toFixed(1)}}</span>
-                                <span class="text-gray-400">hrs</span>
-                            </div>
-                            <div class="text-xs text-gray-400">
-                                R:${{parseFloat(wo.repH || 0).toFixed(0)}} T:${{parseFloat(wo.trvH || 0).toFixed(0)}}
-                            </div>
-                        ` : '<span class="text-gray-300">—</span>'}}
-                    </td>
-                    <td class="px-3 py-2 text-sm text-center">
-                        ${{wo.vis ? `
-                            <span class="font-semibold text-gray-700">${{wo.vis}}</span>
-                            <span class="text-xs text-gray-400">${{wo.techs ? '/ ' + wo.techs + ' tech' + (parseInt(wo.techs) > 1 ? 's' : '') : ''}}</span>
-                        ` : '<span class="text-gray-300">—</span>'}}
-                    </td>
-                    <td class="px-3 py-2 text-sm text-center text-gray-500">${{wo.exp}}</td>
-                    <td class="px-3 py-2 text-sm text-center">
-                        <div class="flex gap-2 justify-center">
-                            <a href="${{SC_URL}}${{wo.t}}" target="_blank" 
-                               class="text-walmart-blue hover:underline text-xs" title="Service Channel">
-                                SC \u2197
-                            </a>
-                            <a href="https://crystal.walmart.com/us/stores/search/${{wo.s}}" target="_blank" 
-                               class="text-green-600 hover:underline text-xs" title="Crystal Store">
-                                Crystal \u2197
-                            </a>
-                            <a href="https://crystal.walmart.com/us/reports/custom-reports/46?report-name=win-the-winter---store-details&report-filters=Store%2520Number%255B0%255D%3D${{wo.s}}" target="_blank" 
-                               class="text-purple-600 hover:underline text-xs" title="WTW Report">
-                                WTW \u2197
-                            </a>
-                        </div>
-                    </td>
-                </tr>
-            `;
-        }}).join('');
-        
-        if (sorted.length > 300) {{
-            table.innerHTML += `<tr><td colspan="15" class="px-3 py-3 text-center text-gray-400 text-sm bg-gray-50">Showing 300 of ${{sorted.length.toLocaleString()}} results. Use filters to narrow down.</td></tr>`;
-        }}
+        return wtwTable;
+    }}
+
+    function wtwRowHtml(wo) {{
+        const phaseClass = wo.ph === 'PH1' ? 'bg-blue-100 text-blue-800' : 
+                           wo.ph === 'PH2' ? 'bg-green-100 text-green-800' : 
+                           'bg-purple-100 text-purple-800';
+        const statusClass = wo.st === 'COMPLETED' ? 'text-green-600 font-semibold' : 
+                           wo.st === 'IN PROGRESS' ? 'text-yellow-600 font-semibold' : 'text-gray-600';
+        const statusText = wo.st === 'COMPLETED' ? '✓ COMPLETED' : wo.st;
+        const div1Badge = wo.div1 === 'Y' ? '<span class="ml-1 px-1 py-0.5 rounded text-xs bg-orange-100 text-orange-700" title="Div1 - Small format store">D1</span>' : '';
+        return `
+            <td class="px-3 py-2 text-sm font-medium text-walmart-blue">${{wo.s}}${{div1Badge}}</td>
+            <td class="px-3 py-2 text-sm text-gray-600">${{wo.city}}${{wo.city && wo.state ? ', ' : ''}}${{wo.state}}</td>
+            <td class="px-3 py-2 text-center">
+                <span class="px-2 py-1 rounded-full text-xs font-semibold ${{phaseClass}}">${{wo.ph}}</span>
+            </td>
+            <td class="px-3 py-2 text-sm ${{statusClass}}">${{statusText}}</td>
+            <td class="px-3 py-2 text-center">
+                ${{wo.banner && wo.banner.includes('Sam') ? 
+                    '<span class="px-2 py-0.5 rounded text-xs font-semibold bg-blue-800 text-white">Sam&#39;s</span>' : 
+                    '<span class="px-2 py-0.5 rounded text-xs font-semibold bg-yellow-400 text-blue-900">WM</span>'}}
+            </td>
+            <td class="px-3 py-2 text-sm text-gray-600">
+                <div class="flex items-center gap-1">
+                    <span>${{wo.rm || '-'}}</span>
+                    ${{wo.rm ? `<a href="${{buildMailto(wo.rm, 'RM', wo)}}" class="inline-flex items-center justify-center w-6 h-6 rounded hover:bg-blue-100" title="Email ${{wo.rm}} about Store ${{wo.s}}"><svg width="16" height="16" viewBox="0 0 32 32" fill="none"><rect x="2" y="6" width="28" height="20" rx="2" fill="#0078d4"/><path d="M2 8l14 9 14-9" stroke="#fff" stroke-width="2" fill="none"/><rect x="18" y="15" width="12" height="11" rx="1" fill="#0053e2"/></svg></a>` : ''}}
+                </div>
+            </td>
+            <td class="px-3 py-2 text-sm text-gray-600">
+                <div class="flex items-center gap-1">
+                    <span>${{wo.fsm || '-'}}</span>
+                    ${{wo.fsm && !wo.fsm.includes('-FS') ? `<a href="${{buildMailto(wo.fsm, 'FSM', wo)}}" class="inline-flex items-center justify-center w-6 h-6 rounded hover:bg-blue-100" title="Email ${{wo.fsm}} about Store ${{wo.s}}"><svg width="16" height="16" viewBox="0 0 32 32" fill="none"><rect x="2" y="6" width="28" height="20" rx="2" fill="#0078d4"/><path d="M2 8l14 9 14-9" stroke="#fff" stroke-width="2" fill="none"/><rect x="18" y="15" width="12" height="11" rx="1" fill="#0053e2"/></svg></a>` : ''}}
+                </div>
+            </td>
+            <td class="px-3 py-2 text-sm text-center">
+                ${{wo.pm ? `
+                    <div class="flex items-center justify-center gap-1">
+                        <span class="px-2 py-1 rounded text-xs font-bold ${{parseFloat(wo.pm) >= 87 ? 'bg-green-500 text-white' : 'bg-red-500 text-white'}}">
+                            ${{parseFloat(wo.pm).toFixed(1)}}%
+                        </span>
+                        <span class="text-sm ${{parseFloat(wo.pm) >= 87 ? 'text-green-600' : 'text-red-600'}}">
+                            ${{parseFloat(wo.pm) >= 87 ? '✓' : '✗'}}
+                        </span>
+                    </div>
+                ` : '-'}}
+            </td>
+            <td class="px-3 py-2 text-sm text-center">
+                ${{wo.rackP === 'NO DATA' ? `
+                    <span class="px-2 py-0.5 rounded text-xs bg-gray-100 text-gray-500">No Data</span>
+                ` : wo.rack ? `
+                    <span class="px-2 py-0.5 rounded text-xs ${{wo.rackP === 'PASS' ? 'bg-green-100 text-green-800' : 'bg-red-100 text-red-800'}}">
+                        ${{parseFloat(wo.rack).toFixed(1)}}% ${{wo.rackP === 'PASS' ? '✓' : '✗'}}
+                    </span>
+                ` : '-'}}
+            </td>
+            <td class="px-3 py-2 text-sm text-center">
+                ${{wo.tntP === 'NO DATA' ? `
+                    <span class="px-2 py-0.5 rounded text-xs bg-gray-100 text-gray-500">No Data</span>
+                ` : wo.tnt ? `
+                    <span class="px-2 py-0.5 rounded text-xs ${{wo.tntP === 'PASS' ? 'bg-green-100 text-green-800' : 'bg-red-100 text-red-800'}}">
+                        ${{parseFloat(wo.tnt).toFixed(1)}}% ${{wo.tntP === 'PASS' ? '✓' : '✗'}}
+                    </span>
+                ` : '-'}}
+            </td>
+            <td class="px-3 py-2 text-sm text-center">
+                ${{wo.dewP === 'NO DATA' ? `
+                    <span class="px-2 py-0.5 rounded text-xs bg-gray-100 text-gray-500">No Data</span>
+                ` : wo.dew ? `
+                    <span class="px-2 py-0.5 rounded text-xs ${{wo.dewP === 'PASS' ? 'bg-green-100 text-green-800' : 'bg-red-100 text-red-800'}}">
+                        ${{parseFloat(wo.dew).toFixed(0)}}°F ${{wo.dewP === 'PASS' ? '✓' : '✗'}}
+                    </span>
+                ` : '-'}}
+            </td>
+            <td class="px-3 py-2 text-sm text-center">
+                ${{wo.totH ? `
+                    <div class="text-xs">
+                        <span class="font-bold text-gray-800">${{parseFloat(wo.totH).toFixed(1)}}</span>
+                        <span class="text-gray-400">hrs</span>
+                    </div>
+                    <div class="text-xs text-gray-400">
+                        R:${{parseFloat(wo.repH || 0).toFixed(0)}} T:${{parseFloat(wo.trvH || 0).toFixed(0)}}
+                    </div>
+                ` : '<span class="text-gray-300">—</span>'}}
+            </td>
+            <td class="px-3 py-2 text-sm text-center">
+                ${{wo.vis ? `
+                    <span class="font-semibold text-gray-700">${{wo.vis}}</span>
+                    <span class="text-xs text-gray-400">${{wo.techs ? '/ ' + wo.techs + ' tech' + (parseInt(wo.techs) > 1 ? 's' : '') : ''}}</span>
+                ` : '<span class="text-gray-300">—</span>'}}
+            </td>
+            <td class="px-3 py-2 text-sm text-center text-gray-500">${{wo.exp}}</td>
+            <td class="px-3 py-2 text-sm text-center">
+                <div class="flex gap-2 justify-center">
+                    <a href="${{SC_URL}}${{wo.t}}" target="_blank" 
+                       class="text-walmart-blue hover:underline text-xs" title="Service Channel">
+                        SC \u2197
+                    </a>
+                    <a href="https://crystal.walmart.com/us/stores/search/${{wo.s}}" target="_blank" 
+                       class="text-green-600 hover:underline text-xs" title="Crystal Store">
+                        Crystal \u2197
+                    </a>
+                    <a href="https://crystal.walmart.com/us/reports/custom-reports/46?report-name=win-the-winter---store-details&report-filters=Store%2520Number%255B0%255D%3D${{wo.s}}" target="_blank" 
+                       class="text-purple-600 hover:underline text-xs" title="WTW Report">
+                        WTW \u2197
+                    </a>
+                </div>
+            </td>
+        `;
     }}
     
     // Completion table sort state
@@ -1143,6 +1122,12 @@ def main():
     let rfmSortDesc = true;
     let fsmRowsData = [];
     let rfmRowsData = [];
+    const COMPLETION_SORT = {{
+        name: 'str', ph1: ['num', r => r.ph1Pct], ph2: ['num', r => r.ph2Pct],
+        ph3: ['num', r => r.ph3Pct], overall: ['num', r => r.overallPct]
+    }};
+    let fsmSort = new SortCache(() => fsmRowsData, COMPLETION_SORT);
+    let rfmSort = new SortCache(() => rfmRowsData, COMPLETION_SORT);
     
     function sortFsmTable(field) {{
         if (fsmSortField === field) {{
@@ -1151,7 +1136,7 @@ def main():
             fsmSortField = field;
             fsmSortDesc = true;
         }}
-        renderFsmTable();
+        wtwView.invalidate(false);
     }}
     
     function sortRfmTable(field) {{
@@ -1161,120 +1146,33 @@ def main():
             rfmSortField = field;
             rfmSortDesc = true;
         }}
-        renderRfmTable();
+        wtwView.invalidate(false);
     }}
     
-    // Completion Tables by FSM and RFM (only responds to Sr Dir & FM Dir filters)
-    function updateCompletionTables() {{
-        const srDir = document.getElementById('wtwFilterSrDirector').value;
-        const fmDir = document.getElementById('wtwFilterDirector').value;
-        
-        // Filter data by Sr Dir and FM Dir only
-        const filteredData = WTW_DATA.filter(wo => {{
-            if (srDir && wo.srd !== srDir) return false;
-            if (fmDir && wo.fm !== fmDir) return false;
-            return true;
-        }});
-        
-        // Calculate completion % by FSM
-        const fsmStats = {{}};
-        filteredData.forEach(wo => {{
-            const fsm = wo.fsm || 'Unknown';
-            if (!fsmStats[fsm]) {{
-                fsmStats[fsm] = {{
-                    PH1: {{ total: 0, completed: 0 }},
-                    PH2: {{ total: 0, completed: 0 }},
-                    PH3: {{ total: 0, completed: 0 }}
-                }};
-            }}
-            if (wo.ph && fsmStats[fsm][wo.ph]) {{
-                fsmStats[fsm][wo.ph].total++;
-                if (wo.st === 'COMPLETED') fsmStats[fsm][wo.ph].completed++;
-            }}
-        }});
-        
-        // Calculate completion % by RFM
-        const rfmStats = {{}};
-        filteredData.forEach(wo => {{
-            const rfm = wo.rm || 'Unknown';
-            if (!rfmStats[rfm]) {{
-                rfmStats[rfm] = {{
-                    PH1: {{ total: 0, completed: 0 }},
-                    PH2: {{ total: 0, completed: 0 }},
-                    PH3: {{ total: 0, completed: 0 }}
-                }};
-            }}
-            if (wo.ph && rfmStats[rfm][wo.ph]) {{
-                rfmStats[rfm][wo.ph].total++;
-                if (wo.st === 'COMPLETED') rfmStats[rfm][wo.ph].completed++;
-            }}
-        }});
-        
-        // Helper to calculate % and color
-        const getPct = (completed, total) => total > 0 ? ((completed / total) * 100).toFixed(1) : '0.0';
-        const getColor = (pct) => {{
-            if (pct >= 80) return 'text-green-600 font-bold';
-            if (pct >= 50) return 'text-yellow-600';
-            return 'text-red-600';
-        }};
-        
-        // Build FSM rows data
-        fsmRowsData = Object.entries(fsmStats)
-            .map(([fsm, phases]) => {{
-                const ph1Pct = getPct(phases.PH1.completed, phases.PH1.total);
-                const ph2Pct = getPct(phases.PH2.completed, phases.PH2.total);
-                const ph3Pct = getPct(phases.PH3.completed, phases.PH3.total);
+    // Completion rows by FSM / RFM from per-phase {{total, completed}} stats
+    function completionRows(stats) {{
+        const getPct = (completed, total) => total > 0 ? parseFloat(((completed / total) * 100).toFixed(1)) : 0;
+        return Object.entries(stats)
+            .map(([name, phases]) => {{
                 const totalCompleted = phases.PH1.completed + phases.PH2.completed + phases.PH3.completed;
                 const totalAll = phases.PH1.total + phases.PH2.total + phases.PH3.total;
-                const overallPct = getPct(totalCompleted, totalAll);
                 return {{
-                    name: fsm,
-                    ph1Pct: parseFloat(ph1Pct),
+                    name: name,
+                    ph1Pct: getPct(phases.PH1.completed, phases.PH1.total),
                     ph1Completed: phases.PH1.completed,
                     ph1Total: phases.PH1.total,
-                    ph2Pct: parseFloat(ph2Pct),
+                    ph2Pct: getPct(phases.PH2.completed, phases.PH2.total),
                     ph2Completed: phases.PH2.completed,
                     ph2Total: phases.PH2.total,
-                    ph3Pct: parseFloat(ph3Pct),
+                    ph3Pct: getPct(phases.PH3.completed, phases.PH3.total),
                     ph3Completed: phases.PH3.completed,
                     ph3Total: phases.PH3.total,
-                    overallPct: parseFloat(overallPct),
+                    overallPct: getPct(totalCompleted, totalAll),
                     totalCompleted: totalCompleted,
                     total: totalAll
                 }};
             }})
             .filter(r => r.total > 0);
-        
-        renderFsmTable();
-        
-        // Build RFM rows data
-        rfmRowsData = Object.entries(rfmStats)
-            .map(([rfm, phases]) => {{
-                const ph1Pct = getPct(phases.PH1.completed, phases.PH1.total);
-                const ph2Pct = getPct(phases.PH2.completed, phases.PH2.total);
-                const ph3Pct = getPct(phases.PH3.completed, phases.PH3.total);
-                const totalCompleted = phases.PH1.completed + phases.PH2.completed + phases.PH3.completed;
-                const totalAll = phases.PH1.total + phases.PH2.total + phases.PH3.total;
-                const overallPct = getPct(totalCompleted, totalAll);
-                return {{
-                    name: rfm,
-                    ph1Pct: parseFloat(ph1Pct),
-                    ph1Completed: phases.PH1.completed,
-                    ph1Total: phases.PH1.total,
-                    ph2Pct: parseFloat(ph2Pct),
-                    ph2Completed: phases.PH2.completed,
-                    ph2Total: phases.PH2.total,
-                    ph3Pct: parseFloat(ph3Pct),
-                    ph3Completed: phases.PH3.completed,
-                    ph3Total: phases.PH3.total,
-                    overallPct: parseFloat(overallPct),
-                    totalCompleted: totalCompleted,
-                    total: totalAll
-                }};
-            }})
-            .filter(r => r.total > 0);
-        
-        renderRfmTable();
     }}
     
     // Helper for color
@@ -1286,23 +1184,7 @@ def main():
     
     // Render FSM table with current sort
     function renderFsmTable() {{
-        const sorted = [...fsmRowsData].sort((a, b) => {{
-            let aVal, bVal;
-            if (fsmSortField === 'name') {{
-                aVal = a.name || '';
-                bVal = b.name || '';
-                return fsmSortDesc ? bVal.localeCompare(aVal) : aVal.localeCompare(bVal);
-            }} else if (fsmSortField === 'ph1') {{
-                aVal = a.ph1Pct; bVal = b.ph1Pct;
-            }} else if (fsmSortField === 'ph2') {{
-                aVal = a.ph2Pct; bVal = b.ph2Pct;
-            }} else if (fsmSortField === 'ph3') {{
-                aVal = a.ph3Pct; bVal = b.ph3Pct;
-            }} else {{
-                aVal = a.overallPct; bVal = b.overallPct;
-            }}
-            return fsmSortDesc ? bVal - aVal : aVal - bVal;
-        }});
+        const sorted = fsmSort.sorted(fsmSortField, !fsmSortDesc);
         
         const table = document.getElementById('fsmCompletionTable');
         table.innerHTML = sorted.map(r => `
@@ -1318,23 +1200,7 @@ def main():
     
     // Render RFM table with current sort
     function renderRfmTable() {{
-        const sorted = [...rfmRowsData].sort((a, b) => {{
-            let aVal, bVal;
-            if (rfmSortField === 'name') {{
-                aVal = a.name || '';
-                bVal = b.name || '';
-                return rfmSortDesc ? bVal.localeCompare(aVal) : aVal.localeCompare(bVal);
-            }} else if (rfmSortField === 'ph1') {{
-                aVal = a.ph1Pct; bVal = b.ph1Pct;
-            }} else if (rfmSortField === 'ph2') {{
-                aVal = a.ph2Pct; bVal = b.ph2Pct;
-            }} else if (rfmSortField === 'ph3') {{
-                aVal = a.ph3Pct; bVal = b.ph3Pct;
-            }} else {{
-                aVal = a.overallPct; bVal = b.overallPct;
-            }}
-            return rfmSortDesc ? bVal - aVal : aVal - bVal;
-        }});
+        const sorted = rfmSort.sorted(rfmSortField, !rfmSortDesc);
         
         const table = document.getElementById('rfmCompletionTable');
         table.innerHTML = sorted.map(r => `
@@ -1369,67 +1235,21 @@ def main():
             dirSummarySortField = field;
             dirSummarySortAsc = field === 'name' || field === 'region';
         }}
-        renderDirSummary();
+        wtwView.invalidate(false);
     }}
     
-    function updateDirSummary() {{
-        renderDirSummary();
-    }}
-    
-    function renderDirSummary() {{
-        // Build director+region matrix
-        const drMap = {{}};
-        const dirTotals = {{}};
-        wtwFilteredData.forEach(wo => {{
-            const dir = wo.fm || 'Unknown';
-            const region = storeRegionMap[wo.s] || '—';
-            const key = dir + '||' + region;
-            if (!drMap[key]) {{
-                drMap[key] = {{ name: dir, region: region, total: 0, completed: 0, ip: 0, stores: new Set(),
-                    hours: 0, ready: 0, ph1: 0, ph1Done: 0, ph2: 0, ph2Done: 0, ph3: 0, ph3Done: 0 }};
-            }}
-            if (!dirTotals[dir]) {{
-                dirTotals[dir] = {{ name: dir, total: 0, completed: 0, ip: 0, stores: new Set(),
-                    hours: 0, ready: 0, ph1: 0, ph1Done: 0, ph2: 0, ph2Done: 0, ph3: 0, ph3Done: 0, regionCount: 0 }};
-            }}
-            const d = drMap[key];
-            const dt = dirTotals[dir];
-            d.total++; dt.total++;
-            d.stores.add(wo.s); dt.stores.add(wo.s);
-            if (wo.st === 'COMPLETED') {{ d.completed++; dt.completed++; }}
-            else if (wo.st === 'IN PROGRESS') {{
-                d.ip++; dt.ip++;
-                if (wo.allP === 'PASS') {{ d.ready++; dt.ready++; }}
-            }}
-            const hrs = parseFloat(wo.totH) || 0;
-            d.hours += hrs; dt.hours += hrs;
-            if (wo.ph === 'PH1') {{ d.ph1++; dt.ph1++; if (wo.st === 'COMPLETED') {{ d.ph1Done++; dt.ph1Done++; }} }}
-            if (wo.ph === 'PH2') {{ d.ph2++; dt.ph2++; if (wo.st === 'COMPLETED') {{ d.ph2Done++; dt.ph2Done++; }} }}
-            if (wo.ph === 'PH3') {{ d.ph3++; dt.ph3++; if (wo.st === 'COMPLETED') {{ d.ph3Done++; dt.ph3Done++; }} }}
-        }});
-        
-        // Count regions per director
-        const dirRegions = {{}};
-        Object.values(drMap).forEach(d => {{
-            if (!dirRegions[d.name]) dirRegions[d.name] = [];
-            dirRegions[d.name].push(d.region);
-        }});
-        Object.keys(dirTotals).forEach(dir => {{
-            dirTotals[dir].regionCount = (dirRegions[dir] || []).length;
-        }});
-        
+    function renderDirSummary({{ drMap, dirTotals, dirRegions }}) {{
         // Build flat rows: director total rows + region sub-rows
         const addPcts = (d) => {{
             d.pct = d.total > 0 ? (d.completed / d.total * 100) : 0;
             d.ph1Pct = d.ph1 > 0 ? (d.ph1Done / d.ph1 * 100) : 0;
             d.ph2Pct = d.ph2 > 0 ? (d.ph2Done / d.ph2 * 100) : 0;
             d.ph3Pct = d.ph3 > 0 ? (d.ph3Done / d.ph3 * 100) : 0;
-            d.storeCount = d.stores instanceof Set ? d.stores.size : d.stores;
             return d;
         }};
         
         // Sort directors
-        let dirList = Object.values(dirTotals).map(addPcts);
+        let dirList = Object.values(dirTotals).map(d => addPcts({{ ...d }}));
         const sortKey = dirSummarySortField;
         const sortFn = (a, b) => {{
             let av, bv;
@@ -1473,7 +1293,7 @@ def main():
         let html = '';
         
         dirList.forEach(dir => {{
-            const regions = (dirRegions[dir.name] || []).sort();
+            const regions = [...(dirRegions[dir.name] || [])].sort();
             const hasMultiple = regions.length > 1;
             
             if (hasMultiple) {{
@@ -1486,7 +1306,7 @@ def main():
                 // Sub-rows per region
                 regions.forEach(region => {{
                     const rKey = dir.name + '||' + region;
-                    const rData = addPcts(drMap[rKey]);
+                    const rData = addPcts({{ ...drMap[rKey] }});
                     html += `<tr class="bg-white hover:bg-blue-50 border-l-4 border-indigo-200">
                         <td class="px-3 py-2 text-sm text-center"><span class="px-2 py-0.5 rounded bg-indigo-50 text-indigo-700 text-xs font-semibold">${{region}}</span></td>
                         ${{dataCells(rData)}}
@@ -1535,8 +1355,7 @@ def main():
     
     function initWtwCharts() {{
         // Status chart
-        const statusCtx = document.getElementById('wtwStatusChart').getContext('2d');
-        wtwStatusChart = new Chart(statusCtx, {{
+        wtwStatusChart = CHARTS.render('wtwStatusChart', {{
             type: 'doughnut',
             data: {{
                 labels: ['Completed', 'In Progress', 'Open'],
@@ -1567,8 +1386,7 @@ def main():
         }});
         
         // Phase chart - stacked bar showing Completed / In Progress / Open
-        const phaseCtx = document.getElementById('wtwPhaseChart').getContext('2d');
-        wtwPhaseChart = new Chart(phaseCtx, {{
+        wtwPhaseChart = CHARTS.render('wtwPhaseChart', {{
             type: 'bar',
             data: {{
                 labels: ['Phase 1', 'Phase 2', 'Phase 3'],
@@ -1598,60 +1416,24 @@ def main():
             plugins: [ChartDataLabels]
         }});
         
-        updateWtwCharts();
+        if (wtwView.model) updateWtwCharts(wtwView.model.charts);
     }}
     
-    function updateWtwCharts() {{
+    // Filter-driven: patch the numbers in place and redraw without animation
+    function updateWtwCharts(c) {{
         if (!wtwStatusChart || !wtwPhaseChart) return;
-        
-        // Count main statuses in filtered data
-        const statusCounts = {{'COMPLETED': 0, 'IN PROGRESS': 0, 'OPEN': 0}};
-        const phaseCounts = {{'PH1': 0, 'PH2': 0, 'PH3': 0}};
-        
-        wtwFilteredData.forEach(wo => {{
-            if (wo.st === 'COMPLETED') statusCounts['COMPLETED']++;
-            else if (wo.st === 'IN PROGRESS') statusCounts['IN PROGRESS']++;
-            else statusCounts['OPEN']++;
-            phaseCounts[wo.ph] = (phaseCounts[wo.ph] || 0) + 1;
-        }});
-        
-        // Update KPI cards
-        const total = wtwFilteredData.length;
-        document.getElementById('wtwKpiCompleted').textContent = statusCounts['COMPLETED'].toLocaleString();
-        document.getElementById('wtwKpiCompletionRate').textContent = total > 0 ? ((statusCounts['COMPLETED'] / total) * 100).toFixed(1) + '% complete' : '0% complete';
-        document.getElementById('wtwKpiInProgress').textContent = statusCounts['IN PROGRESS'].toLocaleString();
-        document.getElementById('wtwKpiOpen').textContent = statusCounts['OPEN'].toLocaleString();
-        document.getElementById('wtwKpiTotal').textContent = total.toLocaleString();
-        
-        wtwStatusChart.data.datasets[0].data = [
-            statusCounts['COMPLETED'],
-            statusCounts['IN PROGRESS'],
-            statusCounts['OPEN']
-        ];
-        wtwStatusChart.update();
-        
-        // Count phase statuses for stacked bars
-        const phaseStatus = {{
-            'PH1': {{c: 0, ip: 0, o: 0}},
-            'PH2': {{c: 0, ip: 0, o: 0}},
-            'PH3': {{c: 0, ip: 0, o: 0}}
-        }};
-        wtwFilteredData.forEach(wo => {{
-            const ps = phaseStatus[wo.ph];
-            if (ps) {{
-                if (wo.st === 'COMPLETED') ps.c++;
-                else if (wo.st === 'IN PROGRESS') ps.ip++;
-                else ps.o++;
-            }}
-        }});
-        wtwPhaseChart.data.datasets[0].data = [phaseStatus.PH1.c, phaseStatus.PH2.c, phaseStatus.PH3.c];
-        wtwPhaseChart.data.datasets[1].data = [phaseStatus.PH1.ip, phaseStatus.PH2.ip, phaseStatus.PH3.ip];
-        wtwPhaseChart.data.datasets[2].data = [phaseStatus.PH1.o, phaseStatus.PH2.o, phaseStatus.PH3.o];
-        wtwPhaseChart.update();
+        wtwStatusChart.data.datasets[0].data = c.status;
+        wtwStatusChart.update('none');
+        c.phase.forEach((data, k) => {{ wtwPhaseChart.data.datasets[k].data = data; }});
+        wtwPhaseChart.update('none');
     }}
     </script>
     '''
     
+    # Datasets ride along with the tab markup as JSON (parsed when the tab opens)
+    wtw_content += '\n    ' + json_script('WTW_DATA', dumps_rows(compressed_wtw))
+    wtw_content += '\n    ' + json_script('WTW_SUMMARY', dumps(summary)) + '\n'
+    
     # Insert WTW content before Footer
     html = re.sub(
         r'(\s*<!-- Footer -->)',
@@ -1660,12 +1442,15 @@ def main():
         count=1
     )
     
-    # Add WTW JavaScript before closing body
+    # Add WTW JavaScript before closing body (shared engines go in <head>)
     html = html.replace('</body>', wtw_js + '\n</body>')
+    html = inject_shared_js(html)
+    html = inject_org_tree(html, 'wtw', compressed_wtw)
     
-    # Update timestamp
-    now = datetime.now().strftime('%Y-%m-%d %H:%M')
-    html = re.sub(r'Data as of [0-9-]+ [0-9:]+', f'Data as of {now}', html)
+    # Update timestamp (only moves when the data itself changed). Under
+    # refresh.py (--no-stamp) the stamp is set once, after every builder ran.
+    if '--no-stamp' not in sys.argv:
+        html = apply_stamp(html, data_stamp(html))
     
     # Save
     DASHBOARD_PATH.write_text(html, encoding='utf-8')
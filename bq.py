@@ -0,0 +1,31 @@
+"""Parameterized bq CLI queries returning CSV lines.
+
+Values (store lists, dates) travel as named query parameters instead of
+being spliced into the SQL, so the query text stays fixed and cacheable
+on the BQ side.
+"""
+import json
+import subprocess
+
+# gcloud / bq chatter mixed into --format=csv output
+BQ_NOISE = ('Python 3.9', 'gcloud components', 'CLOUDSDK', 'compatible', 'reinstall',
+            'officially supported', 'may not function', 'prompt to install', '$ gcloud',
+            'point to it', 'Waiting on')
+
+
+def bq_csv(query, params, max_rows, timeout):
+    """Run a query with named parameters; returns the CSV lines (header first).
+
+    params: {'stores': ('ARRAY<INT64>', [...]), 'since': ('DATETIME', '2026-02-01 00:00:00')}.
+    Raises RuntimeError on a failed query, subprocess.TimeoutExpired on timeout.
+    """
+    args = [f'--parameter={name}:{kind}:' + (json.dumps(value, separators=(',', ':')) if isinstance(value, list) else str(value))
+            for name, (kind, value) in params.items()]
+    result = subprocess.run(
+        ['bq', 'query', '--use_legacy_sql=false', '--format=csv', f'--max_rows={max_rows}', *args, query],
+        capture_output=True, text=True, timeout=timeout
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip()[:200])
+    return [l for l in result.stdout.strip().split('\n')
+            if l and not l.startswith('WARNING') and not any(n in l for n in BQ_NOISE)]
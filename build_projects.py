@@ -14,11 +14,15 @@ import json, re, subprocess, sys, os
 from datetime import datetime, date
 from collections import Counter
 
+from payload import json_script
+from shared_js import build_shared_js
+import wrike_mirror
+from wrike_client import WrikeClient
+
 DIR = os.path.dirname(os.path.abspath(__file__))
 os.chdir(DIR)
 
-PROXY = 'http://sysproxy.wal-mart.com:8080'
-WRIKE_FOLDER = 'IEAFB7T7I5CT6NKV'
+WRIKE_TOKENS = '.wrike_tokens.json'
 
 # ── Wrike custom field mapping ─────────────────────────────────────────
 CF = {
@@ -134,31 +138,10 @@ def pull_lx_projects():
     return rows
 
 
-def pull_wrike():
-    """Pull projects from Wrike API."""
-    with open('.wrike_tokens.json') as f:
-        token = json.load(f)['access_token']
-    headers = f'Authorization: Bearer {token}'
-    r = subprocess.run(['curl', '-s', '--proxy', PROXY,
-        '-H', headers, f'https://www.wrike.com/api/v4/folders/{WRIKE_FOLDER}'
-    ], capture_output=True, text=True)
-    children = json.loads(r.stdout)['data'][0]['childIds']
-    r = subprocess.run(['curl', '-s', '--proxy', PROXY,
-        '-H', headers, 'https://www.wrike.com/api/v4/workflows'
-    ], capture_output=True, text=True)
-    status_map = {}
-    for wf in json.loads(r.stdout).get('data', []):
-        for cs in wf.get('customStatuses', []):
-            status_map[cs['id']] = {'name': cs.get('name', '?'), 'group': cs.get('group', '?')}
-    all_projects = []
-    for i in range(0, len(children), 100):
-        batch = ','.join(children[i:i+100])
-        r = subprocess.run(['curl', '-s', '--proxy', PROXY,
-            '-H', headers,
-            f'https://www.wrike.com/api/v4/folders/{batch}?fields=%5B%22customColumnIds%22%5D'
-        ], capture_output=True, text=True)
-        data = json.loads(r.stdout)
-        all_projects.extend(data.get('data', []))
+def wrike_projects_from(mirror):
+    """Project records (status + mapped custom fields) from the Wrike mirror, in root folder order."""
+    status_map = mirror['statuses']
+    all_projects = [mirror['projects'][pid] for pid in mirror['children'] if pid in mirror['projects']]
     records = []
     for p in all_projects:
         proj = p.get('project', {})
@@ -166,7 +149,7 @@ def pull_wrike():
         si = status_map.get(sid, {})
         rec = {
             'id': p['id'], 'title': p.get('title', ''),
-            'status': si.get('name', '?'), 'status_group': si.get('group', '?'),
+            'status': si.get('name') or '?', 'status_group': si.get('group') or '?',
             'start_date': proj.get('startDate', ''), 'end_date': proj.get('endDate', ''),
         }
         for cf in p.get('customFields', []):
@@ -176,7 +159,7 @@ def pull_wrike():
         records.append(rec)
     with open('wrike_projects.json', 'w') as f:
         json.dump(records, f, indent=2)
-    print(f'  Wrike: {len(records)} projects pulled')
+    print(f'  Wrike: {len(records)} projects')
     return records
 
 
@@ -200,23 +183,11 @@ def clean_date(val):
     return s
 
 
-def pull_walkoff_forms():
-    """Pull FS Walk-Off Reports and Rack Verification Pre-Project Forms from Wrike."""
-    with open('.wrike_tokens.json') as f:
-        token = json.load(f)['access_token']
-    headers = f'Authorization: Bearer {token}'
-    # Get workflow statuses
-    r = subprocess.run(['curl', '-s', '--proxy', PROXY, '-H', headers,
-        'https://www.wrike.com/api/v4/workflows'], capture_output=True, text=True)
-    status_map = {}
-    for wf in json.loads(r.stdout).get('data', []):
-        for cs in wf.get('customStatuses', []):
-            status_map[cs['id']] = {'name': cs.get('name', ''), 'group': cs.get('group', '')}
-    # Search all FS tasks
-    r = subprocess.run(['curl', '-s', '--proxy', PROXY, '-H', headers,
-        'https://www.wrike.com/api/v4/tasks?title=Facilities%20Services&pageSize=1000'],
-        capture_output=True, text=True)
-    tasks = json.loads(r.stdout).get('data', [])
+def walkoff_forms_from(mirror):
+    """FS Walk-Off Reports and Rack Verification Pre-Project Forms from the Wrike mirror's FS tasks."""
+    status_map = mirror['statuses']
+    # Oldest update first, so the most recently updated form for a store wins
+    tasks = sorted(mirror['tasks'].values(), key=lambda t: (t.get('updatedDate', ''), t['id']))
     walkoffs, prewalks = {}, {}
     for t in tasks:
         title = t.get('title', '')
@@ -435,6 +406,7 @@ def build_html(projects):
 <title>Capital Projects — North BU</title>
 <script src="https://cdn.tailwindcss.com"></script>
 <script src="https://cdn.jsdelivr.net/npm/chart.js@4.4.4/dist/chart.umd.min.js"></script>
+{build_shared_js()}
 <style>
   .bg-wm {{ background: #0071dc; }}
   .text-wm {{ color: #0071dc; }}
@@ -641,8 +613,9 @@ def build_html(projects):
 
 </main>
 
+{json_script('D', data_json)}
 <script>
-const D = {data_json};
+lazyData('D');  // JSON.parse instead of compiling the literal
 
 const SC = {{
   'In Construction':   {{ bg:'#fed7aa', text:'#9a3412' }},
@@ -664,7 +637,7 @@ const TB = {{
   OTHER:'<span class="px-1.5 py-0.5 rounded text-[10px] font-bold bg-gray-100 text-gray-600">Other</span>',
 }};
 
-let F=[...D], sCol='', sAsc=true, dCol='total', dAsc=false, charts={{}}, openRow=null, activeCard=null;
+let F=[...D], FI=null, sCol='', sAsc=true, dCol='total', dAsc=false, charts={{}}, openRow=null, activeCard=null, PT=null;
 
 function cardFilter(type) {{
   if(activeCard===type || type==='all') {{ activeCard=null; zeOnly=false; odOnly=false; }}
@@ -700,39 +673,29 @@ function setFilter(t) {{
   applyFilters();
 }}
 
+// D lives in the compute worker (card filters map onto the same fields/flags as the dropdowns)
+STORE_INDEX.register('projects',()=>D,'s');
+COMPUTE.define('projects',()=>D,{{
+  fields:['sc','tc','sd','d','rm','st','yr'],
+  flags:{{od:p=>!!p.od, ze:p=>!!p.ze, wo:p=>!!p.wo}},
+  text:p=>(p.s+' '+p.n+' '+p.sow+' '+p.city+' '+p.d+' '+p.rm+' '+p.mc+' '+p.sn).toLowerCase(),
+  block:'D'
+}});
+const CARD_CLAUSE={{
+  const:{{sc:'In Construction'}}, pre:{{sc:'Pre-Construction'}}, design:{{sc:'Design / Bidding'}},
+  ref:{{tc:'REF'}}, hvac:{{tc:'HVAC'}}
+}};
+const CARD_FLAG={{overdue:'od', ze:'ze', walkoff:'wo'}};
+
 function applyFilters() {{
-  const fs=document.getElementById('fStatus').value;
-  const ft=document.getElementById('fType').value;
-  const fsd=document.getElementById('fSrDir').value;
-  const fd=document.getElementById('fDir').value;
-  const frm=document.getElementById('fRM').value;
-  const fst=document.getElementById('fState').value;
-  const fy=document.getElementById('fYear').value;
-  const q=document.getElementById('fSearch').value.toLowerCase();
-  F=D.filter(p=>{{
-    // Card filters
-    if(activeCard==='const' && p.sc!=='In Construction') return false;
-    if(activeCard==='pre' && p.sc!=='Pre-Construction') return false;
-    if(activeCard==='design' && p.sc!=='Design / Bidding') return false;
-    if(activeCard==='overdue' && !p.od) return false;
-    if(activeCard==='ref' && p.tc!=='REF') return false;
-    if(activeCard==='hvac' && p.tc!=='HVAC') return false;
-    if(activeCard==='ze' && !p.ze) return false;
-    if(activeCard==='walkoff' && !p.wo) return false;
-    // Dropdown/toggle filters
-    if(zeOnly && !p.ze) return false;
-    if(odOnly && !p.od) return false;
-    if(fs && p.sc!==fs) return false;
-    if(ft && p.tc!==ft) return false;
-    if(fsd && p.sd!==fsd) return false;
-    if(fd && p.d!==fd) return false;
-    if(frm && p.rm!==frm) return false;
-    if(fst && p.st!==fst) return false;
-    if(fy && p.yr!==fy) return false;
-    if(q && !(p.s+' '+p.n+' '+p.sow+' '+p.city+' '+p.d+' '+p.rm+' '+p.mc+' '+p.sn).toLowerCase().includes(q)) return false;
-    return true;
-  }});
-  render();
+  const val=id=>document.getElementById(id).value;
+  const flags=[];
+  if(CARD_FLAG[activeCard]) flags.push(CARD_FLAG[activeCard]);
+  if(zeOnly) flags.push('ze');
+  if(odOnly) flags.push('od');
+  const dropdowns={{sc:val('fStatus'),tc:val('fType'),sd:val('fSrDir'),d:val('fDir'),rm:val('fRM'),st:val('fState'),yr:val('fYear')}};
+  COMPUTE.query('projects',{{clauses:[CARD_CLAUSE[activeCard]||{{}},dropdowns],flags,text:val('fSearch').toLowerCase(),channel:'projects'}})
+    .then(res=>{{ if(!res) return; FI=res.ids; F=sCol?PS.sorted(sCol,sAsc,FI):res.rows; render(); }});
 }}
 
 function render() {{ renderKPIs(); renderCharts(); renderDirTable(); renderTable(); }}
@@ -765,15 +728,13 @@ function renderCharts() {{
 }}
 
 function mkDoughnut(id,labels,data,colors) {{
-  if(charts[id])charts[id].destroy();
-  charts[id]=new Chart(document.getElementById(id),{{
+  charts[id]=CHARTS.render(id,{{
     type:'doughnut',data:{{labels,datasets:[{{data,backgroundColor:colors,borderWidth:2}}]}},
     options:{{responsive:true,maintainAspectRatio:false,plugins:{{legend:{{position:'bottom',labels:{{font:{{size:10}}}}}}}}}}
   }});
 }}
 function mkBar(id,labels,data) {{
-  if(charts[id])charts[id].destroy();
-  charts[id]=new Chart(document.getElementById(id),{{
+  charts[id]=CHARTS.render(id,{{
     type:'bar',data:{{labels,datasets:[{{data,backgroundColor:'#0071dc',borderRadius:3}}]}},
     options:{{responsive:true,maintainAspectRatio:false,indexAxis:'y',
       scales:{{x:{{display:false}},y:{{ticks:{{font:{{size:9}}}}}}}},
@@ -782,22 +743,17 @@ function mkBar(id,labels,data) {{
 }}
 
 function renderDirTable() {{
-  const dirs={{}};
-  F.forEach(p=>{{
-    const d=p.d||'Unknown';
-    if(!dirs[d]) dirs[d]={{total:0,const:0,pre:0,design:0,active:0,od:0,ref:0,hvac:0,ze:0}};
-    dirs[d].total++;
-    if(p.sc==='In Construction') dirs[d].const++;
-    else if(p.sc==='Pre-Construction') dirs[d].pre++;
-    else if(p.sc==='Design / Bidding') dirs[d].design++;
-    else dirs[d].active++;
-    if(p.od) dirs[d].od++;
-    if(p.tc==='REF') dirs[d].ref++;
-    if(p.tc==='HVAC') dirs[d].hvac++;
-    if(p.ze) dirs[d].ze++;
+  const STAGES=['In Construction','Pre-Construction','Design / Bidding'];
+  const rows=QUERY.aggregate(F,{{
+    by:[p=>p.d||'Unknown'],
+    measures:{{
+      total:['count'], const:['count',p=>p.sc===STAGES[0]], pre:['count',p=>p.sc===STAGES[1]],
+      design:['count',p=>p.sc===STAGES[2]], active:['count',p=>!STAGES.includes(p.sc)],
+      od:['count',p=>p.od], ref:['count',p=>p.tc==='REF'], hvac:['count',p=>p.tc==='HVAC'], ze:['count',p=>p.ze]
+    }},
+    derive:r=>{{r.name=r.key;}},
+    sort:[dCol,dAsc?'asc':'desc']
   }});
-  let rows=Object.entries(dirs).map(([n,v])=>({{name:n,...v}}));
-  rows.sort((a,b)=>dAsc?(a[dCol]>b[dCol]?1:-1):(b[dCol]>a[dCol]?1:-1));
   document.getElementById('dirBody').innerHTML=rows.map(r=>`
     <tr class="hover:bg-gray-50 cursor-pointer" onclick="document.getElementById('fDir').value='${{r.name}}';applyFilters()">
       <td class="px-4 py-2 text-sm font-medium">${{r.name}}</td>
@@ -816,11 +772,19 @@ function sortDir(col) {{ if(dCol===col) dAsc=!dAsc; else {{dCol=col;dAsc=col==='
 
 function renderTable() {{
   document.getElementById('pCount').textContent=`${{F.length}} projects`;
-  document.getElementById('pBody').innerHTML=F.map((p,i)=>{{
-    const sc=SC[p.sc]||SC['Active'];
-    const zeB=p.ze?'<span class="ml-1 px-1 py-0.5 rounded text-[9px] font-bold bg-green-100 text-green-700">\u26a1 ZE</span>':'';
-    return `
-    <tr class="project-row ${{p.ze?'ze-row':''}}" onclick="toggle(${{i}})">
+  if(!PT) PT=new VirtualTable('pBody', {{
+    colspan: 11, rowHeight: 53,
+    rowClass: p=>`project-row ${{p.ze?'ze-row':''}}`,
+    row: projectRow, onClick: toggle,
+    isOpen: p=>p===openRow, detail: projectDetail,
+  }});
+  PT.setRows(F);
+}}
+
+function projectRow(p) {{
+  const sc=SC[p.sc]||SC['Active'];
+  const zeB=p.ze?'<span class="ml-1 px-1 py-0.5 rounded text-[9px] font-bold bg-green-100 text-green-700">\u26a1 ZE</span>':'';
+  return `
       <td class="px-3 py-2 text-sm font-mono font-medium text-wm">${{p.s}}</td>
       <td class="px-3 py-2 text-sm">
         <div class="font-medium text-gray-900 truncate max-w-[280px]" title="${{p.n}}">${{p.n}}${{zeB}}</div>
@@ -837,8 +801,12 @@ function renderTable() {{
       <td class="px-3 py-2 text-sm text-center text-gray-500">${{p.st}}</td>
       <td class="px-3 py-2 text-sm text-center text-gray-500">${{fmt(p.ds)}}</td>
       <td class="px-3 py-2 text-sm text-center ${{p.od?'overdue':''}}">${{fmt(p.de)}}${{p.od?' \u26a0\ufe0f':''}}</td>
-    </tr>
-    <tr class="scope-row" id="det-${{i}}">
+  `;
+}}
+
+function projectDetail(p) {{
+  return `
+    <tr class="scope-row open">
       <td colspan="11" class="px-3 py-0">
         <div class="bg-blue-50 border border-blue-200 rounded-lg p-4 my-2">
           ${{p.sow?'<div class="mb-3 pb-3 border-b border-blue-200"><span class="font-semibold text-gray-600 text-xs">\U0001f4dd Scope:</span><p class="text-sm text-gray-800 mt-1">'+p.sow+'</p></div>':''}}
@@ -870,24 +838,20 @@ function renderTable() {{
         </div>
       </td>
     </tr>`;
-  }}).join('');
 }}
 
-function toggle(i) {{
-  const r=document.getElementById(`det-${{i}}`);
-  if(openRow!==null&&openRow!==i) document.getElementById(`det-${{openRow}}`).classList.remove('open');
-  r.classList.toggle('open');
-  openRow=r.classList.contains('open')?i:null;
+function toggle(p) {{
+  openRow=openRow===p?null:p;
+  PT.refresh();
 }}
 
 function sortT(col) {{
   if(sCol===col) sAsc=!sAsc; else {{sCol=col;sAsc=true;}}
-  F.sort((a,b)=>{{
-    const va=(a[col]||'').toString().toLowerCase(), vb=(b[col]||'').toString().toLowerCase();
-    return sAsc?va.localeCompare(vb):vb.localeCompare(va);
-  }});
+  F=PS.sorted(sCol,sAsc,FI);
   renderTable();
 }}
+// Column orders over all of D, built on first use; re-sorting the filtered rows is a linear walk
+const PS=new SortCache(()=>D,{{s:'num',ds:'date',de:'date'}},'D');
 
 applyFilters();
 </script>
@@ -917,8 +881,9 @@ def main():
         print('Pulling LX projects from BQ...')
         lx_rows = pull_lx_projects()
 
-    # 2. Pull Wrike (secondary — for ZE flags + POC contacts)
+    # 2. Wrike (secondary — ZE flags, POC contacts, walk-off / pre-project forms) via the local mirror
     wrike_projects = None
+    walkoff_data = None
     if not bq_only:
         if local:
             try:
@@ -926,28 +891,29 @@ def main():
                 print(f'  Wrike: {len(wrike_projects)} cached projects')
             except:
                 print('  No cached Wrike data')
-        else:
-            print('Pulling Wrike POC data...')
-            try:
-                wrike_projects = pull_wrike()
-            except Exception as e:
-                print(f'  Wrike pull failed: {e}')
-
-    # 2b. Pull walk-off / pre-project forms from Wrike
-    walkoff_data = None
-    if not bq_only:
-        if local:
             try:
                 walkoff_data = json.load(open('walkoff_data.json'))
                 print(f'  Walk-offs: {len(walkoff_data.get("walkoffs",{}))} cached')
             except:
                 print('  No cached walk-off data')
         else:
-            print('Pulling FS walk-off forms...')
+            print('Syncing Wrike mirror...')
+            wrike = None
             try:
-                walkoff_data = pull_walkoff_forms()
+                wrike = WrikeClient.from_token_file(WRIKE_TOKENS)
+                mirror = wrike_mirror.sync(wrike)
             except Exception as e:
-                print(f'  Walk-off pull failed: {e}')
+                print(f'  Wrike sync failed: {e}')
+                mirror = wrike_mirror.load()
+                if mirror['watermark']:
+                    print(f'  Using mirror as of {mirror["watermark"]}')
+            finally:
+                if wrike:
+                    print(f'  Wrike API: {wrike.stats()}')
+                    wrike.close()
+            if mirror['projects'] or mirror['tasks']:
+                wrike_projects = wrike_projects_from(mirror)
+                walkoff_data = walkoff_forms_from(mirror)
 
     # 3. Enrich + build
     print('Enriching projects...')
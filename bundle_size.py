@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""Bundle size budget + payload analyzer for index.html.
+
+Breaks the final document down by tab, dataset, inline script and style,
+checks every item against BUDGETS, flags regressions against the previous
+run, and appends the result to size_report.json whenever the sizes
+changed. The report is a local build log: it is gitignored and not part
+of the refresh artifacts, so a no-change refresh has nothing to commit.
+
+Usage:
+    python3 bundle_size.py            # Analyze index.html, warn on regressions
+    python3 bundle_size.py --strict   # Also exit 1 on regressions (not just budget breaches)
+    python3 bundle_size.py path.html  # Analyze a different file (e.g. a share build)
+"""
+import json
+import re
+import sys
+from datetime import datetime
+from pathlib import Path
+
+PROJECT = Path(__file__).parent
+DASHBOARD = PROJECT / 'index.html'
+REPORT_FILE = PROJECT / 'size_report.json'
+HISTORY_KEEP = 90
+
+KB = 1024
+MB = 1024 * KB
+
+# Hard budgets (bytes, UTF-8). Over budget = fail; over WARN_AT of budget = warn.
+BUDGETS = {
+    'total': 20 * MB,
+    'tab:tnt': 4 * MB,
+    'tab:wtw': 4 * MB,
+    'tab:leak': 9 * MB,
+    'tab:terminal': 3 * MB,
+    'tab:projects': 2 * MB,
+    'data:EMBEDDED_STORE_DATA': 3 * MB,
+    'data:WTW_DATA': 3 * MB,
+    'data:LK_STORES': 1 * MB,
+    'data:LK_MONTHLY': 3 * MB,
+    'data:LK_WOS': 2 * MB,
+    'data:STORE_ASSETS': 4 * MB,
+    'data:TERMINAL_DATA': 2 * MB,
+    'data:HIST_TIT': 1 * MB,
+    'data:HIST_ROR': 1 * MB,
+    'data:TREND_DATA': 512 * KB,
+    'styles': 256 * KB,
+}
+DEFAULT_DATASET_BUDGET = 512 * KB   # any new dataset not listed above
+SHARDED = ('STORE_ASSETS',)   # NAME index + NAME_<n> shard blocks, budgeted as one dataset
+WARN_AT = 0.9
+REGRESSION_PCT = 10          # growth vs last run that counts as a regression...
+REGRESSION_MIN = 100 * KB    # ...but only if it also adds at least this much
+
+# (tab, html start, html end, js start, js end) — same markers the tab scripts use
+TAB_MARKERS = [
+    ('wtw', '<!-- WTW Tab Content -->', None,
+     r'<script>\s*// WTW Data', '</script>'),
+    ('leak', '<!-- Leak Tab Content -->', '<!-- End Leak Tab -->',
+     r'<script>\s*// Leak Management Data', '</script>'),
+    ('terminal', '<!-- Terminal Tab Content -->', '<!-- End Terminal Tab -->',
+     r'<!-- Terminal JS Start -->', '<!-- Terminal JS End -->'),
+    ('projects', '<!-- Projects Tab Content -->', '<!-- End Projects Tab Content -->',
+     None, None),
+]
+# WTW content has no end marker of its own; it stops at whichever of these comes first
+WTW_HTML_STOPS = ['<!-- Leak Tab Content -->', '<!-- Terminal Tab Content -->', '<!-- Footer -->']
+
+SHARED_JS = ('<!-- Shared JS Start -->', '<!-- Shared JS End -->')   # shared_js.START / END: engines, not data
+DATASET_RE = re.compile(r'(?:const|let|var)\s+([A-Z][A-Z0-9_]{2,})\s*=\s*(?=[\[{])')
+JSON_BLOCK_RE = re.compile(r'<script type="application/json" id="([A-Za-z][A-Za-z0-9_]*)"[^>]*>(.*?)</script>', re.DOTALL)
+
+
+def nbytes(text: str) -> int:
+    return len(text.encode('utf-8'))
+
+
+def fmt(n: int) -> str:
+    if n >= MB:
+        return f'{n / MB:.2f}MB'
+    return f'{n / KB:.1f}KB'
+
+
+def literal_end(text: str, start: int) -> int:
+    """Index just past the JSON/JS literal that opens at text[start] ('[' or '{')."""
+    depth, i, n = 0, start, len(text)
+    quote = None
+    while i < n:
+        c = text[i]
+        if quote:
+            if c == '\\':
+                i += 2
+                continue
+            if c == quote:
+                quote = None
+        elif c in '"\'`':
+            quote = c
+        elif c in '[{':
+            depth += 1
+        elif c in ']}':
+            depth -= 1
+            if depth == 0:
+                return i + 1
+        i += 1
+    return n
+
+
+def tab_sections(html: str) -> dict[str, int]:
+    """Bytes per tab (content markup + tab script). Whatever is left is the TnT shell."""
+    sizes = {}
+    for tab, hs, he, js, je in TAB_MARKERS:
+        total = 0
+        s = html.find(hs)
+        if s >= 0:
+            if he:
+                e = html.find(he, s)
+                e = e + len(he) if e >= 0 else s
+            else:
+                e = min((x for x in (html.find(m, s + len(hs)) for m in WTW_HTML_STOPS) if x >= 0),
+                        default=len(html))
+            total += nbytes(html[s:e])
+        if js:
+            m = re.search(js, html)
+            if m:
+                e = html.find(je, m.end())
+                e = e + len(je) if e >= 0 else m.end()
+                total += nbytes(html[m.start():e])
+        sizes[f'tab:{tab}'] = total
+    sizes['tab:tnt'] = max(0, nbytes(html) - sum(sizes.values()))
+    return sizes
+
+
+def dataset_sections(html: str) -> dict[str, int]:
+    """Bytes per embedded dataset: JS literals (const FOO = [...] / {...}) and JSON blocks."""
+    sizes = {}
+    start, end = html.find(SHARED_JS[0]), html.find(SHARED_JS[1])
+    if 0 <= start < end:   # engine objects such as const QUERY = {...} are code
+        html = html[:start] + html[end:]
+    for m in DATASET_RE.finditer(html):
+        end = literal_end(html, m.end())
+        if end - m.end() < 2 * KB:
+            continue  # config constants, not payloads
+        sizes[f'data:{m.group(1)}'] = sizes.get(f'data:{m.group(1)}', 0) + nbytes(html[m.end():end])
+    for m in JSON_BLOCK_RE.finditer(html):
+        name = next((base for base in SHARDED if m.group(1).startswith(base + '_')), m.group(1))
+        if len(m.group(2)) < 2 * KB and name == m.group(1):
+            continue
+        sizes[f'data:{name}'] = sizes.get(f'data:{name}', 0) + nbytes(m.group(2))
+    return sizes
+
+
+def asset_sections(html: str) -> dict[str, int]:
+    """Inline script / style totals plus the largest individual script blocks (JSON data blocks excluded)."""
+    scripts = [nbytes(m.group(1)) for m in
+               re.finditer(r'<script(?![^>]*\b(?:src=|type="application/json"))[^>]*>(.*?)</script>', html, re.DOTALL)]
+    styles = [nbytes(m.group(1)) for m in re.finditer(r'<style[^>]*>(.*?)</style>', html, re.DOTALL)]
+    return {
+        'scripts': sum(scripts),
+        'scripts:count': len(scripts),
+        'scripts:largest': max(scripts, default=0),
+        'scripts:external': len(re.findall(r'<script[^>]*\bsrc=', html)),
+        'styles': sum(styles),
+    }
+
+
+def analyze(html: str) -> dict[str, int]:
+    sizes = {'total': nbytes(html)}
+    sizes.update(tab_sections(html))
+    sizes.update(dataset_sections(html))
+    sizes.update(asset_sections(html))
+    return sizes
+
+
+def budget_for(key: str):
+    if key in BUDGETS:
+        return BUDGETS[key]
+    if key.startswith('data:'):
+        return DEFAULT_DATASET_BUDGET
+    return None
+
+
+def check(sizes: dict, previous: dict = None) -> tuple[list, list]:
+    """Return (failures, warnings) as printable strings."""
+    failures, warnings = [], []
+    for key, size in sizes.items():
+        budget = budget_for(key)
+        if budget is None:
+            continue
+        if size > budget:
+            failures.append(f'{key} is {fmt(size)} (budget {fmt(budget)})')
+        elif size > budget * WARN_AT:
+            warnings.append(f'{key} at {size * 100 // budget}% of budget ({fmt(size)} / {fmt(budget)})')
+    for key, size in (previous or {}).items():
+        if key not in sizes and budget_for(key) is not None:
+            warnings.append(f'{key} disappeared (was {fmt(size)})')
+    for key, size in sizes.items():
+        old = (previous or {}).get(key)
+        if budget_for(key) is None:
+            continue
+        if old is None:
+            if previous and key.startswith('data:'):
+                warnings.append(f'new dataset {key} ({fmt(size)})')
+            continue
+        grew = size - old
+        if grew >= REGRESSION_MIN and grew * 100 > old * REGRESSION_PCT:
+            warnings.append(f'{key} grew {fmt(grew)} (+{grew * 100 // max(old, 1)}%) since last run')
+    return failures, warnings
+
+
+def load_report() -> dict:
+    if REPORT_FILE.exists():
+        try:
+            return json.loads(REPORT_FILE.read_text())
+        except (json.JSONDecodeError, OSError):
+            pass
+    return {'history': []}
+
+
+def save_report(report: dict, sizes: dict, failures: list, warnings: list, source: str, previous: dict = None):
+    """Record a run. A build whose sizes match the previous one for this source adds no entry."""
+    if sizes == previous and report.get('budgets') == BUDGETS:
+        return
+    entry = {
+        'date': datetime.now().strftime('%Y-%m-%d %H:%M'),
+        'source': source,
+        'status': 'fail' if failures else ('warn' if warnings else 'ok'),
+        'sizes': sizes,
+    }
+    report['latest'] = {**entry, 'failures': failures, 'warnings': warnings}
+    report['budgets'] = BUDGETS
+    report['history'] = (report.get('history', []) + [entry])[-HISTORY_KEEP:]
+    REPORT_FILE.write_text(json.dumps(report, indent=1, sort_keys=True) + '\n')
+
+
+def print_breakdown(sizes: dict):
+    total = sizes['total'] or 1
+    for group in ('tab:', 'data:'):
+        rows = sorted(((k, v) for k, v in sizes.items() if k.startswith(group)), key=lambda kv: -kv[1])
+        for key, size in rows:
+            budget = budget_for(key)
+            b = f'/ {fmt(budget)}' if budget else ''
+            print(f'   {key:<28} {fmt(size):>9} {b:<10} {size * 100 / total:5.1f}%')
+    print(f"   {'scripts':<28} {fmt(sizes['scripts']):>9} "
+          f"({sizes['scripts:count']} inline, {sizes['scripts:external']} external, "
+          f"largest {fmt(sizes['scripts:largest'])})")
+    print(f"   {'styles':<28} {fmt(sizes['styles']):>9}")
+    print(f"   {'total':<28} {fmt(sizes['total']):>9} / {fmt(BUDGETS['total'])}")
+
+
+def run(path: Path = DASHBOARD, strict: bool = False) -> bool:
+    """Analyze, report and record. Returns True if the build is within budget."""
+    if not path.exists():
+        print(f'   \u274c {path.name} not found')
+        return False
+    sizes = analyze(path.read_text(encoding='utf-8'))
+    report = load_report()
+    previous = next((h['sizes'] for h in reversed(report.get('history', []))
+                     if h.get('source') == path.name), None)
+    failures, warnings = check(sizes, previous)
+    print_breakdown(sizes)
+    for w in warnings:
+        print(f'   \u26a0\ufe0f  {w}')
+    for f in failures:
+        print(f'   \u274c {f}')
+    save_report(report, sizes, failures, warnings, path.name, previous)
+    ok = not failures and not (strict and warnings)
+    if ok:
+        print(f'   \u2705 Within budget ({fmt(sizes["total"])}) \u2014 report: {REPORT_FILE.name}')
+    return ok
+
+
+def main():
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+    path = Path(args[0]) if args else DASHBOARD
+    ok = run(path, strict='--strict' in sys.argv)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+"""JS builder for the shared chart manager.
+
+Filter changes used to destroy and rebuild every Chart.js instance. The
+manager keeps one chart per canvas, patches new labels and datasets into
+it (dataset objects are kept, so Chart.js reuses its elements) and
+redraws without animation. Long line series (e.g. HIST_TIT / HIST_ROR
+daily history) are thinned with LTTB to roughly one point per pixel
+before they reach Chart.js or the PDF SVG trend.
+"""
+
+
+def build_chart_manager_js():
+    """Return the ChartManager class and the CHARTS instance (needs Chart.js at render time)."""
+    return '''
+    // ── Chart manager (reuse instances, no rebuilds) ──────────────
+    // CHARTS.render('termDaysChart', config)   first call builds the chart (animated); later calls patch
+    //   labels / datasets / options into it and redraw with update('none'). Type change or a new canvas → rebuild.
+    // CHARTS.lttb(points, threshold, x, y)      → subset of points keeping the line's visual shape
+    //   line datasets of {x, y} points longer than the canvas width are thinned automatically
+    class ChartManager {
+        constructor() {
+            this.charts = {};   // canvas id → Chart
+            this.ms = {};       // canvas id → last render time (ms)
+        }
+
+        get(id) {
+            return this.charts[id] || null;
+        }
+
+        destroy(id) {
+            if (this.charts[id]) this.charts[id].destroy();
+            delete this.charts[id];
+        }
+
+        render(id, config) {
+            const t0 = performance.now();
+            const canvas = document.getElementById(id);
+            if (!canvas) return null;
+            let chart = this.charts[id];
+            if (chart && (chart.canvas !== canvas || chart.config.type !== config.type)) {
+                this.destroy(id);
+                chart = null;
+            }
+            this.decimate(config, canvas);
+            if (!chart) {
+                chart = this.charts[id] = new Chart(canvas.getContext('2d'), config);
+            } else {
+                ChartManager.patch(chart.data, config.data);
+                // Options carry closures over the current data (onClick, tooltips): always take the new ones
+                if (config.options) chart.options = config.options;
+                chart.update('none');
+            }
+            this.ms[id] = performance.now() - t0;
+            return chart;
+        }
+
+        // Copy new data into the live object, keeping dataset identity by index
+        static patch(live, next) {
+            live.labels = next.labels || [];
+            const sets = next.datasets || [];
+            sets.forEach((ds, i) => {
+                const cur = live.datasets[i];
+                if (!cur) { live.datasets.push(ds); return; }
+                Object.keys(cur).forEach(k => { if (!(k in ds)) delete cur[k]; });
+                Object.assign(cur, ds);
+            });
+            live.datasets.length = sets.length;
+        }
+
+        decimate(config, canvas) {
+            if (config.type !== 'line') return;
+            const width = Math.max(canvas.clientWidth || canvas.width || 0, 100);
+            (config.data.datasets || []).forEach(ds => {
+                const d = ds.data;
+                if (d && d.length > width && d[0] && typeof d[0] === 'object') ds.data = ChartManager.lttb(d, width);
+            });
+        }
+
+        // Largest-Triangle-Three-Buckets: keep first and last, then per bucket the point
+        // forming the largest triangle with the previous pick and the next bucket's average
+        static lttb(data, threshold, x = p => p.x, y = p => p.y) {
+            const n = data.length;
+            if (threshold >= n || threshold < 3) return data.slice();
+            const out = [data[0]];
+            const every = (n - 2) / (threshold - 2);
+            let a = 0;
+            for (let b = 0; b < threshold - 2; b++) {
+                const nextStart = Math.floor((b + 1) * every) + 1;
+                const nextEnd = Math.min(Math.floor((b + 2) * every) + 1, n);
+                let avgX = 0, avgY = 0;
+                for (let j = nextStart; j < nextEnd; j++) { avgX += x(data[j], j); avgY += y(data[j], j); }
+                const len = nextEnd - nextStart || 1;
+                avgX /= len; avgY /= len;
+                const start = Math.floor(b * every) + 1, end = Math.floor((b + 1) * every) + 1;
+                const ax = x(data[a], a), ay = y(data[a], a);
+                let best = start, max = -1;
+                for (let j = start; j < end; j++) {
+                    const area = Math.abs((ax - avgX) * (y(data[j], j) - ay) - (ax - x(data[j], j)) * (avgY - ay));
+                    if (area > max) { max = area; best = j; }
+                }
+                out.push(data[best]);
+                a = best;
+            }
+            out.push(data[n - 1]);
+            return out;
+        }
+    }
+
+    const CHARTS = new ChartManager();
+'''
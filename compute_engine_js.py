@@ -0,0 +1,271 @@
+"""JS builder for the worker-backed compute engine.
+
+Datasets are columnized once on the main thread (dictionary-coded filter
+fields, flag bytes, search text, numeric columns) and transferred to a Web
+Worker, which owns the FilterIndex for each. Filter, cascade-option, flag
+count, column total and group-by requests come back as compact results (row ids, value
+lists, totals) so the UI thread only renders.
+
+Requests on the same channel supersede each other: the worker drops queued
+stale requests and the client resolves superseded promises with null, so
+fast typing never renders an outdated result. Results are kept in an LRU
+cache keyed by the canonical query, so repeating a filter state is served
+without a worker round trip. A dataset defined with spec.block keeps its
+columns in the IndexedDB cache under the block's content hash, so a repeat
+visit on unchanged data skips columnizing. Without Worker support the same
+code runs inline.
+"""
+
+
+def build_compute_engine_js():
+    """Return computeRun, computeWorkerMain and ComputeEngine (needs FilterIndex, LruCache, DATA_CACHE)."""
+    return '''
+    // ── Compute engine (Web Worker) ───────────────────────────────
+    // COMPUTE.define('wtw', () => WTW_DATA, spec)   spec = FilterIndex spec + sums: ['pm', ...]
+    //                                                  + block: 'WTW_DATA' (persist columns by content hash)
+    // COMPUTE.query('wtw', {
+    //   clauses, flags, text,                // filter (see FilterIndex.mask)
+    //   options: {field: clauses},           // cascade dropdown values
+    //   counts: ['ready', ...],              // flag counts within the result
+    //   totals: ['sc', ...],                 // column sums over the result
+    //   group: {by: 'fm', sums: ['pm']},     // per-value {n, sums} within the result
+    //   channel: 'wtw'                       // newer request on a channel cancels older
+    // }) → Promise<{ids, rows, options, counts, totals, groups} | null when superseded>
+    // Results are cached per canonical query and shared between callers: treat them as read-only.
+
+    // Runs inside the worker (or inline as a fallback); state = {name: FilterIndex}
+    function computeRun(state, msg) {
+        if (msg.op === 'load') {
+            const fields = {}, flags = {};
+            Object.entries(msg.fields).forEach(([f, col]) => { fields[f] = (r, i) => col.values[col.codes[i]]; });
+            Object.entries(msg.flags).forEach(([f, col]) => { flags[f] = (r, i) => col[i] === 1; });
+            const idx = new FilterIndex(Array.from({ length: msg.n }), {
+                fields, flags, text: msg.texts ? (r, i) => msg.texts[i] : null
+            });
+            idx.sums = msg.sums;
+            state[msg.name] = idx;
+            return { result: { n: msg.n }, transfer: [] };
+        }
+        const idx = state[msg.name];
+        const q = msg.query;
+        const ids = Int32Array.from(idx.ids(idx.mask(q.clauses || {}, q.flags || []), q.text || ''));
+        const result = { ids };
+        if (q.options) {
+            result.options = {};
+            Object.entries(q.options).forEach(([f, clauses]) => { result.options[f] = idx.options(f, clauses); });
+        }
+        if (q.counts) {
+            result.counts = {};
+            q.counts.forEach(f => {
+                const fb = idx.flagBits[f];
+                let n = 0;
+                if (fb) for (const i of ids) if (fb[i >>> 5] & (1 << (i & 31))) n++;
+                result.counts[f] = n;
+            });
+        }
+        if (q.totals) {
+            result.totals = {};
+            q.totals.forEach(c => {
+                const col = idx.sums[c];
+                let t = 0;
+                if (col) for (const i of ids) if (col[i] === col[i]) t += col[i];
+                result.totals[c] = t;
+            });
+        }
+        if (q.group) {
+            const by = idx.getters[q.group.by];
+            const sums = (q.group.sums || []).filter(c => idx.sums[c]);
+            const groups = {};
+            for (const i of ids) {
+                const k = by(undefined, i);
+                const g = groups[k] || (groups[k] = { n: 0, sums: {} });
+                g.n++;
+                for (const c of sums) {
+                    const v = idx.sums[c][i];
+                    if (v === v) g.sums[c] = (g.sums[c] || 0) + v;
+                }
+            }
+            result.groups = groups;
+        }
+        return { result, transfer: [ids.buffer] };
+    }
+
+    // Worker entry: drains the queue once per task so a burst of requests on
+    // one channel only computes the last of them
+    function computeWorkerMain(scope) {
+        const state = {};
+        let queue = [];
+        scope.onmessage = e => {
+            queue.push(e.data);
+            if (queue.length === 1) setTimeout(drain, 0);
+        };
+        function drain() {
+            const batch = queue;
+            queue = [];
+            const latest = {};
+            batch.forEach(m => { if (m.channel) latest[m.channel] = m.id; });
+            for (const m of batch) {
+                if (m.channel && latest[m.channel] !== m.id) {
+                    scope.postMessage({ id: m.id, stale: true });
+                    continue;
+                }
+                try {
+                    const out = computeRun(state, m);
+                    scope.postMessage({ id: m.id, result: out.result }, out.transfer);
+                } catch (err) {
+                    scope.postMessage({ id: m.id, error: String(err && err.message || err) });
+                }
+            }
+        }
+    }
+
+    class ComputeEngine {
+        constructor() {
+            this.sets = {};          // name → {rows: () => [], spec, loaded}
+            this.pending = new Map();
+            this.latest = {};
+            this.seq = 0;
+            this.local = null;       // inline state when no worker
+            this.worker = null;
+            this.cache = new LruCache('compute results', 48);
+            try {
+                const src = FilterIndex.toString() + '\\n' + computeRun.toString() + '\\n('
+                    + computeWorkerMain.toString() + ')(self);';
+                this.worker = new Worker(URL.createObjectURL(new Blob([src], { type: 'text/javascript' })));
+                this.worker.onmessage = e => this.settle(e.data);
+                this.worker.onerror = e => { console.warn('Compute worker failed, running inline:', e.message); this.fallback(); };
+            } catch (e) {
+                this.fallback();
+            }
+        }
+
+        fallback() {
+            if (this.worker) this.worker.terminate();
+            this.worker = null;
+            this.local = {};
+            Object.values(this.sets).forEach(s => { s.loaded = false; });
+            const replay = [...this.pending.values()].filter(p => p.msg.op === 'query');
+            this.pending.clear();
+            replay.forEach(p => this.send(p.msg, p));
+        }
+
+        // spec.block names the dataset's JSON block: its columns persist across visits (DATA_CACHE)
+        define(name, rows, spec) {
+            const key = spec.block ? DATA_CACHE.key(spec.block, 'compute', spec) : null;
+            const s = this.sets[name] = { rows, spec, loaded: false, data: null, key, stored: null };
+            if (key) DATA_CACHE.get(key).then(msg => { if (msg && !s.loaded) s.stored = msg; });
+        }
+
+        rows(name) {
+            const s = this.sets[name];
+            if (!s.data) s.data = s.rows();
+            return s.data;
+        }
+
+        // Columnize a dataset once: dictionary-coded fields, flag bytes, text, numeric sums
+        columns(name) {
+            const s = this.sets[name];
+            if (s.stored) {
+                const msg = s.stored;
+                s.stored = null;   // its buffers are transferred to the worker
+                return { msg, transfer: ComputeEngine.buffers(msg) };
+            }
+            const spec = s.spec, rows = this.rows(name);
+            const n = rows.length, msg = { op: 'load', name, n, fields: {}, flags: {}, sums: {}, texts: null };
+            const fields = Array.isArray(spec.fields) ? Object.fromEntries(spec.fields.map(f => [f, r => r[f]])) : (spec.fields || {});
+            Object.entries(fields).forEach(([f, get]) => {
+                const values = [], lookup = new Map(), codes = new Int32Array(n);
+                rows.forEach((r, i) => {
+                    const v = get(r);
+                    const key = v == null ? '' : String(v);
+                    let c = lookup.get(key);
+                    if (c === undefined) { c = values.length; values.push(key); lookup.set(key, c); }
+                    codes[i] = c;
+                });
+                msg.fields[f] = { values, codes };
+            });
+            Object.entries(spec.flags || {}).forEach(([f, test]) => {
+                const col = new Uint8Array(n);
+                rows.forEach((r, i) => { if (test(r)) col[i] = 1; });
+                msg.flags[f] = col;
+            });
+            (spec.sums || []).forEach(c => {
+                const col = new Float64Array(n);
+                rows.forEach((r, i) => { const v = parseFloat(r[c]); col[i] = isNaN(v) ? NaN : v; });
+                msg.sums[c] = col;
+            });
+            if (spec.text) msg.texts = rows.map(r => spec.text(r));
+            if (s.key) DATA_CACHE.put(s.key, msg);   // cloned now, before the buffers move
+            return { msg, transfer: ComputeEngine.buffers(msg) };
+        }
+
+        static buffers(msg) {
+            return [...Object.values(msg.fields).map(c => c.codes.buffer),
+                ...Object.values(msg.flags).map(c => c.buffer), ...Object.values(msg.sums).map(c => c.buffer)];
+        }
+
+        // Canonical query key: sorted object keys; '' / undefined values dropped
+        static key(v) {
+            if (Array.isArray(v)) return '[' + v.map(ComputeEngine.key).join(',') + ']';
+            if (v && typeof v === 'object') {
+                return '{' + Object.keys(v).sort().filter(k => v[k] !== '' && v[k] !== undefined)
+                    .map(k => JSON.stringify(k) + ':' + ComputeEngine.key(v[k])).join(',') + '}';
+            }
+            return JSON.stringify(v);
+        }
+
+        query(name, q) {
+            const key = name + '|' + ComputeEngine.key({ ...q, channel: undefined });
+            const hit = this.cache.get(key);
+            if (hit) {
+                if (q.channel) this.latest[q.channel] = ++this.seq;   // still supersedes in-flight requests
+                return Promise.resolve(hit);
+            }
+            const s = this.sets[name];
+            if (!s.loaded) {
+                const { msg, transfer } = this.columns(name);
+                s.loaded = true;
+                this.send(msg, null, transfer);
+            }
+            return new Promise((resolve, reject) => {
+                this.send({ op: 'query', name, query: q, channel: q.channel || null }, { resolve, reject, key });
+            });
+        }
+
+        send(msg, handlers, transfer = []) {
+            msg.id = ++this.seq;
+            if (msg.channel) this.latest[msg.channel] = msg.id;
+            if (handlers) this.pending.set(msg.id, Object.assign(handlers, { msg }));
+            if (this.worker) {
+                this.worker.postMessage(msg, transfer);
+                return;
+            }
+            if (msg.op === 'load') return computeRun(this.local, msg);
+            if (!this.local[msg.name]) computeRun(this.local, this.columns(msg.name).msg);
+            // Inline: still async, so a newer request on the channel wins the same way
+            Promise.resolve().then(() => {
+                if (msg.channel && this.latest[msg.channel] !== msg.id) return this.settle({ id: msg.id, stale: true });
+                try { this.settle({ id: msg.id, result: computeRun(this.local, msg).result }); }
+                catch (err) { this.settle({ id: msg.id, error: String(err && err.message || err) }); }
+            });
+        }
+
+        settle(data) {
+            const p = this.pending.get(data.id);
+            if (!p) return;
+            this.pending.delete(data.id);
+            const ch = p.msg.channel, res = data.result;
+            if (res) {
+                // Cache superseded results too: flipping back to a state is common
+                const rows = this.rows(p.msg.name);
+                res.rows = Array.from(res.ids, i => rows[i]);
+                this.cache.set(p.key, res);
+            }
+            if (data.stale || (ch && this.latest[ch] !== data.id)) return p.resolve(null);
+            if (data.error) return p.reject(new Error(data.error));
+            p.resolve(res);
+        }
+    }
+
+    const COMPUTE = new ComputeEngine();
+'''
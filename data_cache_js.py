@@ -0,0 +1,115 @@
+"""JS builder for the persistent (IndexedDB) cache of derived dataset structures.
+
+Every embedded dataset block carries a content hash (payload.json_script).
+Structures derived from a dataset (the compute engine's dictionary-coded
+columns, sort permutations) are stored in IndexedDB under that hash and
+read back on the next visit while the hash still matches, so a bookmark
+reopened on unchanged data skips the columnize and sort work. Storing a
+new version of a dataset drops the old ones; the store is capped overall
+by last use.
+"""
+
+
+def build_data_cache_js():
+    """Return the DataCache class and the DATA_CACHE instance (needs lazyData)."""
+    return '''
+    // ── Persistent cache (IndexedDB, keyed by dataset content hash) ──
+    // DATA_CACHE.key('WTW_DATA', 'compute', spec)  → 'WTW_DATA:<hash>:compute:<spec hash>' (null if no hash)
+    // DATA_CACHE.get(key)                          → Promise<value | undefined>
+    // DATA_CACHE.put(key, value)                   stores synchronously once the DB is open (value is cloned
+    //                                              at the call, so transferring its buffers afterwards is safe)
+    // Storing under a new hash evicts that dataset's older hashes; at most `limit` entries overall (LRU).
+    class DataCache {
+        constructor(dbName, limit = 96) {
+            this.limit = limit;
+            this.db = null;
+            this.ready = new Promise(resolve => {
+                try {
+                    const req = indexedDB.open(dbName, 1);
+                    req.onupgradeneeded = () => {
+                        const store = req.result.createObjectStore('entries', { keyPath: 'key' });
+                        store.createIndex('group', 'group');
+                        store.createIndex('at', 'at');
+                    };
+                    req.onsuccess = () => { this.db = req.result; resolve(this.db); };
+                    req.onerror = req.onblocked = () => resolve(null);
+                } catch (e) {
+                    resolve(null);   // no IndexedDB (private mode, old browser): everything is a miss
+                }
+            });
+        }
+
+        // FNV-1a over text (spec source, column getters) → 8 hex chars
+        static hashText(text) {
+            let h = 0x811c9dc5;
+            for (let i = 0; i < text.length; i++) {
+                h ^= text.charCodeAt(i);
+                h = Math.imul(h, 0x01000193);
+            }
+            return (h >>> 0).toString(16).padStart(8, '0');
+        }
+
+        key(block, kind, spec) {
+            const hash = lazyData.hash(block);
+            if (!hash) return null;
+            const text = JSON.stringify(spec === undefined ? null : spec, (k, v) => typeof v === 'function' ? v.toString() : v);
+            return block + ':' + hash + ':' + kind + ':' + DataCache.hashText(text);
+        }
+
+        get(key) {
+            if (!key) return Promise.resolve(undefined);
+            return this.ready.then(db => new Promise(resolve => {
+                if (!db) return resolve(undefined);
+                const tx = db.transaction('entries', 'readwrite');
+                const store = tx.objectStore('entries');
+                const req = store.get(key);
+                req.onsuccess = () => {
+                    const entry = req.result;
+                    if (!entry) return resolve(undefined);
+                    entry.at = Date.now();
+                    store.put(entry);
+                    resolve(entry.value);
+                };
+                req.onerror = () => resolve(undefined);
+            }));
+        }
+
+        put(key, value) {
+            if (!key || !this.db) return false;
+            const [group, hash] = key.split(':');
+            try {
+                const tx = this.db.transaction('entries', 'readwrite');
+                const store = tx.objectStore('entries');
+                store.put({ key, group, hash, at: Date.now(), value });
+                // Older versions of this dataset
+                store.index('group').openCursor(IDBKeyRange.only(group)).onsuccess = e => {
+                    const cur = e.target.result;
+                    if (!cur) return;
+                    if (cur.value.hash !== hash) cur.delete();
+                    cur.continue();
+                };
+                tx.oncomplete = () => this.trim();
+                return true;
+            } catch (e) {
+                return false;   // quota or clone failure: the cache is only an optimization
+            }
+        }
+
+        // Least recently used entries beyond the limit
+        trim() {
+            const store = this.db.transaction('entries', 'readwrite').objectStore('entries');
+            store.count().onsuccess = e => {
+                let extra = e.target.result - this.limit;
+                if (extra <= 0) return;
+                store.index('at').openCursor().onsuccess = ev => {
+                    const cur = ev.target.result;
+                    if (!cur || extra-- <= 0) return;
+                    cur.delete();
+                    cur.continue();
+                };
+            };
+        }
+    }
+
+    const DATA_CACHE = new DataCache('tnt-dashboard-cache');
+'''
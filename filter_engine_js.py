@@ -0,0 +1,145 @@
+"""JS builder for the shared bitmap filter engine used by every tab.
+
+A FilterIndex is built once per dataset: one posting list per (field, value),
+materialized as a bitset the first time a filter touches it, plus one bitset
+per boolean flag (e.g. WTW 'ready', Leak 'over'). A filter state is the AND of
+its clauses, so a query only visits the rows that survive.
+"""
+
+
+def build_filter_engine_js():
+    """Return the FilterIndex class (no dependencies, plain ES6)."""
+    return '''
+    // ── Bitmap filter engine ──────────────────────────────────────
+    // spec = {
+    //   fields: ['srd', 'fm', ...] or {name: row => key},   // equality filters
+    //   flags:  {name: row => bool},                        // precomputed predicates
+    //   text:   row => 'lowercase search string'            // substring search
+    // }
+    // Accessors also get the row index, so columns can stand in for rows.
+    class FilterIndex {
+        constructor(rows, spec) {
+            this.rows = rows;
+            this.size = rows.length;
+            this.words = (rows.length + 31) >>> 5;
+            this.getters = {};
+            const fields = spec.fields || [];
+            if (Array.isArray(fields)) fields.forEach(f => {
+                this.getters[f] = r => r[f];
+            });
+            else Object.assign(this.getters, fields);
+            this.textFn = spec.text || null;
+            this.texts = null;
+            this.postings = {};
+            this.bitsets = new Map();
+            this.flagBits = {};
+
+            const names = Object.keys(this.getters);
+            const flags = spec.flags || {};
+            const flagNames = Object.keys(flags);
+            names.forEach(f => { this.postings[f] = new Map(); });
+            flagNames.forEach(f => { this.flagBits[f] = new Uint32Array(this.words); });
+            for (let i = 0; i < rows.length; i++) {
+                const r = rows[i];
+                for (const f of names) {
+                    const v = this.getters[f](r, i);
+                    const key = v == null ? '' : String(v);
+                    const list = this.postings[f].get(key);
+                    if (list) list.push(i);
+                    else this.postings[f].set(key, [i]);
+                }
+                for (const f of flagNames) {
+                    if (flags[f](r, i)) this.flagBits[f][i >>> 5] |= 1 << (i & 31);
+                }
+            }
+        }
+
+        // Bitset for field === value (cached after first use)
+        bits(field, value) {
+            const key = field + '\\u0000' + value;
+            let bs = this.bitsets.get(key);
+            if (!bs) {
+                bs = new Uint32Array(this.words);
+                const ids = (this.postings[field] && this.postings[field].get(String(value))) || [];
+                for (const i of ids) bs[i >>> 5] |= 1 << (i & 31);
+                this.bitsets.set(key, bs);
+            }
+            return bs;
+        }
+
+        all() {
+            const m = new Uint32Array(this.words).fill(0xFFFFFFFF);
+            if (this.size & 31) m[this.words - 1] = (2 ** (this.size & 31)) - 1;
+            return m;
+        }
+
+        // Clauses {field: value | [values]} (or a list of such maps) → bitset.
+        // Empty values are ignored, arrays are OR'd, fields, maps and flags are
+        // AND'd. Unknown flags are ignored.
+        mask(clauses = {}, flags = []) {
+            const m = this.all();
+            for (const [field, val] of [].concat(clauses).flatMap(c => Object.entries(c))) {
+                if (val === '' || val == null || (Array.isArray(val) && !val.length)) continue;
+                let bs;
+                if (Array.isArray(val)) {
+                    bs = new Uint32Array(this.words);
+                    val.forEach(v => { const b = this.bits(field, v); for (let w = 0; w < this.words; w++) bs[w] |= b[w]; });
+                }
+                else bs = this.bits(field, val);
+                for (let w = 0; w < this.words; w++) m[w] &= bs[w];
+            }
+            for (const f of flags) {
+                const fb = this.flagBits[f];
+                if (fb) for (let w = 0; w < this.words; w++) m[w] &= fb[w];
+            }
+            return m;
+        }
+
+        searchTexts() {
+            if (!this.texts) this.texts = this.rows.map((r, i) => this.textFn ? this.textFn(r, i) : '');
+            return this.texts;
+        }
+
+        // Row ids in a mask (dataset order), optionally narrowed by a lowercase substring
+        ids(m, text) {
+            const texts = text ? this.searchTexts() : null;
+            const out = [];
+            for (let w = 0; w < this.words; w++) {
+                let word = m[w];
+                while (word) {
+                    const low = word & -word;
+                    const i = (w << 5) + (31 - Math.clz32(low));
+                    word ^= low;
+                    if (texts && !texts[i].includes(text)) continue;
+                    out.push(i);
+                }
+            }
+            return out;
+        }
+
+        // Rows matching clauses + opts.flags + opts.text, in dataset order
+        query(clauses, opts = {}) {
+            return this.ids(this.mask(clauses, opts.flags || []), opts.text || '').map(i => this.rows[i]);
+        }
+
+        // Non-empty values of field that still have rows under the given clauses (sorted)
+        options(field, clauses = {}) {
+            const m = this.mask(clauses);
+            const out = [];
+            for (const [v, ids] of this.postings[field] || []) {
+                if (v && ids.some(i => m[i >>> 5] & (1 << (i & 31)))) out.push(v);
+            }
+            return out.sort();
+        }
+
+        static count(m) {
+            let n = 0;
+            for (let w = 0; w < m.length; w++) {
+                let x = m[w] - ((m[w] >>> 1) & 0x55555555);
+                x = (x & 0x33333333) + ((x >>> 2) & 0x33333333);
+                n += Math.imul((x + (x >>> 4)) & 0x0F0F0F0F, 0x01010101) >>> 24;
+            }
+            return n;
+        }
+    }
+'''
@@ -0,0 +1,43 @@
+"""JS builder for lazily parsed datasets.
+
+Tab datasets are embedded as <script type="application/json" id=NAME>
+blocks (payload.json_script) instead of JS literals, so loading the page
+does not parse or compile megabytes of data for tabs nobody opened.
+lazyData(NAME) defines the global NAME as a getter that parses its block
+on first read and then replaces itself with the plain value. Packed
+series blocks (payload.dumps_series) come back as a SeriesTable.
+"""
+
+
+def build_lazy_data_js():
+    """Return lazyData (needs SeriesTable)."""
+    return '''
+    // ── Lazily parsed datasets ────────────────────────────────────
+    // lazyData('WTW_DATA', 'WTW_SUMMARY')   → WTW_DATA parses the JSON block whose id is WTW_DATA
+    //                                         on first read (tab init, store panel, PDF), then is a plain global
+    //                                         (a SeriesTable if the block holds packed series)
+    // lazyData.parsed                       → {name: parse time in ms} for every dataset read so far
+    // lazyData.hash('WTW_DATA')             → the block's content hash (data-hash), without parsing it
+    function lazyData(...names) {
+        names.forEach(name => {
+            Object.defineProperty(window, name, {
+                configurable: true,
+                get() {
+                    const t0 = performance.now();
+                    const el = document.getElementById(name);
+                    let value = el ? JSON.parse(el.textContent) : null;
+                    if (value && value.enc === 'series') value = new SeriesTable(value);
+                    if (el) el.textContent = '';   // the parsed copy is the only one kept
+                    Object.defineProperty(window, name, { value, writable: true, configurable: true });
+                    lazyData.parsed[name] = Math.round(performance.now() - t0);
+                    return value;
+                }
+            });
+        });
+    }
+    lazyData.parsed = {};
+    lazyData.hash = name => {
+        const el = document.getElementById(name);
+        return el ? el.getAttribute('data-hash') : null;
+    };
+'''
@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""Leak datasets built from raw leak events kept in monthly partitions.
+
+refresh.py pulls raw leak events into ~/bigquery_results/leak_events/
+as one YYYY-MM.jsonl file per month. Only months that are missing or
+still open are queried: the current month on every refresh, and the
+previous one until FREEZE_AFTER_DAYS into the new month (late entries).
+After that a month is frozen and never pulled again. The store dimension
+(org from store_tabular_view, one static charge per asset summed per
+store) is re-pulled alongside. add_leak_tab.py rebuilds the CY store totals,
+per-store monthly series, cumulative YoY curves and CY leak events from
+the partitions in a few seconds.
+
+Both leak tables are checked against the dataset's INFORMATION_SCHEMA
+before every pull; if a table or column is missing nothing is pulled and
+the last good partitions stay in place.
+
+The leak source tables are not confirmed yet (DATA_SOURCES.md change
+log), so the pipeline is off by default: refresh.py only pulls and
+add_leak_tab.py only reads the partitions when LEAK_PIPELINE=1 is set.
+Until then the Leak tab keeps using the hand-pulled exports.
+
+Usage:
+    python3 leak_pipeline.py            # pull stale months
+    python3 leak_pipeline.py --rebuild  # re-pull every month in the window
+"""
+import csv
+import json
+import os
+import subprocess
+import sys
+from datetime import date, timedelta
+from pathlib import Path
+
+from bq import bq_csv
+from payload import atomic_write_text, dumps, store_key
+
+BQ_DIR = Path.home() / 'bigquery_results'
+PARTITION_DIR = BQ_DIR / 'leak_events'
+MANIFEST = PARTITION_DIR / 'manifest.json'
+STORE_FILE = BQ_DIR / 'leak-stores.csv'   # store / org / asset charge dimension
+
+YEARS = 3                 # current year + 2 prior, for the cumulative YoY chart
+FREEZE_AFTER_DAYS = 7     # a month is final this many days after it ends
+ENABLED = os.environ.get('LEAK_PIPELINE') == '1'   # off until the source tables are confirmed
+
+# Leak source tables (not yet on the DATA_SOURCES.md approved list, see its change log).
+# Every column the queries read is listed here and verified before each pull.
+LEAK_DATASET = 're-ods-prod.us_re_ods_prod_pub'
+LEAK_EVENTS_TABLE = 'refrigerant_leak_event'
+LEAK_ASSETS_TABLE = 'refrigerant_asset'
+LEAK_COLUMNS = {
+    LEAK_EVENTS_TABLE: ['store_nbr', 'tracking_nbr', 'leak_date', 'trigger_qty', 'tag_id', 'repair_date'],
+    LEAK_ASSETS_TABLE: ['store_nbr', 'tag_id', 'static_charge'],
+}
+
+QUERY_LEAK_COLUMNS = f"""
+SELECT table_name, column_name
+FROM `{LEAK_DATASET}.INFORMATION_SCHEMA.COLUMNS`
+WHERE table_name IN UNNEST(@tables)
+"""
+
+# Raw leak events; columns match the fields of the old hand-pulled leak-wo export
+QUERY_LEAK_EVENTS = f"""
+SELECT
+  CAST(store_nbr AS STRING) AS store_nbr,
+  CAST(tracking_nbr AS STRING) AS tr,
+  FORMAT_DATE('%Y-%m-%d', DATE(leak_date)) AS leak_date,
+  trigger_qty,
+  tag_id,
+  FORMAT_DATE('%Y-%m-%d', DATE(repair_date)) AS repair_date
+FROM `{LEAK_DATASET}.{LEAK_EVENTS_TABLE}`
+WHERE DATE(leak_date) >= @start AND DATE(leak_date) < @end
+"""
+
+# Store dimension: org from store_tabular_view, asset count / static charge per store.
+# An asset can have several rows in the asset table; its charge is counted once.
+QUERY_LEAK_STORES = f"""
+SELECT
+  CAST(s.store_number AS STRING) AS store_nbr,
+  s.store_name, s.city_name, s.state_cd, s.banner_desc,
+  s.fm_sr_director_name, s.fm_director_name, s.fm_regional_manager_name,
+  s.fs_manager_name, CAST(s.fs_market AS STRING) AS fs_market,
+  a.asset_count, a.total_static_charge
+FROM `re-crystal-mdm-prod.crystal.store_tabular_view` s
+JOIN (
+  SELECT store_number,
+         COUNT(*) AS asset_count,
+         ROUND(SUM(static_charge), 1) AS total_static_charge
+  FROM (
+    SELECT SAFE_CAST(store_nbr AS INT64) AS store_number, tag_id,
+           MAX(static_charge) AS static_charge
+    FROM `{LEAK_DATASET}.{LEAK_ASSETS_TABLE}`
+    GROUP BY 1, 2
+  )
+  GROUP BY 1
+) a ON a.store_number = s.store_number
+WHERE s.country_cd = 'US'
+ORDER BY s.store_number
+"""
+
+
+def month_start(key: str) -> date:
+    return date(int(key[:4]), int(key[5:7]), 1)
+
+
+def next_month(d: date) -> date:
+    return date(d.year + d.month // 12, d.month % 12 + 1, 1)
+
+
+def window_months(today: date) -> list[str]:
+    """'YYYY-MM' keys from January YEARS-1 years back through the current month."""
+    keys, d = [], date(today.year - YEARS + 1, 1, 1)
+    while d <= today:
+        keys.append(f'{d:%Y-%m}')
+        d = next_month(d)
+    return keys
+
+
+def load_manifest() -> dict:
+    """{'YYYY-MM': {'pulled': ISO date, 'rows': n, 'frozen': bool}}."""
+    try:
+        return json.loads(MANIFEST.read_text(encoding='utf-8'))
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def is_final(key: str, today: date) -> bool:
+    return today >= next_month(month_start(key)) + timedelta(days=FREEZE_AFTER_DAYS)
+
+
+def stale_months(manifest: dict, today: date, rebuild: bool = False) -> list[str]:
+    return [k for k in window_months(today)
+            if rebuild or k not in manifest or not manifest[k].get('frozen')]
+
+
+def missing_columns() -> list[str]:
+    """'table.column' for every LEAK_COLUMNS entry the dataset does not have."""
+    lines = bq_csv(QUERY_LEAK_COLUMNS, {'tables': ('ARRAY<STRING>', list(LEAK_COLUMNS))}, max_rows=1000, timeout=60)
+    have = {(r['table_name'], r['column_name']) for r in csv.DictReader(lines)}
+    return [f'{t}.{c}' for t, cols in LEAK_COLUMNS.items() for c in cols if (t, c) not in have]
+
+
+def pull_stores() -> int:
+    """Rewrite STORE_FILE from BQ; returns the store count."""
+    lines = bq_csv(QUERY_LEAK_STORES, {}, max_rows=20000, timeout=120)
+    BQ_DIR.mkdir(parents=True, exist_ok=True)
+    atomic_write_text(STORE_FILE, '\n'.join(lines) + '\n')
+    return len(lines) - 1
+
+
+def pull(today: date = None, rebuild: bool = False) -> bool:
+    """Check the sources, re-pull the store dimension and the stale months. False if BQ failed."""
+    today = today or date.today()
+    try:
+        missing = missing_columns()
+        if missing:
+            print(f'   ⚠️  Leak sources in {LEAK_DATASET} are missing {", ".join(missing)}; '
+                  'not pulling, keeping existing partitions')
+            return False
+        print(f'   ✅ {pull_stores():,} stores with asset charge')
+    except subprocess.TimeoutExpired:
+        print('   ⚠️  Leak store query timed out, keeping existing partitions')
+        return False
+    except Exception as e:
+        print(f'   ⚠️  Leak store query failed: {str(e)[:200]}, keeping existing partitions')
+        return False
+
+    manifest = load_manifest()
+    months = stale_months(manifest, today, rebuild)
+    frozen = sum(1 for k in window_months(today) if k not in months)
+    if not months:
+        print(f'   Leak partitions: all {frozen} months frozen, nothing to pull')
+        return True
+    start, end = month_start(months[0]), next_month(month_start(months[-1]))
+    print(f'   Pulling leak events {months[0]} .. {months[-1]} ({len(months)} open, {frozen} frozen)...')
+    try:
+        lines = bq_csv(QUERY_LEAK_EVENTS, {'start': ('DATE', start.isoformat()), 'end': ('DATE', end.isoformat())},
+                       max_rows=500000, timeout=300)
+    except subprocess.TimeoutExpired:
+        print('   ⚠️  Leak event query timed out, keeping existing partitions')
+        return False
+    except Exception as e:
+        print(f'   ⚠️  Leak event query failed: {str(e)[:200]}, keeping existing partitions')
+        return False
+
+    by_month = {k: [] for k in months}
+    for r in csv.DictReader(lines):
+        key = (r.get('leak_date') or '')[:7]
+        if key in by_month:
+            by_month[key].append({
+                's': r['store_nbr'], 'tr': r.get('tr', ''), 'dt': r['leak_date'],
+                'qty': round(float(r.get('trigger_qty') or 0), 2), 'tag': r.get('tag_id', ''),
+                'rep': r.get('repair_date', ''),
+            })
+    PARTITION_DIR.mkdir(parents=True, exist_ok=True)
+    for key, rows in by_month.items():
+        rows.sort(key=store_key('s', 'dt', 'tr'))
+        atomic_write_text(PARTITION_DIR / f'{key}.jsonl', ''.join(dumps(r) + '\n' for r in rows))
+        manifest[key] = {'pulled': today.isoformat(), 'rows': len(rows), 'frozen': is_final(key, today)}
+    atomic_write_text(MANIFEST, json.dumps(manifest, indent=1, sort_keys=True) + '\n')
+    newly = [k for k in months if manifest[k]['frozen']]
+    print(f'   ✅ {sum(len(r) for r in by_month.values()):,} leak events'
+          + (f', froze {len(newly)} month(s) through {newly[-1]}' if newly else ''))
+    return True
+
+
+def has_partitions() -> bool:
+    return ENABLED and MANIFEST.exists() and STORE_FILE.exists()
+
+
+def load_events(today: date = None) -> list[dict]:
+    """Every event in the window, read from the local partitions."""
+    events = []
+    for key in window_months(today or date.today()):
+        path = PARTITION_DIR / f'{key}.jsonl'
+        if path.exists():
+            with open(path, encoding='utf-8') as f:
+                events.extend(json.loads(line) for line in f if line.strip())
+    return events
+
+
+def build(stores: list[dict], today: date = None) -> dict:
+    """Leak datasets for add_leak_tab from the partitions.
+
+    stores: compressed store rows (s, sc = static charge). Their leak
+    columns (tl, tq, cyl, cytq, cylr) are recomputed in place. Returns
+    {'cumul': rows of yr/mo/cumulative_rate_pct, 'wos': CY events by store,
+     'monthly': {store: [[y, m, lbs], ...]}}.
+    """
+    today = today or date.today()
+    events = load_events(today)
+    by_store = {d['s']: d for d in stores}
+    for d in stores:
+        d.update({'tl': 0, 'tq': 0.0, 'cyl': 0, 'cytq': 0.0})
+
+    monthly, fleet_month, wos = {}, {}, {}
+    dropped, dropped_qty, dropped_stores = 0, 0.0, set()
+    for e in events:
+        d = by_store.get(e['s'])
+        if d is None:   # no asset charge on record, no rate to add it to
+            dropped += 1
+            dropped_qty += e['qty']
+            dropped_stores.add(e['s'])
+            continue
+        y, m, q = int(e['dt'][:4]), int(e['dt'][5:7]), e['qty']
+        d['tl'] += 1
+        d['tq'] += q
+        if y == today.year:
+            d['cyl'] += 1
+            d['cytq'] += q
+            wos.setdefault(e['s'], []).append({'tr': e['tr'], 'dt': e['dt'], 'qty': q, 'tag': e['tag'], 'rep': e['rep']})
+        monthly.setdefault(e['s'], {}).setdefault((y, m), 0.0)
+        monthly[e['s']][(y, m)] += q
+        fleet_month[(y, m)] = fleet_month.get((y, m), 0.0) + q
+
+    if dropped:
+        first = sorted(dropped_stores, key=lambda x: (len(x), x))[:10]
+        print(f'   ⚠️  {dropped:,} leak events ({dropped_qty:,.1f} lbs) at {len(dropped_stores):,} stores '
+              f'missing from the store dimension were left out (stores {", ".join(first)}'
+              f'{", ..." if len(dropped_stores) > len(first) else ""})')
+    for d in stores:
+        d['tq'], d['cytq'] = round(d['tq'], 1), round(d['cytq'], 1)
+        d['cylr'] = round(d['cytq'] / d['sc'] * 100, 2) if d['sc'] else 0
+    for rows in wos.values():
+        rows.sort(key=lambda w: (w['dt'], w['tr']), reverse=True)
+
+    fleet_charge = sum(d['sc'] for d in stores) or 1
+    cumul = []
+    for year in range(today.year - YEARS + 1, today.year + 1):
+        running = 0.0
+        for m in range(1, 13 if year < today.year else today.month + 1):
+            running += fleet_month.get((year, m), 0.0)
+            cumul.append({'yr': year, 'mo': m, 'cumulative_rate_pct': round(running / fleet_charge * 100, 4)})
+
+    return {
+        'cumul': cumul,
+        'wos': wos,
+        'monthly': {s: [[y, m, round(q, 1)] for (y, m), q in sorted(series.items())] for s, series in monthly.items()},
+    }
+
+
+def main():
+    ok = pull(rebuild='--rebuild' in sys.argv)
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,7 @@
 """HTML builder for Leak Management tab — v5."""
 
+from payload import json_script
+
 THRESHOLD = 9
 B = '#0053e2'   # Walmart blue.100
 S = '#ffc220'   # spark.100
@@ -7,8 +9,9 @@ R = '#ea1100'   # red.100
 G = '#2a8703'   # green.100
 
 
-def build_leak_html(fleet_charge, cy_tq, cy_rate, cy_leaks, threshold_lbs, burn):
+def build_leak_html(fleet_charge, cy_tq, cy_rate, cy_leaks, threshold_lbs, burn, datasets=None):
     T = THRESHOLD
+    data_blocks = ''.join(f'\n    {json_script(name, text)}' for name, text in (datasets or {}).items())
     rate_cls = f'text-[{R}]' if cy_rate > T else f'text-[{G}]'
     bar_pct = min(100, (cy_tq / threshold_lbs * 100)) if threshold_lbs else 0
     bar_color = R if cy_tq > threshold_lbs else G
@@ -225,6 +228,6 @@ def build_leak_html(fleet_charge, cy_tq, cy_rate, cy_leaks, threshold_lbs, burn)
                 </div>
             </div>
         </main>
-    </div>
+    </div>{data_blocks}
     <!-- End Leak Tab -->
     '''
\ No newline at end of file
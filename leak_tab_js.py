@@ -9,18 +9,13 @@ R = '#ea1100'
 G = '#2a8703'
 
 
-def build_leak_js(store_json, mgmt_json, cumul_json, burn_json, wo_json='{}', monthly_store_json='{}', assets_json='{}'):
+def build_leak_js(datasets):
     T = THRESHOLD
+    names = ', '.join(f"'{name}'" for name in datasets)
     return f'''
     <script>
-    // Leak Management Data
-    const LK_STORES = {store_json};
-    const LK_MGMT = {mgmt_json};
-    const LK_CUMUL = {cumul_json};
-    const LK_BURN = {burn_json};
-    const LK_WOS = {wo_json};
-    const LK_MONTHLY = {monthly_store_json};
-    const STORE_ASSETS = {assets_json};
+    // Leak Management Data: JSON blocks in the tab markup, parsed on first read (initLeakTab)
+    lazyData({names});
     const LK_T = {T};
     let lkExpandedStore = null;
     let lkYoyChart = null;
@@ -32,19 +27,16 @@ def build_leak_js(store_json, mgmt_json, cumul_json, burn_json, wo_json='{}', mo
     let lkInit = false;
     let lkMgmtChart = null;
 
-    // --- Burn rate helpers ---
-    function calcBurn(cytq, sc) {{
-        const now = new Date();
-        const jan1 = new Date(now.getFullYear(), 0, 1);
-        const elapsed = Math.max(1, Math.floor((now - jan1) / 86400000));
-        const diy = now.getFullYear() % 4 === 0 ? 366 : 365;
+    // --- Burn rate: projected per store (bpt / bpr / bcx) at build time ---
+    // Any total only needs its stores' summed projected lbs (bpt); the day counts come from LK_BURN.
+    function leakBurnTotals(sc, cytq, bpt) {{
+        const elapsed = LK_BURN.days_elapsed, diy = LK_BURN.days_in_year;
         const daily = cytq / elapsed;
-        const projTq = daily * diy;
-        const projRate = sc > 0 ? (projTq / sc * 100) : 0;
+        const projRate = sc > 0 ? (bpt / sc * 100) : 0;
         const threshLbs = sc * LK_T / 100;
         let crossDay = -1;
         if (daily > 0 && cytq < threshLbs) crossDay = elapsed + (threshLbs - cytq) / daily;
-        return {{ elapsed, diy, daily, projTq, projRate, crossDay }};
+        return {{ elapsed, diy, daily, projTq: bpt, projRate, crossDay }};
     }}
 
     function dayToDate(dayNum) {{
@@ -57,11 +49,12 @@ def build_leak_js(store_json, mgmt_json, cumul_json, burn_json, wo_json='{}', mo
         if (lkInit) return;
         lkInit = true;
         initLeakYoyChart();
+        applyLeakState(URL_STATE.read('lk'), false);
         filterLeakData();
     }}
 
     function initLeakYoyChart() {{
-        lkYoyChart = new Chart(document.getElementById('leakYoyChart').getContext('2d'), {{
+        lkYoyChart = CHARTS.render('leakYoyChart', {{
             type: 'line',
             data: {{ labels: LK_CUMUL.months, datasets: [] }},
             options: {{
@@ -88,11 +81,11 @@ def build_leak_js(store_json, mgmt_json, cumul_json, burn_json, wo_json='{}', mo
         // Build CY2026 monthly totals from filtered stores
         const monthTotals = Array(12).fill(0);
         filteredStores.forEach(sn => {{
-            const monthly = LK_MONTHLY[sn];
+            const monthly = LK_MONTHLY.get(sn);
             if (!monthly) return;
-            monthly.forEach(([y, m, q]) => {{
-                if (y === 2026) monthTotals[m - 1] += q;
-            }});
+            for (let i = 0; i < monthly.length; i++) {{
+                if (monthly.y[i] === 2026 && monthly.q[i] !== null) monthTotals[monthly.m[i] - 1] += monthly.q[i];
+            }}
         }});
 
         const now = new Date();
@@ -189,33 +182,26 @@ def build_leak_js(store_json, mgmt_json, cumul_json, burn_json, wo_json='{}', mo
             }}
         ];
 
-        lkYoyChart.data.datasets = datasets;
+        ChartManager.patch(lkYoyChart.data, {{ labels: LK_CUMUL.months, datasets }});
         lkYoyChart.options.plugins.datalabels = {{
             display: (ctx) => ctx.datasetIndex === 4 && ctx.raw !== null,
             anchor: 'top', align: 'top', color: '{B}',
             font: {{ weight: 'bold', size: 11 }},
             formatter: (v) => v.toFixed(2) + '%'
         }};
-        lkYoyChart.update();
+        lkYoyChart.update('none');
     }}
 
     function renderMgmtChart() {{
-        const mgmtMap = {{}};
-        lkFiltered.forEach(s => {{
-            const key = s.fm || 'Unknown';
-            if (!mgmtMap[key]) mgmtMap[key] = {{ fm: key, charge: 0, cytq: 0 }};
-            mgmtMap[key].charge += s.sc;
-            mgmtMap[key].cytq += s.cytq;
+        const mgmtArr = QUERY.aggregate(LK_STORES, {{
+            ids: lkIds,
+            by: [s => s.fm || 'Unknown'],
+            measures: {{ charge: ['sum', 'sc'], cytq: ['sum', 'cytq'], cylr: ['ratio', 'cytq', 'sc', 100], burnRate: ['ratio', 'bpt', 'sc', 100] }},
+            derive: m => {{ m.fm = m.key; }},
+            sort: ['burnRate', 'desc']
         }});
-        const mgmtArr = Object.values(mgmtMap).map(m => {{
-            const cylr = m.charge > 0 ? (m.cytq / m.charge * 100) : 0;
-            const burn = calcBurn(m.cytq, m.charge);
-            return {{ ...m, cylr, burnRate: burn.projRate }};
-        }});
-        mgmtArr.sort((a, b) => b.burnRate - a.burnRate);
 
-        if (lkMgmtChart) lkMgmtChart.destroy();
-        lkMgmtChart = new Chart(document.getElementById('leakMgmtChart').getContext('2d'), {{
+        lkMgmtChart = CHARTS.render('leakMgmtChart', {{
             type: 'bar',
             data: {{
                 labels: mgmtArr.map(m => m.fm),
@@ -253,71 +239,96 @@ def build_leak_js(store_json, mgmt_json, cumul_json, burn_json, wo_json='{}', mo
         }});
     }}
 
+    STORE_INDEX.register('leak', () => LK_STORES, 's');
+
+    // --- LK_STORES lives in the compute worker (filters, cascade options and KPI totals) ---
+    COMPUTE.define('leak', () => LK_STORES, {{
+        fields: ['srd', 'fm', 'rm', 'fsm', 'ban'],
+        flags: {{
+            over: s => s.cylr > LK_T,
+            burnOver: s => s.bpr > LK_T
+        }},
+        text: s => (s.s + ' ' + s.nm + ' ' + s.city + ' ' + s.mkt).toLowerCase(),
+        sums: ['sc', 'cytq', 'cyl', 'bpt'],
+        block: 'LK_STORES'
+    }});
+    const LK_ORG_FIELDS = {{ srd: 'leakFilterSrDir', fm: 'leakFilterFmDir', rm: 'leakFilterRm', fsm: 'leakFilterFsm' }};
+
     // --- Cascading Filters ---
-    function updateLeakCascade() {{
-        const vals = {{
-            srd: document.getElementById('leakFilterSrDir').value,
-            fm: document.getElementById('leakFilterFmDir').value,
-            rm: document.getElementById('leakFilterRm').value,
-            fsm: document.getElementById('leakFilterFsm').value,
-            ban: document.getElementById('leakFilterBanner').value
-        }};
-        const getValid = (ex) => LK_STORES.filter(s => {{
-            for (const [k, v] of Object.entries(vals)) if (k !== ex && v && s[k] !== v) return false;
-            return true;
-        }});
-        const fill = (id, f) => {{
-            const sel = document.getElementById(id);
-            const cur = vals[f];
-            const opts = [...new Set(getValid(f).map(s => s[f]).filter(Boolean))].sort();
-            sel.innerHTML = '<option value="">All</option>';
-            opts.forEach(v => {{ const o = new Option(v, v); if (v === cur) o.selected = true; sel.add(o); }});
-        }};
-        fill('leakFilterSrDir', 'srd');
-        fill('leakFilterFmDir', 'fm');
-        fill('leakFilterRm', 'rm');
-        fill('leakFilterFsm', 'fsm');
-        fill('leakFilterBanner', 'ban');
+    function leakFilterVals() {{
+        const vals = {{}};
+        Object.entries(LK_ORG_FIELDS).forEach(([f, id]) => {{ vals[f] = document.getElementById(id).value; }});
+        return vals;
+    }}
+
+    // Banner isn't part of the org tree, so its options still come from the worker
+    function updateLeakCascade(options) {{
+        const sel = document.getElementById('leakFilterBanner');
+        const cur = sel.value;
+        sel.innerHTML = '<option value="">All</option>';
+        (options.ban || []).forEach(v => {{ const o = new Option(v, v); if (v === cur) o.selected = true; sel.add(o); }});
     }}
 
+    // Filter state as stored in the URL hash (lk.fm=..., lk.over=1, ...)
+    function leakState() {{
+        return {{ ...leakFilterVals(), ban: document.getElementById('leakFilterBanner').value,
+                 over: document.getElementById('leakOverOnly').checked ? 1 : '',
+                 burn: document.getElementById('leakBurnOver').checked ? 1 : '',
+                 q: document.getElementById('leakSearch').value }};
+    }}
+
+    function applyLeakState(state, refilter = true) {{
+        Object.entries(LK_ORG_FIELDS).forEach(([f, id]) => UrlState.setSelect(id, state[f]));
+        UrlState.setSelect('leakFilterBanner', state.ban);
+        document.getElementById('leakOverOnly').checked = !!state.over;
+        document.getElementById('leakBurnOver').checked = !!state.burn;
+        document.getElementById('leakSearch').value = state.q || '';
+        if (refilter) filterLeakData();
+    }}
+
+    URL_STATE.register('lk', {{ tab: 'leak', read: leakState, apply: applyLeakState, ready: () => lkInit }});
+
     function filterLeakData() {{
-        const srd = document.getElementById('leakFilterSrDir').value;
-        const fm = document.getElementById('leakFilterFmDir').value;
-        const rm = document.getElementById('leakFilterRm').value;
-        const fsm = document.getElementById('leakFilterFsm').value;
-        const ban = document.getElementById('leakFilterBanner').value;
         const q = document.getElementById('leakSearch').value.toLowerCase();
-        const over = document.getElementById('leakOverOnly').checked;
-        const burnOver = document.getElementById('leakBurnOver').checked;
-
-        lkFiltered = LK_STORES.filter(s => {{
-            if (srd && s.srd !== srd) return false;
-            if (fm && s.fm !== fm) return false;
-            if (rm && s.rm !== rm) return false;
-            if (fsm && s.fsm !== fsm) return false;
-            if (ban && s.ban !== ban) return false;
-            if (over && s.cylr <= LK_T) return false;
-            if (burnOver) {{
-                const b = calcBurn(s.cytq, s.sc);
-                if (b.projRate <= LK_T) return false;
-            }}
-            if (q && !(s.s + ' ' + s.nm + ' ' + s.city + ' ' + s.mkt).toLowerCase().includes(q)) return false;
-            return true;
+        const flags = [];
+        if (document.getElementById('leakOverOnly').checked) flags.push('over');
+        if (document.getElementById('leakBurnOver').checked) flags.push('burnOver');
+        ORG_TREE.cascade('leak', LK_ORG_FIELDS);
+        const org = leakFilterVals();
+        const ban = document.getElementById('leakFilterBanner').value;
+        URL_STATE.save('lk');
+        COMPUTE.query('leak', {{
+            clauses: {{ ...org, ban }}, flags, text: q, options: {{ ban: org }},
+            totals: ['sc', 'cytq', 'cyl', 'bpt'],
+            channel: 'leak'
+        }}).then(res => {{
+            if (!res) return;  // superseded by a newer filter change
+            lkFiltered = res.rows;
+            lkIds = res.ids;
+            lkTotals = res.totals;
+            lkVersion++;
+            updateLeakCascade(res.options);
+            lkView.invalidate();
         }});
-
-        document.getElementById('leakFilteredCount').textContent = lkFiltered.length.toLocaleString();
-        updateLeakCascade();
-        updateLeakKpis();
-        updateLeakYoyChart();
-        renderMgmtChart();
-        renderLeakTable();
     }}
 
-    function updateLeakKpis() {{
-        let sc = 0, cytq = 0, cyl = 0;
-        lkFiltered.forEach(s => {{ sc += s.sc; cytq += s.cytq; cyl += s.cyl; }});
+    // Filter/sort changes repaint once per frame, and only the widgets whose inputs moved
+    let lkIds = null;
+    let lkTotals = {{ sc: 0, cytq: 0, cyl: 0, bpt: 0 }};
+    let lkVersion = 0;
+    const lkView = new RenderScheduler(() => ({{ version: lkVersion, count: lkFiltered.length, totals: lkTotals }}), {{
+        kpis: {{ select: m => [m.count, m.totals], render: ([count, totals]) => {{
+            document.getElementById('leakFilteredCount').textContent = count.toLocaleString();
+            updateLeakKpis(totals);
+        }} }},
+        charts: {{ select: m => m.version, render: () => {{ updateLeakYoyChart(); renderMgmtChart(); }} }},
+        table: {{ select: m => [m.version, lkSortField, lkSortAsc], render: renderLeakTable }}
+    }});
+
+    function updateLeakKpis(totals) {{
+        const {{ sc, cytq, cyl, bpt }} = totals;
         const rate = sc > 0 ? (cytq / sc * 100) : 0;
-        const burn = calcBurn(cytq, sc);
+        const burn = leakBurnTotals(sc, cytq, bpt);
         const thresh = Math.round(sc * LK_T / 100);
         const remain = Math.max(0, thresh - cytq);
         const pct = thresh > 0 ? Math.min(100, cytq / thresh * 100) : 0;
@@ -394,63 +405,69 @@ def build_leak_js(store_json, mgmt_json, cumul_json, burn_json, wo_json='{}', mo
     function sortLeakTable(f) {{
         if (lkSortField === f) lkSortAsc = !lkSortAsc;
         else {{ lkSortField = f; lkSortAsc = false; }}
-        renderLeakTable();
+        lkView.invalidate(false);
     }}
 
     {build_store_detail_js()}
 
     function renderLeakTable() {{
-        const sorted = [...lkFiltered].map(s => {{
-            const b = calcBurn(s.cytq, s.sc);
-            return {{ ...s, burn: b.projRate }};
-        }}).sort((a, b) => {{
-            let av = a[lkSortField], bv = b[lkSortField];
-            if (typeof av === 'string') {{ av = av || ''; bv = bv || ''; }}
-            return lkSortAsc ? (av < bv ? -1 : av > bv ? 1 : 0) : (av > bv ? -1 : av < bv ? 1 : 0);
+        getLeakTable().setRows(lkSort.sorted(lkSortField, lkSortAsc, lkIds));
+    }}
+
+    // Column orders over all of LK_STORES, built on first use
+    const lkSort = new SortCache(() => LK_STORES, {{
+        s: 'num', sc: 'num', cyl: 'num', cytq: 'num', cylr: 'num',
+        burn: ['num', s => s.bpr]
+    }}, 'LK_STORES');
+
+    let leakTable = null;
+    function getLeakTable() {{
+        if (!leakTable) leakTable = new VirtualTable('leakStoreTable', {{
+            colspan: 10,
+            rowHeight: 37,
+            key: s => s.s,
+            rowClass: s => {{
+                const hasDetail = (LK_WOS[s.s] || []).length > 0 || hasStoreAssets(s.s);
+                return `hover:bg-gray-50 ${{s.cylr > LK_T ? 'bg-red-50' : ''}} ${{lkExpandedStore === s.s ? 'bg-blue-50' : ''}} ${{hasDetail ? 'cursor-pointer' : ''}}`;
+            }},
+            row: leakRowHtml,
+            onClick: s => {{ if ((LK_WOS[s.s] || []).length > 0 || hasStoreAssets(s.s)) toggleLeakWo(s.s); }},
+            isOpen: s => lkExpandedStore === s.s,
+            detail: s => buildStoreDetail(s.s),
         }});
-        const disp = sorted.slice(0, 300);
-        const t = document.getElementById('leakStoreTable');
-        const hasWos = Object.keys(LK_WOS).length > 0;
-        t.innerHTML = disp.map(s => {{
-            const ban = s.ban && s.ban.includes('Sam')
-                ? '<span class="px-1.5 py-0.5 rounded text-xs font-semibold bg-[{B}] text-white">SAMS</span>'
-                : '<span class="px-1.5 py-0.5 rounded text-xs font-semibold bg-[{S}] text-[{B}]">WMT</span>';
-            const rClass = s.cylr > LK_T ? 'bg-[{R}] text-white' : s.cylr > LK_T * 0.7 ? 'bg-amber-500 text-white' : 'bg-[{G}] text-white';
-            const bRate = s.burn;
-            const bClass = bRate > LK_T ? 'text-[{R}] font-bold' : 'text-[{G}]';
-            const icon = bRate > LK_T * 1.5 ? '\U0001f6a8' : bRate > LK_T ? '\u26A0\uFE0F' : '\u2705';
-            const woCount = (LK_WOS[s.s] || []).length;
-            const isExpanded = lkExpandedStore === s.s;
-            const hasDetail = woCount > 0 || STORE_ASSETS[s.s];
-            const expandIcon = hasDetail ? (isExpanded ? '\u25BC' : '\u25B6') : '';
-            const clickAttr = hasDetail ? `onclick="toggleLeakWo('${{s.s}}')" style="cursor:pointer"` : '';
-            let row = `
-                <tr class="hover:bg-gray-50 ${{s.cylr > LK_T ? 'bg-red-50' : ''}} ${{isExpanded ? 'bg-blue-50' : ''}}" ${{clickAttr}}>
-                    <td class="px-3 py-1.5 text-sm font-medium text-gray-800">
-                        <span class="text-xs text-gray-400 mr-1">${{expandIcon}}</span>${{s.s}}
-                    </td>
-                    <td class="px-3 py-1.5 text-sm text-gray-600">${{s.city}}${{s.city && s.st ? ', ' : ''}}${{s.st}}</td>
-                    <td class="px-3 py-1.5 text-center">${{ban}}</td>
-                    <td class="px-3 py-1.5 text-xs text-gray-600">${{s.mkt || '-'}}</td>
-                    <td class="px-3 py-1.5 text-sm text-center">${{Math.round(s.sc).toLocaleString()}}</td>
-                    <td class="px-3 py-1.5 text-sm text-center">${{Math.round(s.cytq).toLocaleString()}}</td>
-                    <td class="px-3 py-1.5 text-center">
-                        <span class="px-2 py-0.5 rounded text-xs font-bold ${{rClass}}">${{s.cylr.toFixed(1)}}%</span>
-                    </td>
-                    <td class="px-3 py-1.5 text-center text-sm ${{bClass}}">${{bRate.toFixed(1)}}%</td>
-                    <td class="px-3 py-1.5 text-sm text-center">
-                        ${{s.cyl}}
-                        ${{woCount > 0 ? `<span class="ml-1 px-1 py-0.5 rounded bg-[{B}] text-white text-xs">${{woCount}} WO${{woCount > 1 ? 's' : ''}}</span>` : ''}}
-                    </td>
-                    <td class="px-3 py-1.5 text-center text-sm">${{icon}}</td>
-                </tr>
-            `;
-            if (isExpanded) row += buildStoreDetail(s.s);
-            return row;
-        }}).join('');
-        if (sorted.length > 300) {{
-            t.innerHTML += `<tr><td colspan="10" class="px-3 py-3 text-center text-gray-400 text-sm bg-gray-50">Showing 300 of ${{sorted.length.toLocaleString()}} stores.</td></tr>`;
-        }}
+        return leakTable;
+    }}
+
+    function leakRowHtml(s) {{
+        const ban = s.ban && s.ban.includes('Sam')
+            ? '<span class="px-1.5 py-0.5 rounded text-xs font-semibold bg-[{B}] text-white">SAMS</span>'
+            : '<span class="px-1.5 py-0.5 rounded text-xs font-semibold bg-[{S}] text-[{B}]">WMT</span>';
+        const rClass = s.cylr > LK_T ? 'bg-[{R}] text-white' : s.cylr > LK_T * 0.7 ? 'bg-amber-500 text-white' : 'bg-[{G}] text-white';
+        const bRate = s.bpr;
+        const bClass = bRate > LK_T ? 'text-[{R}] font-bold' : 'text-[{G}]';
+        const icon = bRate > LK_T * 1.5 ? '\U0001f6a8' : bRate > LK_T ? '\u26A0\uFE0F' : '\u2705';
+        const woCount = (LK_WOS[s.s] || []).length;
+        const hasDetail = woCount > 0 || hasStoreAssets(s.s);
+        const expandIcon = hasDetail ? (lkExpandedStore === s.s ? '\u25BC' : '\u25B6') : '';
+        return `
+            <td class="px-3 py-1.5 text-sm font-medium text-gray-800">
+                <span class="text-xs text-gray-400 mr-1">${{expandIcon}}</span>${{s.s}}
+            </td>
+            <td class="px-3 py-1.5 text-sm text-gray-600">${{s.city}}${{s.city && s.st ? ', ' : ''}}${{s.st}}</td>
+            <td class="px-3 py-1.5 text-center">${{ban}}</td>
+            <td class="px-3 py-1.5 text-xs text-gray-600">${{s.mkt || '-'}}</td>
+            <td class="px-3 py-1.5 text-sm text-center">${{Math.round(s.sc).toLocaleString()}}</td>
+            <td class="px-3 py-1.5 text-sm text-center">${{Math.round(s.cytq).toLocaleString()}}</td>
+            <td class="px-3 py-1.5 text-center">
+                <span class="px-2 py-0.5 rounded text-xs font-bold ${{rClass}}">${{s.cylr.toFixed(1)}}%</span>
+            </td>
+            <td class="px-3 py-1.5 text-center text-sm ${{bClass}}">${{bRate.toFixed(1)}}%</td>
+            <td class="px-3 py-1.5 text-sm text-center">
+                ${{s.cyl}}
+                ${{woCount > 0 ? `<span class="ml-1 px-1 py-0.5 rounded bg-[{B}] text-white text-xs">${{woCount}} WO${{woCount > 1 ? 's' : ''}}</span>` : ''}}
+            </td>
+            <td class="px-3 py-1.5 text-center text-sm">${{icon}}</td>
+        `;
     }}
     </script>
     '''
@@ -0,0 +1,99 @@
+"""JS builder for the shared LRU result cache and its debug overlay.
+
+Tabs key cached results by their canonical filter state, so flipping
+between directors, stepping back/forward through history or toggling a
+phase button again is served from memory instead of recomputed. Every
+cache counts hits and misses; open the page with ?debug (or press
+Ctrl+Shift+D) to see them in a small overlay.
+"""
+
+
+def build_lru_cache_js():
+    """Return LruCache, canonicalState and the cache debug overlay (plain ES6)."""
+    return '''
+    // ── LRU result cache ──────────────────────────────────────────
+    // const cache = new LruCache('wtw model', 16);
+    // cache.get(key) → value | undefined (counts a hit or miss); cache.set(key, value)
+    // canonicalState({fm: 'X', ph: '', q: 'abc'}) → 'fm=X&q=abc' (sorted, empties dropped)
+    class LruCache {
+        constructor(name, limit = 32) {
+            this.name = name;
+            this.limit = limit;
+            this.map = new Map();    // insertion order = recency (oldest first)
+            this.hits = 0;
+            this.misses = 0;
+            LruCache.all.push(this);
+        }
+
+        get(key) {
+            if (!this.map.has(key)) {
+                this.misses++;
+                LruCache.report();
+                return undefined;
+            }
+            const value = this.map.get(key);
+            this.map.delete(key);
+            this.map.set(key, value);
+            this.hits++;
+            LruCache.report();
+            return value;
+        }
+
+        set(key, value) {
+            this.map.delete(key);
+            this.map.set(key, value);
+            while (this.map.size > this.limit) this.map.delete(this.map.keys().next().value);
+            return value;
+        }
+
+        clear() {
+            this.map.clear();
+        }
+
+        // Debug overlay: ?debug in the URL or Ctrl+Shift+D
+        static report() {
+            if (!LruCache.overlay || LruCache.frame) return;
+            LruCache.frame = requestAnimationFrame(() => {
+                LruCache.frame = 0;
+                LruCache.overlay.innerHTML = '<b>Result caches</b>' + LruCache.all.map(c => {
+                    const total = c.hits + c.misses;
+                    const rate = total ? Math.round(c.hits / total * 100) + '%' : '\\u2014';
+                    return `<div>${c.name}: ${c.hits} hit / ${c.misses} miss (${rate}) \\u00b7 ${c.map.size}/${c.limit}</div>`;
+                }).join('');
+            });
+        }
+
+        static toggleOverlay(show = !LruCache.overlay) {
+            if (!show) {
+                if (LruCache.overlay) LruCache.overlay.remove();
+                LruCache.overlay = null;
+                return;
+            }
+            if (LruCache.overlay) return;
+            const el = document.createElement('div');
+            el.style.cssText = 'position:fixed;right:8px;bottom:8px;z-index:9999;background:rgba(17,24,39,.9);color:#e5e7eb;'
+                + 'font:11px/1.5 ui-monospace,monospace;padding:6px 10px;border-radius:6px;pointer-events:none';
+            document.body.appendChild(el);
+            LruCache.overlay = el;
+            LruCache.report();
+        }
+    }
+    LruCache.all = [];
+    LruCache.overlay = null;
+    LruCache.frame = 0;
+
+    function canonicalState(state) {
+        return Object.keys(state).sort()
+            .filter(k => state[k] !== '' && state[k] != null && state[k] !== false)
+            .map(k => encodeURIComponent(k) + '=' + encodeURIComponent(Array.isArray(state[k]) ? state[k].join(',') : state[k]))
+            .join('&');
+    }
+
+    document.addEventListener('keydown', e => {
+        if (e.ctrlKey && e.shiftKey && (e.key === 'D' || e.key === 'd')) LruCache.toggleOverlay();
+    });
+    if (/[?&]debug\\b/.test(location.search)) {
+        if (document.body) LruCache.toggleOverlay(true);
+        else document.addEventListener('DOMContentLoaded', () => LruCache.toggleOverlay(true));
+    }
+'''
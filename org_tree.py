@@ -0,0 +1,76 @@
+"""Org hierarchy tree behind every cascading org filter.
+
+Sr Director → Director → RM → FSM → Market → Sub-market, built from each
+tab's rows at refresh time and embedded once in index.html. Every node
+carries a row count per dataset, so a dropdown's valid options come from
+walking the tree (ORG_TREE in org_tree_js.py) instead of scanning rows.
+Each tab script only replaces its own dataset's counts.
+"""
+import json
+import re
+
+from payload import dumps
+
+LEVELS = ('srd', 'dir', 'rm', 'fsm', 'mkt', 'sub')
+
+# Row field for each level, per dataset (None = dataset has no such level)
+DATASET_FIELDS = {
+    'tnt': ('fm_sr_director_name', 'fm_director_name', 'fm_regional_manager_name', 'fs_manager_name', 'fs_market', None),
+    'wtw': ('srd', 'fm', 'rm', 'fsm', 'mkt', None),
+    'leak': ('srd', 'fm', 'rm', 'fsm', 'mkt', None),
+    'terminal': ('srd', 'dir', 'rm', 'mgr', 'fm', 'fsm'),
+}
+
+START = '<!-- Org Tree Start -->'
+END = '<!-- Org Tree End -->'
+BLOCK_RE = re.compile(re.escape(START) + r'.*?' + re.escape(END) + r'\n?', re.DOTALL)
+
+
+def empty_tree():
+    return {'levels': list(LEVELS), 'fields': {}, 'tree': {'n': {}, 'c': {}}}
+
+
+def _drop(node, dataset):
+    """Remove dataset's counts below node; prune nodes no dataset uses any more."""
+    for key, child in list(node.get('c', {}).items()):
+        child['n'].pop(dataset, None)
+        _drop(child, dataset)
+        if not child['n']:
+            del node['c'][key]
+
+
+def add_dataset(org, dataset, rows):
+    """Replace dataset's row counts in org with the given rows."""
+    fields = DATASET_FIELDS[dataset]
+    root = org['tree']
+    root['n'].pop(dataset, None)
+    _drop(root, dataset)
+    for r in rows:
+        node = root
+        node['n'][dataset] = node['n'].get(dataset, 0) + 1
+        for depth, f in enumerate(fields):
+            key = str(r.get(f) or '').strip() if f else ''
+            children = node.setdefault('c', {})
+            node = children.get(key) or children.setdefault(key, {'n': {}})
+            node['n'][dataset] = node['n'].get(dataset, 0) + 1
+    org['fields'][dataset] = list(fields)
+    return org
+
+
+def read_org_tree(html):
+    """The tree currently embedded in html (empty if none yet)."""
+    m = BLOCK_RE.search(html)
+    if not m:
+        return empty_tree()
+    body = m.group(0)
+    body = body[body.index('>', body.index('<script')) + 1:body.rindex('</script>')]
+    return json.loads(body)
+
+
+def inject_org_tree(html, dataset, rows):
+    """Refresh dataset's counts in the embedded tree (inserted before </head>)."""
+    org = add_dataset(read_org_tree(html), dataset, rows)
+    payload = dumps(org).replace('</', '<\\/')
+    block = f'{START}\n<script type="application/json" id="orgTreeData">{payload}</script>\n{END}\n'
+    html = BLOCK_RE.sub('', html)
+    return html.replace('</head>', block + '</head>', 1)
@@ -0,0 +1,83 @@
+"""JS builder for the shared org-tree cascade.
+
+Reads the org hierarchy embedded by org_tree.py (parsed on first use) and
+answers "which values are still valid for this dropdown" by walking the
+tree under the other selections, for one dataset's row counts.
+"""
+
+
+def build_org_tree_js():
+    """Return the OrgTree class and the ORG_TREE instance (plain ES6)."""
+    return '''
+    // ── Org hierarchy cascade ─────────────────────────────────────
+    // Fields are the dataset's own row keys (e.g. WTW 'fm' = Director, Terminal 'mgr' = FSM)
+    // ORG_TREE.options('wtw', 'rm', {srd: 'A', fm: ''})   → RMs with rows under the other selections
+    // ORG_TREE.cascade('wtw', {srd: 'selectId', ...})     → refill the selects; true if a selection was cleared
+    class OrgTree {
+        constructor(id) {
+            this.id = id;
+            this.data = null;
+        }
+
+        load() {
+            if (!this.data) {
+                const el = document.getElementById(this.id);
+                this.data = el ? JSON.parse(el.textContent) : { levels: [], fields: {}, tree: { n: {}, c: {} } };
+            }
+            return this.data;
+        }
+
+        has(dataset) {
+            return !!this.load().fields[dataset];
+        }
+
+        // Sorted values of `field` that still have `dataset` rows given every other selection
+        options(dataset, field, selected = {}) {
+            const { fields, tree } = this.load();
+            const map = fields[dataset] || [];
+            const target = map.indexOf(field);
+            if (target < 0) return [];
+            const want = map.map(f => f && f !== field ? (selected[f] || '') : '');
+            const out = new Set();
+            const visit = (node, d) => {
+                if (d === map.length) return true;
+                let any = false;
+                for (const k in node.c) {
+                    const child = node.c[k];
+                    if (!child.n[dataset] || (want[d] && k !== want[d])) continue;
+                    if (!visit(child, d + 1)) continue;
+                    if (d > target) return true;   // one match below the target level is enough
+                    any = true;
+                    if (d === target && k) out.add(k);
+                }
+                return any;
+            };
+            visit(tree, 0);
+            return [...out].sort();
+        }
+
+        // Refill each select (keeping its first "All" option); drops selections left with no rows
+        cascade(dataset, selects) {
+            const selected = {};
+            Object.entries(selects).forEach(([f, id]) => { selected[f] = document.getElementById(id).value; });
+            let cleared = false, lists;
+            for (let changed = true; changed;) {
+                changed = false;
+                lists = {};
+                Object.keys(selects).forEach(f => {
+                    lists[f] = this.options(dataset, f, selected);
+                    if (selected[f] && !lists[f].includes(selected[f])) { selected[f] = ''; changed = cleared = true; }
+                });
+            }
+            Object.entries(selects).forEach(([f, id]) => {
+                const sel = document.getElementById(id);
+                while (sel.options.length > 1) sel.remove(1);
+                lists[f].forEach(v => sel.add(new Option(v, v)));
+                sel.value = selected[f];
+            });
+            return cleared;
+        }
+    }
+
+    const ORG_TREE = new OrgTree('orgTreeData');
+'''
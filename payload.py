@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""Deterministic payload helpers shared by the tab builders and refresh.py.
+
+Every dataset embedded in index.html goes through here so the same input
+always produces byte-identical output: keys sorted, rows in a stable order,
+one row per line. Each dataset is also mirrored to data/<name>.jsonl so git
+diffs between refreshes only touch the rows that actually changed.
+"""
+import base64
+import hashlib
+import json
+import os
+import re
+import struct
+from datetime import datetime
+from pathlib import Path
+
+PROJECT = Path(__file__).parent
+DATA_DIR = PROJECT / 'data'
+MANIFEST = DATA_DIR / 'MANIFEST.json'
+
+# Every embedded JSON dataset block: json_script output, plus the org tree block (no data-hash)
+DATA_BLOCK_RE = re.compile(r'<script type="application/json" id="([^"]+)"[^>]*>(.*?)</script>', re.DOTALL)
+
+# dumps_series column types → struct codes ('str' is a uint16 code into the column's dictionary)
+SERIES_TYPES = {'u8': 'B', 'i16': 'h', 'i32': 'i', 'f32': 'f', 'str': 'H'}
+# How a None is stored per type (SeriesTable.NULLS on the page); the sentinel is not a usable value
+SERIES_NULLS = {'u8': 0xFF, 'i16': -0x8000, 'i32': -0x80000000, 'f32': float('nan'), 'str': 0xFFFF}
+
+
+def dumps(obj) -> str:
+    """Compact JSON with sorted keys."""
+    return json.dumps(obj, separators=(',', ':'), sort_keys=True)
+
+
+def store_key(store_field: str, *tie_fields: str):
+    """Sort key: numeric store number first, then the tie-break fields as strings."""
+    def key(row):
+        s = str(row.get(store_field, '') or '')
+        return (int(s) if s.isdigit() else 10 ** 9, s) + tuple(str(row.get(f, '') or '') for f in tie_fields)
+    return key
+
+
+def dumps_rows(rows: list, key=None) -> str:
+    """JSON array with one row per line, optionally sorted by key."""
+    if key:
+        rows = sorted(rows, key=key)
+    if not rows:
+        return '[]'
+    return '[\n' + ',\n'.join(dumps(r) for r in rows) + '\n]'
+
+
+def dumps_map(mapping: dict) -> str:
+    """JSON object with one entry per line, keys in store-number order."""
+    if not mapping:
+        return '{}'
+    items = sorted(mapping.items(), key=lambda kv: store_key('k')({'k': kv[0]}))
+    return '{\n' + ',\n'.join(f'{json.dumps(str(k))}:{dumps(v)}' for k, v in items) + '\n}'
+
+
+def dumps_series(series: dict, columns) -> str:
+    """Per-key numeric series packed into one binary buffer (base64 JSON).
+
+    series: {key: [row tuple, ...]}, tuples ordered like columns, a list
+    of (name, type) with type one of SERIES_TYPES. Rows are stored column
+    by column, keys in store-number order: int32 row offsets (keys + 1),
+    then each column little-endian, padded to 4 bytes. The page decodes
+    the buffer once and hands out typed-array views per key (SeriesTable).
+    'str' columns keep their distinct values, sorted, in 'dicts'. None is
+    stored as the type's SERIES_NULLS entry (NaN for f32) and read back
+    as null.
+    """
+    keys = sorted(series, key=lambda k: store_key('k')({'k': k}))
+    dicts = {name: sorted({str(r[i]) for rows in series.values() for r in rows if r[i] is not None})
+             for i, (name, kind) in enumerate(columns) if kind == 'str'}
+    offsets = [0]
+    for k in keys:
+        offsets.append(offsets[-1] + len(series[k]))
+    buf = bytearray(struct.pack(f'<{len(offsets)}i', *offsets))
+    for i, (name, kind) in enumerate(columns):
+        values = [r[i] for k in keys for r in series[k]]
+        null = SERIES_NULLS[kind]
+        if kind == 'str':
+            if len(dicts[name]) >= 0xFFFF:
+                raise ValueError(f'series column {name!r} has too many distinct values')
+            codes = {v: n for n, v in enumerate(dicts[name])}
+            values = [null if v is None else codes[str(v)] for v in values]
+        else:
+            if kind != 'f32' and null in values:
+                raise ValueError(f'series column {name!r} holds {null}, its null sentinel')
+            values = [null if v is None else v for v in values]
+        buf += struct.pack(f'<{len(values)}{SERIES_TYPES[kind]}', *values)
+        buf += bytes(-len(buf) % 4)
+    return dumps({
+        'enc': 'series', 'keys': [str(k) for k in keys], 'rows': offsets[-1],
+        'cols': [list(c) for c in columns], 'dicts': dicts, 'buf': base64.b64encode(bytes(buf)).decode('ascii'),
+    })
+
+
+def json_script(name: str, text: str) -> str:
+    """<script type="application/json" id=name> block holding a dataset.
+
+    The page declares the global with lazyData(name), so the JSON is only
+    parsed when a tab (or the PDF export) first reads it. data-hash is the
+    content hash the page keys its IndexedDB cache on (DATA_CACHE).
+    """
+    digest = hashlib.sha256(text.encode('utf-8')).hexdigest()[:16]
+    return (f'<script type="application/json" id="{name}" data-hash="{digest}">'
+            + text.replace('</', '<\\/') + '</script>')
+
+
+def atomic_write_text(path: Path, text: str) -> Path:
+    """Write text via a temp file in the same directory and rename it into place.
+
+    Readers (and a build killed halfway) see either the old file or the
+    new one, never a truncated mix.
+    """
+    path = Path(path)
+    tmp = path.with_name(f'.{path.name}.{os.getpid()}.tmp')
+    try:
+        tmp.write_text(text, encoding='utf-8')
+        os.replace(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
+    return path
+
+
+def write_jsonl(name: str, rows) -> Path:
+    """Mirror a dataset to data/<name>.jsonl (rows, or (key, value) pairs for maps)."""
+    DATA_DIR.mkdir(exist_ok=True)
+    path = DATA_DIR / f'{name}.jsonl'
+    if isinstance(rows, dict):
+        rows = [[k, v] for k, v in sorted(rows.items(), key=lambda kv: store_key('k')({'k': kv[0]}))]
+    text = ''.join(dumps(r) + '\n' for r in rows)
+    if not path.exists() or path.read_text(encoding='utf-8') != text:
+        atomic_write_text(path, text)
+    return path
+
+
+def fingerprint(*pages: str) -> str:
+    """sha256 over every data/*.jsonl file (name + content) and every JSON
+    block embedded in pages (id + content).
+
+    Not every embedded dataset has a .jsonl mirror (LK_CUMUL, LK_BURN, the
+    packed LK_MONTHLY series, the org tree, projects D), so the blocks
+    themselves are hashed too.
+    """
+    h = hashlib.sha256()
+    for path in sorted(DATA_DIR.glob('*.jsonl')):
+        h.update(path.name.encode())
+        h.update(path.read_bytes())
+    for page in pages:
+        for name, body in sorted(DATA_BLOCK_RE.findall(page)):
+            h.update(name.encode())
+            h.update(body.encode('utf-8'))
+    return h.hexdigest()
+
+
+def data_stamp(*pages: str) -> str:
+    """'YYYY-MM-DD HH:MM' of the last refresh that actually changed data.
+
+    pages: the generated HTML whose JSON blocks count as data. Rebuilding
+    from unchanged data keeps the old stamp, so a no-change refresh
+    produces a byte-identical index.html.
+    """
+    fp = fingerprint(*pages)
+    try:
+        manifest = json.loads(MANIFEST.read_text())
+    except (OSError, json.JSONDecodeError):
+        manifest = {}
+    if manifest.get('fingerprint') == fp and manifest.get('stamp'):
+        return manifest['stamp']
+    stamp = datetime.now().strftime('%Y-%m-%d %H:%M')
+    DATA_DIR.mkdir(exist_ok=True)
+    MANIFEST.write_text(json.dumps({'fingerprint': fp, 'stamp': stamp}, indent=1, sort_keys=True) + '\n')
+    return stamp
+
+
+def apply_stamp(html: str, stamp: str) -> str:
+    """Set every 'Data as of' marker in index.html (header and WTW tab) to stamp."""
+    html = re.sub(r"document\.getElementById\('lastUpdated'\)\.textContent\s*=\s*'[^']*'",
+                  f"document.getElementById('lastUpdated').textContent = 'Data as of {stamp}'", html)
+    return re.sub(r'Data as of [0-9-]+ [0-9:]+', f'Data as of {stamp}', html)
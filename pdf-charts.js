@@ -75,6 +75,11 @@ function svgTrendChart(title, series, opts) {
     series.forEach(function(s) {
         if (s.data.length < 2) return;
         var sorted = s.data.slice().sort(function(a,b) { return a.d < b.d ? -1 : 1; });
+        /* Long histories: LTTB down to ~1 point per 2px (shape kept, SVG stays small) */
+        var maxPts = Math.floor(cW / 2);
+        if (sorted.length > maxPts && typeof ChartManager !== 'undefined') {
+            sorted = ChartManager.lttb(sorted, maxPts, function(p) { return dateIdx[p.d]; }, function(p) { return p.v; });
+        }
         var pts = sorted.map(function(p) { return xPos(p.d)+','+yPos(p.v); });
         svg += '<polyline points="'+pts.join(' ')+'" fill="none" stroke="'+s.color+'" stroke-width="2" stroke-linejoin="round"/>';
         /* Data point dots — show every 7th point + first + last */
@@ -98,18 +103,20 @@ function svgTrendChart(title, series, opts) {
 /* Build 90-day trend for a set of stores */
 function buildHistTrend(stores, dirName) {
     if (typeof HIST_TIT === 'undefined') return '';
-    /* Filter HIST_TIT to this director */
-    var dirData = HIST_TIT.filter(function(h) { return h.dir === dirName; });
-    if (dirData.length === 0) return '';
+    /* HIST_TIT / HIST_ROR are SeriesTables keyed by director: typed-array columns, dates and ids dictionary-coded */
+    var dirData = HIST_TIT.get(dirName);
+    if (!dirData || dirData.length === 0) return '';
     /* Build combined + per-banner series */
     var byDate = {};
-    dirData.forEach(function(h) {
-        if (!byDate[h.d]) byDate[h.d] = { sum: 0, cnt: 0, wSum: 0, wCnt: 0, sSum: 0, sCnt: 0 };
-        byDate[h.d].sum += h.t * h.n;
-        byDate[h.d].cnt += h.n;
-        if (h.bn === 'W') { byDate[h.d].wSum += h.t * h.n; byDate[h.d].wCnt += h.n; }
-        else { byDate[h.d].sSum += h.t * h.n; byDate[h.d].sCnt += h.n; }
-    });
+    for (var i = 0; i < dirData.length; i++) {
+        var d = HIST_TIT.dicts.d[dirData.d[i]], t = dirData.t[i], n = dirData.n[i];
+        if (t === null || n === null) continue;   /* empty cells in the export */
+        if (!byDate[d]) byDate[d] = { sum: 0, cnt: 0, wSum: 0, wCnt: 0, sSum: 0, sCnt: 0 };
+        byDate[d].sum += t * n;
+        byDate[d].cnt += n;
+        if (HIST_TIT.dicts.bn[dirData.bn[i]] === 'W') { byDate[d].wSum += t * n; byDate[d].wCnt += n; }
+        else { byDate[d].sSum += t * n; byDate[d].sCnt += n; }
+    }
     var combined = [], wm = [], sams = [];
     Object.keys(byDate).sort().forEach(function(d) {
         var b = byDate[d];
@@ -123,12 +130,14 @@ function buildHistTrend(stores, dirName) {
     var h = svgTrendChart('90-Day TIT Trend — ' + dirName, chartSeries);
     /* Also build realty ops region trend if available */
     if (typeof HIST_ROR !== 'undefined') {
-        var rorData = HIST_ROR.filter(function(r) { return r.dir === dirName; });
+        var rorData = HIST_ROR.get(dirName) || { length: 0 };
         var rorRegions = {};
-        rorData.forEach(function(r) {
-            if (!rorRegions[r.r]) rorRegions[r.r] = [];
-            rorRegions[r.r].push({ d: r.d, v: r.t });
-        });
+        for (var j = 0; j < rorData.length; j++) {
+            var rid = HIST_ROR.dicts.r[rorData.r[j]];
+            if (rorData.t[j] === null) continue;
+            if (!rorRegions[rid]) rorRegions[rid] = [];
+            rorRegions[rid].push({ d: HIST_ROR.dicts.d[rorData.d[j]], v: rorData.t[j] });
+        }
         var regionIds = Object.keys(rorRegions).filter(function(r) { return rorRegions[r].length >= 10; });
         if (regionIds.length > 1) {
             var rorColors = ['#7c3aed', '#0891b2', '#c2410c', '#4f46e5', '#059669'];
@@ -311,52 +320,30 @@ function buildWtwManagerMatrix(wos, level) {
     var subKey = level === 'sr_director' ? 'rm' : 'fsm';
     var groupLabel = level === 'sr_director' ? 'Director' : 'Regional Manager';
     var subLabel = level === 'sr_director' ? 'Regional Manager' : 'FS Manager';
-    var tree = {};
-    wos.forEach(function(w) {
-        var gName = w[groupKey] || 'Unknown';
-        var sName = w[subKey] || 'Unassigned';
-        var ph = w.ph || 'PH1';
-        if (!tree[gName]) tree[gName] = {};
-        if (!tree[gName][sName]) tree[gName][sName] = {
-            t: 0, d: 0, ph1t: 0, ph1d: 0, ph2t: 0, ph2d: 0, ph3t: 0, ph3d: 0, ps: 0, pn: 0
-        };
-        var node = tree[gName][sName];
-        node.t++;
-        if (w.st === 'COMPLETED') node.d++;
-        if (ph === 'PH1') { node.ph1t++; if (w.st === 'COMPLETED') node.ph1d++; }
-        else if (ph === 'PH2') { node.ph2t++; if (w.st === 'COMPLETED') node.ph2d++; }
-        else { node.ph3t++; if (w.st === 'COMPLETED') node.ph3d++; }
-        if (w.pm != null && !isNaN(parseFloat(w.pm))) { node.ps += parseFloat(w.pm); node.pn++; }
+    function done(w) { return w.st === 'COMPLETED'; }
+    function phase(w) { var ph = w.ph || 'PH1'; return ph === 'PH1' || ph === 'PH2' ? ph : 'PH3'; }
+    function pct(d, t) { return t > 0 ? d / t * 100 : -1; }
+    var tree = QUERY.aggregate(wos, {
+        by: [function(w) { return w[groupKey] || 'Unknown'; }, function(w) { return w[subKey] || 'Unassigned'; }],
+        measures: {
+            t: ['count'], d: ['count', done],
+            ph1t: ['count', function(w) { return phase(w) === 'PH1'; }], ph1d: ['count', function(w) { return phase(w) === 'PH1' && done(w); }],
+            ph2t: ['count', function(w) { return phase(w) === 'PH2'; }], ph2d: ['count', function(w) { return phase(w) === 'PH2' && done(w); }],
+            ph3t: ['count', function(w) { return phase(w) === 'PH3'; }], ph3d: ['count', function(w) { return phase(w) === 'PH3' && done(w); }],
+            pm: ['avg', 'pm']
+        },
+        derive: function(g) {
+            g.name = g.key;
+            g.pct = g.t > 0 ? g.d / g.t * 100 : 0;
+            g.ph1 = pct(g.ph1d, g.ph1t); g.ph2 = pct(g.ph2d, g.ph2t); g.ph3 = pct(g.ph3d, g.ph3t);
+            if (g.pm === null) g.pm = -1;
+        },
+        sort: 'key',
+        rollup: true
     });
-    /* Aggregate group totals */
-    var groups = Object.keys(tree).sort().map(function(gName) {
-        var subs = Object.keys(tree[gName]).sort().map(function(sName) {
-            var n = tree[gName][sName];
-            return {
-                name: sName, t: n.t, d: n.d,
-                ph1: n.ph1t > 0 ? n.ph1d / n.ph1t * 100 : -1, ph1t: n.ph1t, ph1d: n.ph1d,
-                ph2: n.ph2t > 0 ? n.ph2d / n.ph2t * 100 : -1, ph2t: n.ph2t, ph2d: n.ph2d,
-                ph3: n.ph3t > 0 ? n.ph3d / n.ph3t * 100 : -1, ph3t: n.ph3t, ph3d: n.ph3d,
-                pct: n.t > 0 ? n.d / n.t * 100 : 0,
-                pm: n.pn > 0 ? n.ps / n.pn : -1
-            };
-        });
-        /* Group totals */
-        var gt = { t: 0, d: 0, ph1t: 0, ph1d: 0, ph2t: 0, ph2d: 0, ph3t: 0, ph3d: 0, ps: 0, pn: 0 };
-        subs.forEach(function(s) {
-            gt.t += s.t; gt.d += s.d;
-            gt.ph1t += s.ph1t; gt.ph1d += s.ph1d;
-            gt.ph2t += s.ph2t; gt.ph2d += s.ph2d;
-            gt.ph3t += s.ph3t; gt.ph3d += s.ph3d;
-            if (s.pm >= 0) { gt.ps += s.pm * s.t; gt.pn += s.t; } /* weighted */
-        });
-        return {
-            name: gName, subs: subs,
-            t: gt.t, d: gt.d, pct: gt.t > 0 ? gt.d / gt.t * 100 : 0,
-            ph1: gt.ph1t > 0 ? gt.ph1d / gt.ph1t * 100 : -1,
-            ph2: gt.ph2t > 0 ? gt.ph2d / gt.ph2t * 100 : -1,
-            ph3: gt.ph3t > 0 ? gt.ph3d / gt.ph3t * 100 : -1
-        };
+    var groups = (tree.children || []).map(function(g) {
+        g.subs = g.children;
+        return g;
     });
     if (groups.length === 0) return '';
     function phCell(val, done, total, isGroup) {
@@ -416,62 +403,37 @@ function buildLeakManagerMatrix(leakStores, level) {
     var groupLabel = level === 'sr_director' ? 'Director' : 'Regional Manager';
     var subLabel = level === 'sr_director' ? 'Regional Manager' : 'FS Manager';
 
-    /* Burn rate calc (mirrors leak_tab_js.py) */
-    function calcBurnPdf(cytq, sc) {
-        var now = new Date();
-        var jan1 = new Date(now.getFullYear(), 0, 1);
-        var elapsed = Math.max(1, Math.floor((now - jan1) / 86400000));
-        var diy = now.getFullYear() % 4 === 0 ? 366 : 365;
-        var daily = cytq / elapsed;
-        var projTq = daily * diy;
-        var projRate = sc > 0 ? (projTq / sc * 100) : 0;
-        var threshLbs = sc * LKT / 100;
-        var crossDay = -1;
-        if (daily > 0 && cytq < threshLbs) crossDay = elapsed + (threshLbs - cytq) / daily;
-        return { elapsed: elapsed, diy: diy, daily: daily, projTq: projTq, projRate: projRate, crossDay: crossDay };
+    /* Burn projections come precomputed per store (add_leak_tab.py: bpt); each group sums the
+       bpt and charge of its own stores in this report, so partial branches project correctly. */
+    var BURN = typeof LK_BURN !== 'undefined' ? LK_BURN : { days_elapsed: 1, days_in_year: 365 };
+    function burnFor(g) {
+        var daily = g.cytq / BURN.days_elapsed, threshLbs = g.sc * LKT / 100;
+        return {
+            projRate: g.sc > 0 ? g.bpt / g.sc * 100 : 0,
+            crossDay: daily > 0 && g.cytq < threshLbs ? BURN.days_elapsed + (threshLbs - g.cytq) / daily : -1
+        };
     }
 
-    /* Build hierarchy tree */
-    var tree = {};
-    leakStores.forEach(function(s) {
-        var gName = s[groupKey] || 'Unknown';
-        var sName = s[subKey] || 'Unassigned';
-        if (!tree[gName]) tree[gName] = {};
-        if (!tree[gName][sName]) tree[gName][sName] = {
-            n: 0, sc: 0, cytq: 0, cyl: 0, over: 0
-        };
-        var node = tree[gName][sName];
-        node.n++;
-        node.sc += (s.sc || 0);
-        node.cytq += (s.cytq || 0);
-        node.cyl += (s.cyl || 0);
-        if ((s.cylr || 0) > LKT) node.over++;
+    /* Director/RM → sub-manager rollup (totals at both levels) */
+    var tree = QUERY.aggregate(leakStores, {
+        by: [function(s) { return s[groupKey] || 'Unknown'; }, function(s) { return s[subKey] || 'Unassigned'; }],
+        measures: {
+            n: ['count'], sc: ['sum', 'sc'], cytq: ['sum', 'cytq'], cyl: ['sum', 'cyl'], bpt: ['sum', 'bpt'],
+            over: ['count', function(s) { return (s.cylr || 0) > LKT; }]
+        },
+        derive: function(g) {
+            if (!g.depth) return;
+            var burn = burnFor(g);
+            g.name = g.key;
+            g.rate = g.sc > 0 ? g.cytq / g.sc * 100 : 0;
+            g.projRate = burn.projRate; g.crossDay = burn.crossDay; g.diy = BURN.days_in_year;
+        },
+        sort: 'key',
+        rollup: true
     });
-
-    /* Build sorted groups with sub-rows */
-    var groups = Object.keys(tree).sort().map(function(gName) {
-        var subs = Object.keys(tree[gName]).sort().map(function(sName) {
-            var n = tree[gName][sName];
-            var rate = n.sc > 0 ? n.cytq / n.sc * 100 : 0;
-            var burn = calcBurnPdf(n.cytq, n.sc);
-            return {
-                name: sName, n: n.n, sc: n.sc, cytq: n.cytq, cyl: n.cyl,
-                over: n.over, rate: rate,
-                projRate: burn.projRate, crossDay: burn.crossDay, diy: burn.diy
-            };
-        });
-        /* Group totals */
-        var gt = { n: 0, sc: 0, cytq: 0, cyl: 0, over: 0 };
-        subs.forEach(function(s) {
-            gt.n += s.n; gt.sc += s.sc; gt.cytq += s.cytq; gt.cyl += s.cyl; gt.over += s.over;
-        });
-        var gRate = gt.sc > 0 ? gt.cytq / gt.sc * 100 : 0;
-        var gBurn = calcBurnPdf(gt.cytq, gt.sc);
-        return {
-            name: gName, subs: subs, n: gt.n, sc: gt.sc, cytq: gt.cytq, cyl: gt.cyl,
-            over: gt.over, rate: gRate,
-            projRate: gBurn.projRate, crossDay: gBurn.crossDay, diy: gBurn.diy
-        };
+    var groups = (tree.children || []).map(function(g) {
+        g.subs = g.children;
+        return g;
     });
 
     if (groups.length === 0) return '';
@@ -25,14 +25,29 @@ function splitByBanner(stores) {
 }
 
 /* ── helpers ── */
+// Stores grouped by Sr. Director / FM Director, built once per storeData array
+var pdfPersonIndex = {src: null};
+function pdfPeopleIndex(level) {
+    var field = level === 'sr_director' ? 'fm_sr_director_name' : 'fm_director_name';
+    if (pdfPersonIndex.src !== storeData) pdfPersonIndex = {src: storeData};
+    if (!pdfPersonIndex[field]) {
+        var idx = {};
+        storeData.forEach(function(d) {
+            var k = d[field];
+            if (k) (idx[k] || (idx[k] = [])).push(d);
+        });
+        pdfPersonIndex[field] = idx;
+    }
+    return pdfPersonIndex[field];
+}
 function getPeopleForLevel(level) {
-    if (level === 'sr_director')
-        return Array.from(new Set(storeData.map(function(d){return d.fm_sr_director_name;}).filter(Boolean))).sort();
-    return Array.from(new Set(storeData.map(function(d){return d.fm_director_name;}).filter(Boolean))).sort();
+    if (typeof ORG_TREE !== 'undefined' && ORG_TREE.has('tnt')) {
+        return ORG_TREE.options('tnt', level === 'sr_director' ? 'fm_sr_director_name' : 'fm_director_name');
+    }
+    return Object.keys(pdfPeopleIndex(level)).sort();
 }
 function getStoresForPerson(level, person) {
-    if (level === 'sr_director') return storeData.filter(function(d){return d.fm_sr_director_name===person;});
-    return storeData.filter(function(d){return d.fm_director_name===person;});
+    return pdfPeopleIndex(level)[person] || [];
 }
 
 /* ── modal (updated for combined report) ── */
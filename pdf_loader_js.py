@@ -0,0 +1,97 @@
+"""JS builder for the on-demand PDF export stack.
+
+openPdfModal starts out as a stub: the first call loads html2pdf.min.js,
+pdf-charts.js and pdf-export.js (or unpacks the share build's inline
+blob, see pdf_stack.py), and pdf-export.js's own openPdfModal replaces
+the stub. Hovering or focusing an export button prefetches the files so
+the first click rarely waits.
+"""
+import json
+
+from pdf_stack import BLOB_ID, PDF_FILES
+
+
+def build_pdf_loader_js():
+    """Return the PdfStack class, PDF_STACK and the openPdfModal stub (no dependencies)."""
+    return '''
+    // ── PDF export stack (loaded on first use) ────────────────────
+    // openPdfModal('wtw')   first call loads the stack, then hands over to pdf-export.js's openPdfModal
+    // PDF_STACK.load()      → Promise, resolved once the stack has run (once; retried after a failure)
+    // PDF_STACK.prefetch()  <link rel="prefetch"> hints; fired by hover/focus on any export button
+    class PdfStack {
+        constructor(files, blobId) {
+            this.files = files;
+            this.blobId = blobId;
+            this.loading = null;
+            this.prefetched = false;
+            this.ms = null;
+            const hint = e => {
+                if (e.target.closest && e.target.closest('[onclick*="openPdfModal"], [data-pdf-export]')) this.prefetch();
+            };
+            document.addEventListener('pointerover', hint, { passive: true });
+            document.addEventListener('focusin', hint);
+        }
+
+        prefetch() {
+            if (this.prefetched || this.loading || document.getElementById(this.blobId)) return;
+            this.prefetched = true;
+            this.files.forEach(src => {
+                const link = document.createElement('link');
+                link.rel = 'prefetch';
+                link.as = 'script';
+                link.href = src;
+                document.head.appendChild(link);
+            });
+        }
+
+        load() {
+            if (!this.loading) {
+                const t0 = performance.now();
+                this.loading = (document.getElementById(this.blobId) ? this.fromBlob() : this.fromFiles())
+                    .then(() => { this.ms = Math.round(performance.now() - t0); })
+                    .catch(e => { this.loading = null; throw e; });
+            }
+            return this.loading;
+        }
+
+        // Fetched in parallel, run in order (async = false keeps insertion order)
+        fromFiles() {
+            return Promise.all(this.files.map(src => new Promise((resolve, reject) => {
+                const s = document.createElement('script');
+                s.src = src;
+                s.async = false;
+                s.onload = resolve;
+                s.onerror = () => reject(new Error('could not load ' + src));
+                document.head.appendChild(s);
+            })));
+        }
+
+        // Share build: {file: source} JSON, gzip + base64, in an inert <script> block
+        async fromBlob() {
+            if (typeof DecompressionStream === 'undefined') throw new Error('this browser cannot unpack the inline export stack');
+            const el = document.getElementById(this.blobId);
+            const bytes = Uint8Array.from(atob(el.textContent.trim()), c => c.charCodeAt(0));
+            const stream = new Blob([bytes]).stream().pipeThrough(new DecompressionStream('gzip'));
+            const sources = JSON.parse(await new Response(stream).text());
+            el.textContent = '';
+            this.files.forEach(name => {
+                const s = document.createElement('script');
+                s.textContent = sources[name];
+                document.head.appendChild(s);   // inline scripts run on insertion, in order
+            });
+        }
+    }
+
+    const PDF_STACK = new PdfStack(''' + json.dumps(list(PDF_FILES)) + ''', ''' + json.dumps(BLOB_ID) + ''');
+
+    function openPdfModal(tab) {
+        const stub = openPdfModal;
+        PDF_STACK.load().then(() => {
+            if (window.openPdfModal === stub) throw new Error('pdf-export.js did not define openPdfModal');
+            window.openPdfModal(tab);
+        }).catch(e => {
+            console.error('PDF export failed to load:', e);
+            alert('PDF export could not be loaded: ' + e.message);
+        });
+    }
+'''
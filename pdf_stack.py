@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""The PDF export stack (html2pdf.min.js, pdf-charts.js, pdf-export.js).
+
+About 1MB of script that only matters once someone clicks export. The
+page no longer loads it up front: inject_shared_js strips any static
+<script src> tags for these files and the shared block defines a stub
+openPdfModal (pdf_loader_js.py) that loads them on first use.
+
+The single-file share build (share.sh) has no sibling files to load, so
+it inlines the stack as one gzip + base64 blob that the stub unpacks on
+demand:
+
+    python3 pdf_stack.py HVAC-Dashboard-Full.html
+"""
+import base64
+import gzip
+import json
+import re
+import sys
+from pathlib import Path
+
+PROJECT = Path(__file__).parent
+
+# Load order: pdf-export.js calls into the other two
+PDF_FILES = ('html2pdf.min.js', 'pdf-charts.js', 'pdf-export.js')
+BLOB_ID = 'PDF_STACK_BLOB'
+
+STATIC_TAG_RE = re.compile(
+    r'[ \t]*<script[^>]*\bsrc="(?:\./)?(?:' + '|'.join(re.escape(f) for f in PDF_FILES) + r')(?:\?[^"]*)?"[^>]*>\s*</script>\n?')
+BLOB_RE = re.compile(r'<script type="application/octet-stream" id="' + BLOB_ID + r'"[^>]*>.*?</script>\n?', re.DOTALL)
+
+
+def strip_static_tags(html: str) -> str:
+    """Remove <script src> tags for the PDF stack (the loader fetches it on demand)."""
+    return STATIC_TAG_RE.sub('', html)
+
+
+def build_blob() -> str:
+    """The stack as {file: source} JSON, gzipped and base64'd, in an inert script block."""
+    sources = {name: (PROJECT / name).read_text(encoding='utf-8') for name in PDF_FILES}
+    packed = gzip.compress(json.dumps(sources).encode('utf-8'), compresslevel=9, mtime=0)
+    return (f'<script type="application/octet-stream" id="{BLOB_ID}" data-encoding="gzip+base64">'
+            + base64.b64encode(packed).decode('ascii') + '</script>')
+
+
+def inline_stack(html: str) -> str:
+    """Embed (or refresh) the compressed stack just before </body>."""
+    html = BLOB_RE.sub('', strip_static_tags(html))
+    return html.replace('</body>', build_blob() + '\n</body>', 1)
+
+
+def main():
+    if len(sys.argv) != 2:
+        print('usage: pdf_stack.py <share html>')
+        sys.exit(2)
+    path = Path(sys.argv[1])
+    html = inline_stack(path.read_text(encoding='utf-8'))
+    path.write_text(html, encoding='utf-8')
+    blob = BLOB_RE.search(html).group(0)
+    raw = sum((PROJECT / name).stat().st_size for name in PDF_FILES)
+    print(f'  📎 PDF export inlined: {raw / 1024:.0f}KB → {len(blob) / 1024:.0f}KB (gzip + base64)')
+
+
+if __name__ == '__main__':
+    main()
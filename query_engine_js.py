@@ -0,0 +1,137 @@
+"""JS builder for the shared group-by query engine.
+
+One aggregation path for the tabs and the PDF export: filter, multi-level
+group-by, count / sum / average / weighted average / count-distinct,
+ratios, per-level sort and top-N, and rollup totals at every level, all
+accumulated in a single pass over the rows (or over a worker result's row
+ids, without materializing the subset).
+"""
+
+
+def build_query_engine_js():
+    """Return QueryNode and the QUERY helpers (no dependencies, plain ES6)."""
+    return '''
+    // ── Query engine (group-by / rollup) ──────────────────────────
+    // QUERY.aggregate(rows, {
+    //   ids: res.ids,                        // optional: only these row indexes
+    //   where: r => r.st !== 'OPEN',         // optional filter
+    //   by: ['fm', r => r.rm || 'Unassigned'],   // group levels: field or getter
+    //   measures: {
+    //     n: ['count'],                      done: ['count', r => r.st === 'COMPLETED'],
+    //     sc: ['sum', 'sc'],                 pm: ['avg', 'pm'],        // blanks skipped
+    //     pmW: ['wavg', 'pm', 'sc'],         stores: ['distinct', 's'],
+    //     rate: ['ratio', 'cytq', 'sc', 100] // sum(cytq) / sum(sc) * 100
+    //   },
+    //   derive: g => { g.burn = ...; },      // extra fields per group (after measures)
+    //   sort: ['burn', 'desc'] | 'key',      // children order at every level
+    //   top: 10,                             // keep the first N groups at the top level
+    //   rollup: true                         // nested tree with totals at every level
+    // })
+    // → rollup: {key: null, depth: 0, ...measures, children: [{key, depth, keys, ...measures, children}]}
+    //   else:   [{key, keys, ...measures}] for the deepest level
+    class QueryNode {
+        constructor(key, keys, acc) {
+            this.key = key;
+            this.keys = keys;
+            this.depth = keys.length;
+            this.acc = acc;
+            this.kids = null;
+        }
+    }
+
+    const QUERY = {
+        num(v) {
+            if (typeof v === 'number') return v;
+            if (v == null || v === '') return NaN;
+            return parseFloat(v);
+        },
+
+        getter(f) {
+            return typeof f === 'function' ? f : r => r[f];
+        },
+
+        // Compile measure specs into accumulator factories: {init, add(acc, r), value(acc)}
+        compile(measures) {
+            return Object.entries(measures).map(([name, [op, a, b, scale = 1]]) => {
+                const ga = a === undefined ? null : QUERY.getter(a), gb = b === undefined ? null : QUERY.getter(b);
+                const num = QUERY.num;
+                switch (op) {
+                    case 'count': return { name, init: () => [0], add: ga ? (c, r) => { if (ga(r)) c[0]++; } : c => { c[0]++; }, value: c => c[0] };
+                    case 'sum': return { name, init: () => [0], add: (c, r) => { const v = num(ga(r)); if (v === v) c[0] += v; }, value: c => c[0] };
+                    case 'avg': return { name, init: () => [0, 0], add: (c, r) => { const v = num(ga(r)); if (v === v) { c[0] += v; c[1]++; } }, value: c => c[1] ? c[0] / c[1] : null };
+                    case 'wavg': return { name, init: () => [0, 0], add: (c, r) => {
+                        const v = num(ga(r)), w = num(gb(r));
+                        if (v === v && w === w) { c[0] += v * w; c[1] += w; }
+                    }, value: c => c[1] ? c[0] / c[1] : null };
+                    case 'ratio': return { name, init: () => [0, 0], add: (c, r) => {
+                        const v = num(ga(r)), w = num(gb(r));
+                        if (v === v) c[0] += v;
+                        if (w === w) c[1] += w;
+                    }, value: c => c[1] ? c[0] / c[1] * scale : 0 };
+                    case 'distinct': return { name, init: () => new Set(), add: (c, r) => { c.add(ga(r)); }, value: c => c.size };
+                    case 'min': return { name, init: () => [Infinity], add: (c, r) => { const v = num(ga(r)); if (v < c[0]) c[0] = v; }, value: c => c[0] === Infinity ? null : c[0] };
+                    case 'max': return { name, init: () => [-Infinity], add: (c, r) => { const v = num(ga(r)); if (v > c[0]) c[0] = v; }, value: c => c[0] === -Infinity ? null : c[0] };
+                    default: throw new Error('QUERY: unknown measure ' + op);
+                }
+            });
+        },
+
+        aggregate(rows, q = {}) {
+            const ms = QUERY.compile(q.measures || { n: ['count'] });
+            const by = (q.by || []).map(QUERY.getter);
+            const where = q.where || null;
+            const fresh = () => ms.map(m => m.init());
+            const root = new QueryNode(null, [], fresh());
+
+            const visit = r => {
+                if (where && !where(r)) return;
+                let node = root;
+                for (let k = 0; k < ms.length; k++) ms[k].add(node.acc[k], r);
+                for (let d = 0; d < by.length; d++) {
+                    const key = by[d](r);
+                    const kids = node.kids || (node.kids = new Map());
+                    let next = kids.get(key);
+                    if (!next) { next = new QueryNode(key, node.keys.concat([key]), fresh()); kids.set(key, next); }
+                    node = next;
+                    for (let k = 0; k < ms.length; k++) ms[k].add(node.acc[k], r);
+                }
+            };
+            if (q.ids) for (const i of q.ids) visit(rows[i]);
+            else for (let i = 0; i < rows.length; i++) visit(rows[i]);
+
+            const order = QUERY.comparator(q.sort);
+            const finish = (node, top) => {
+                const out = { key: node.key, keys: node.keys, depth: node.depth };
+                ms.forEach((m, k) => { out[m.name] = m.value(node.acc[k]); });
+                if (q.derive) q.derive(out);
+                if (node.kids) {
+                    let kids = [...node.kids.values()].map(n => finish(n, false));
+                    if (order) kids.sort(order);
+                    if (top && q.top) kids = kids.slice(0, q.top);
+                    out.children = kids;
+                }
+                return out;
+            };
+            const tree = finish(root, true);
+            if (q.rollup) return tree;
+            // Flat: the deepest level, in tree order
+            const leaves = [];
+            const walk = n => { if (n.children) n.children.forEach(walk); else if (n.depth === by.length) leaves.push(n); };
+            walk(tree);
+            return leaves;
+        },
+
+        // 'key' | ['field', 'asc'|'desc'] → comparator (keys compared with numeric-aware collation)
+        comparator(sort) {
+            if (!sort) return null;
+            const [field, dir] = Array.isArray(sort) ? sort : [sort, 'asc'];
+            const sign = dir === 'desc' ? -1 : 1;
+            const collator = new Intl.Collator(undefined, { numeric: true });
+            return (a, b) => {
+                const x = a[field], y = b[field];
+                if (typeof x === 'number' && typeof y === 'number') return sign * (x - y);
+                return sign * collator.compare(x == null ? '' : String(x), y == null ? '' : String(y));
+            };
+        }
+    };
+'''
@@ -8,15 +8,27 @@ Usage:
     python3 refresh.py          # Full refresh (BQ pull + rebuild + push)
     python3 refresh.py --local  # Rebuild from cached CSV (no BQ, no push)
     python3 refresh.py --no-push # Pull BQ data + rebuild, but skip git push
+    python3 refresh.py --data-branch # Commit generated artifacts to the orphan `data` branch
+
+A build that breaks a size budget (see bundle_size.py) is never pushed.
 """
 import csv
 import json
+import os
+import re
 import subprocess
 import sys
+import tempfile
 from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 
+import bundle_size
+import leak_pipeline
+from org_tree import inject_org_tree
+from payload import apply_stamp, data_stamp, dumps_rows, dumps_series, json_script, store_key, write_jsonl
+
 # === Paths ===
 PROJECT = Path(__file__).parent
 BQ_DIR = Path.home() / 'bigquery_results'
@@ -25,6 +37,23 @@ PHASE_MAP_CSV = BQ_DIR / 'wtw-fy26-workorders-pm-scores-labor-20260209-151220.cs
 BQ_RAW_CSV = BQ_DIR / 'wtw-bq-raw-latest.csv'
 LABOR_CSV = BQ_DIR / 'wtw-labor-latest.csv'
 RACK_CSV = BQ_DIR / 'dip-rack-scores-latest.csv'
+# JSON blocks for HIST_TIT / HIST_ROR (PDF-only history), just before </body>
+HIST_START = '<!-- Hist Data Start -->'
+HIST_END = '<!-- Hist Data End -->'
+# Packed per director (SeriesTable on the page); dates and banner / region ids are dictionary-coded
+HIST_TIT_COLUMNS = [('d', 'str'), ('bn', 'str'), ('n', 'i32'), ('t', 'f32')]
+HIST_ROR_COLUMNS = [('d', 'str'), ('r', 'str'), ('n', 'i32'), ('t', 'f32')]
+
+# === Git publishing ===
+REMOTES = ['origin', 'ghe']
+MAIN_BRANCH = 'main'
+DATA_BRANCH = 'data'
+# Generated files that go to DATA_BRANCH (instead of main) with --data-branch
+ARTIFACTS = [
+    'index.html', 'data', 'store_data.json', 'hist_tit.json', 'hist_ror.json',
+    'trend_compact.json', 'projects_preview.html',
+    'tnt-azure-deploy.zip', 'tnt-summary-dive-shareable.zip',
+]
 
 
 # === BQ Queries ===
@@ -233,9 +262,17 @@ def run_bq(query: str, output_path: Path, max_rows: int = 15000) -> int:
     return row_count
 
 
+def hist_series(json_path: Path, columns) -> str:
+    """hist_*.json rows packed per director, each director's rows in date order."""
+    series = {}
+    for r in sorted(json.loads(json_path.read_text()), key=lambda r: r['d'] or ''):
+        series.setdefault(r['dir'], []).append(tuple(r[name] for name, _ in columns))
+    return dumps_series(series, columns)
+
+
 def csv_to_json(csv_path: Path, json_path: Path, compact_keys: dict = None,
-                float_cols: set = None, int_cols: set = None) -> int:
-    """Convert a BQ CSV output to compact JSON. Returns row count."""
+                float_cols: set = None, int_cols: set = None, sort_key=None) -> int:
+    """Convert a BQ CSV output to compact, line-per-row JSON. Returns row count."""
     rows = load_csv(csv_path)
     result = []
     for row in rows:
@@ -257,7 +294,10 @@ def csv_to_json(csv_path: Path, json_path: Path, compact_keys: dict = None,
             else:
                 d[out_key] = v
         result.append(d)
-    json_path.write_text(json.dumps(result, separators=(',', ':')))
+    if sort_key:
+        result.sort(key=sort_key)
+    json_path.write_text(dumps_rows(result))
+    write_jsonl(json_path.stem, result)
     print(f"   \u2705 Converted {csv_path.name} -> {json_path.name} ({len(result)} rows)")
     return len(result)
 
@@ -275,7 +315,8 @@ def embed_data_in_html():
             float_cols={'twt_ref','twt_ref_7_day','twt_ref_30_day','twt_ref_90_day',
                         'twt_hvac','twt_hvac_7_day','twt_hvac_30_day','twt_hvac_90_day',
                         'total_loss'},
-            int_cols={'case_count','cases_out_of_target'}
+            int_cols={'case_count','cases_out_of_target'},
+            sort_key=store_key('store_number')
         )
 
     hist_csv = PROJECT / 'hist_tit.csv'
@@ -283,7 +324,8 @@ def embed_data_in_html():
         csv_to_json(
             hist_csv, PROJECT / 'hist_tit.json',
             compact_keys={'dt': 'd', 'dir': 'dir', 'bn': 'bn', 'n': 'n', 'tit': 't'},
-            float_cols={'tit'}, int_cols={'n'}
+            float_cols={'tit'}, int_cols={'n'},
+            sort_key=lambda r: (r['d'] or '', r['dir'] or '', r['bn'] or '')
         )
 
     ror_csv = PROJECT / 'hist_ror.csv'
@@ -291,7 +333,8 @@ def embed_data_in_html():
         csv_to_json(
             ror_csv, PROJECT / 'hist_ror.json',
             compact_keys={'dt': 'd', 'dir': 'dir', 'ror': 'r', 'n': 'n', 'tit': 't'},
-            float_cols={'tit'}, int_cols={'n'}
+            float_cols={'tit'}, int_cols={'n'},
+            sort_key=lambda r: (r['d'] or '', r['dir'] or '', r['r'] or '')
         )
 
     trend_csv = PROJECT / 'weekly_trend.csv'
@@ -300,7 +343,8 @@ def embed_data_in_html():
             trend_csv, PROJECT / 'trend_compact.json',
             compact_keys={'wmt_week': 'w', 'fm_director': 'd', 'fm_regional_mgr': 'r',
                           'fm_sr_director': 's', 'store_count': 'n', 'avg_weekly_tit': 't'},
-            float_cols={'avg_weekly_tit'}, int_cols={'store_count'}
+            float_cols={'avg_weekly_tit'}, int_cols={'store_count'},
+            sort_key=lambda r: (r['w'] or '', r['s'] or '', r['d'] or '', r['r'] or '')
         )
 
     # Embed store_data.json
@@ -320,23 +364,30 @@ def embed_data_in_html():
                 i += 1
             html = html[:js] + sd_json + html[i+1:]
             print("   \u2705 Embedded EMBEDDED_STORE_DATA")
+        html = inject_org_tree(html, 'tnt', json.loads(sd_json))
+        print("   \u2705 Org tree updated (TnT stores)")
 
     # Embed HIST_TIT + HIST_ROR
     ht_path = PROJECT / 'hist_tit.json'
     hr_path = PROJECT / 'hist_ror.json'
     if ht_path.exists() and hr_path.exists():
-        ht_json = ht_path.read_text().strip()
-        hr_json = hr_path.read_text().strip()
-        block = f'const HIST_TIT = {ht_json};\n        const HIST_ROR = {hr_json};'
+        ht_json = hist_series(ht_path, HIST_TIT_COLUMNS)
+        hr_json = hist_series(hr_path, HIST_ROR_COLUMNS)
+        # Only the PDF export reads these: JSON blocks, parsed on first use
+        block = "lazyData('HIST_TIT', 'HIST_ROR');"
         if 'const HIST_TIT = ' in html:
+            # Older pages embedded JS literals
             hs = html.find('const HIST_TIT = ')
             he = html.find(';', html.find('const HIST_ROR = ', hs))
             html = html[:hs] + block + html[he+1:]
-        else:
+        elif block not in html:
             # Insert after EMBEDDED_STORE_DATA line
             ins = html.find('const EMBEDDED_STORE_DATA = ')
             eol = html.find(';\n', ins)
             html = html[:eol+2] + '        ' + block + '\n' + html[eol+2:]
+        html = re.sub(re.escape(HIST_START) + r'.*?' + re.escape(HIST_END) + r'\n?', '', html, flags=re.DOTALL)
+        hist = f"{HIST_START}\n{json_script('HIST_TIT', ht_json)}\n{json_script('HIST_ROR', hr_json)}\n{HIST_END}\n"
+        html = html.replace('</body>', hist + '</body>', 1)
         print("   \u2705 Embedded HIST_TIT + HIST_ROR")
 
     # Embed TREND_DATA (weekly trend by director/RM)
@@ -357,14 +408,14 @@ def embed_data_in_html():
             html = html[:js] + td_json + html[i+1:]
             print("   \u2705 Embedded TREND_DATA")
 
-    # Update "Last Updated" timestamp
-    stamp = datetime.now().strftime('%Y-%m-%d %H:%M')
-    import re
-    html = re.sub(
-        r"document\.getElementById\('lastUpdated'\)\.textContent\s*=\s*'[^']*'",
-        f"document.getElementById('lastUpdated').textContent = 'Data as of {stamp}'",
-        html
-    )
+    # Update "Last Updated" timestamp: one stamp per refresh, taken after every
+    # dataset is written (unchanged data keeps the previous stamp)
+    pages = [html]
+    preview = PROJECT / 'projects_preview.html'   # projects D is only embedded there
+    if preview.exists():
+        pages.append(preview.read_text(encoding='utf-8'))
+    stamp = data_stamp(*pages)
+    html = apply_stamp(html, stamp)
     print(f"   \u2705 Timestamp set to {stamp}")
 
     html_path.write_text(html)
@@ -524,13 +575,13 @@ def print_stats(rows: list[dict]):
 
 
 def run_tab_scripts():
-    """Run add_wtw_tab.py and add_leak_tab.py to rebuild index.html."""
+    """Run the tab builders to rebuild index.html (the data stamp is set afterwards, once)."""
     for script in ['add_wtw_tab.py', 'add_leak_tab.py', 'add_terminal_tab.py', 'add_projects_tab.py']:
         path = PROJECT / script
         if path.exists():
             print(f"   Running {script}...")
             result = subprocess.run(
-                [sys.executable, str(path)],
+                [sys.executable, str(path), '--no-stamp'],
                 cwd=str(PROJECT), capture_output=True, text=True
             )
             # Print last meaningful line
@@ -541,28 +592,78 @@ def run_tab_scripts():
             print(f"   \u26a0\ufe0f  {script} not found, skipping")
 
 
-def git_push():
-    """Commit and push to both remotes."""
+def git(*args, env=None) -> subprocess.CompletedProcess:
+    return subprocess.run(['git', *args], cwd=str(PROJECT), capture_output=True, text=True, env=env)
+
+
+def push_all(refspecs: list[str]):
+    """Push the refspecs to every remote concurrently."""
+    def push(remote):
+        return remote, git('push', remote, *refspecs)
+    branches = ', '.join(r.rsplit('/', 1)[-1] for r in refspecs)
+    with ThreadPoolExecutor(max_workers=len(REMOTES)) as pool:
+        for remote, result in pool.map(push, REMOTES):
+            if result.returncode != 0:
+                print(f"   \u26a0\ufe0f  git push {remote}: {result.stderr.strip()[:100]}")
+            else:
+                print(f"   \u2705 Pushed {branches} to {remote}")
+
+
+def commit_data_branch(message: str) -> bool:
+    """Commit ARTIFACTS onto the orphan DATA_BRANCH without touching the work tree.
+
+    Uses a throwaway index so main's staging area is left alone. Returns
+    False when the artifacts are identical to the branch tip.
+    """
+    parent = git('rev-parse', '--verify', '-q', f'refs/heads/{DATA_BRANCH}').stdout.strip()
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {**os.environ, 'GIT_INDEX_FILE': str(Path(tmp) / 'index')}
+        git('read-tree', *([parent] if parent else ['--empty']), env=env)
+        paths = [p for p in ARTIFACTS if (PROJECT / p).exists()]
+        git('add', '-A', '-f', '--', *paths, env=env)
+        tree = git('write-tree', env=env).stdout.strip()
+    if parent and git('rev-parse', f'{parent}^{{tree}}').stdout.strip() == tree:
+        return False
+    commit = git('commit-tree', tree, *(['-p', parent] if parent else []), '-m', message).stdout.strip()
+    git('update-ref', f'refs/heads/{DATA_BRANCH}', commit, *([parent] if parent else []))
+    return True
+
+
+def git_push(data_branch: bool = False):
+    """Commit and push to both remotes (skips the commit when nothing changed).
+
+    With data_branch=True, generated ARTIFACTS are committed to the orphan
+    DATA_BRANCH and main only receives source changes.
+    """
     stamp = datetime.now().strftime('%Y-%m-%d %H:%M')
-    cmds = [
-        ['git', 'add', '-A'],
-        ['git', 'commit', '-m', f'Refresh data {stamp}'],
-        ['git', 'push', 'origin', 'main'],
-        ['git', 'push', 'ghe', 'main'],
-    ]
-    for cmd in cmds:
-        result = subprocess.run(cmd, cwd=str(PROJECT), capture_output=True, text=True)
-        if result.returncode != 0 and 'nothing to commit' not in result.stdout:
-            label = ' '.join(cmd[:3])
-            print(f"   \u26a0\ufe0f  {label}: {result.stderr.strip()[:100]}")
-        elif 'push' in cmd:
-            remote = cmd[2]
-            print(f"   \u2705 Pushed to {remote}")
+    refspecs = []
+
+    if data_branch:
+        if commit_data_branch(f'Data {stamp}'):
+            refspecs.append(f'refs/heads/{DATA_BRANCH}:refs/heads/{DATA_BRANCH}')
+        else:
+            print(f"   \u23e9 {DATA_BRANCH}: no data changes, skipping commit")
+        git('add', '-A', '--', '.', *(f':(exclude){p}' for p in ARTIFACTS))
+    else:
+        git('add', '-A')
+
+    if git('diff', '--cached', '--quiet').returncode != 0:
+        result = git('commit', '-m', f'Refresh data {stamp}')
+        if result.returncode != 0:
+            print(f"   \u26a0\ufe0f  git commit: {result.stderr.strip()[:100]}")
+        else:
+            refspecs.append(f'HEAD:refs/heads/{MAIN_BRANCH}')
+    else:
+        print(f"   \u23e9 {MAIN_BRANCH}: nothing changed, skipping commit")
+
+    if refspecs:
+        push_all(refspecs)
 
 
 def main():
     local_only = '--local' in sys.argv
     no_push = '--no-push' in sys.argv
+    data_branch = '--data-branch' in sys.argv
     ts = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
 
     print(f"\n\U0001f43e TNT Dashboard Refresh \u2014 {ts}")
@@ -583,6 +684,8 @@ def main():
         run_bq(QUERY_HIST_TIT, PROJECT / 'hist_tit.csv', max_rows=8000)
         run_bq(QUERY_HIST_ROR, PROJECT / 'hist_ror.csv', max_rows=8000)
         run_bq(QUERY_WEEKLY_TREND, PROJECT / 'weekly_trend.csv', max_rows=5000)
+        if leak_pipeline.ENABLED:
+            leak_pipeline.pull()  # open months only; closed months stay frozen
 
         # Merge BQ data + rack scores + labor + phases
         print("\n\U0001f527 Step 2: Merging data")
@@ -606,12 +709,18 @@ def main():
     print("\n\U0001f4e6 Step 3b: Embedding data into index.html")
     embed_data_in_html()
 
+    # --- Step 3c: Size budgets ---
+    print("\n\U0001f4cf Step 3c: Checking bundle size budgets")
+    within_budget = bundle_size.run()
+
     # --- Step 3: Git push ---
     if local_only or no_push:
         print("\n\u23e9 Skipping git push")
+    elif not within_budget:
+        print("\n\u274c Over size budget \u2014 not pushing (see size_report.json)")
     else:
         print("\n\U0001f680 Step 4: Pushing to GitHub")
-        git_push()
+        git_push(data_branch=data_branch)
 
     print("\n" + "=" * 50)
     print("\U0001f389 Done!")
@@ -0,0 +1,61 @@
+"""JS builder for the shared render scheduler.
+
+Filter and sort changes only mark the view dirty. Once per animation frame
+the scheduler runs the tab's model function (one fused pass over the data),
+then hands each widget its slice of the model and re-renders only the
+widgets whose slice actually changed since the last frame.
+"""
+
+
+def build_render_scheduler_js():
+    """Return the RenderScheduler class (no dependencies, plain ES6)."""
+    return '''
+    // ── Render scheduler ──────────────────────────────────────────
+    // const view = new RenderScheduler(() => model, {
+    //   kpis:  { select: m => m.kpis, render: kpis => ... },
+    //   table: { select: m => [m.version, sortField, sortAsc], render: () => ... }
+    // });
+    // view.invalidate()       data changed → recompute the model next frame
+    // view.invalidate(false)  only view state (e.g. sort) changed → reuse the last model
+    class RenderScheduler {
+        constructor(compute, widgets) {
+            this.compute = compute;
+            this.widgets = widgets;
+            this.model = null;
+            this.last = {};
+            this.stale = true;
+            this.frame = 0;
+        }
+
+        invalidate(dataChanged = true) {
+            if (dataChanged) this.stale = true;
+            if (!this.frame) this.frame = requestAnimationFrame(() => this.flush());
+        }
+
+        // Run now instead of waiting for the frame (e.g. before printing)
+        flush() {
+            if (this.frame) cancelAnimationFrame(this.frame);
+            this.frame = 0;
+            if (this.stale || !this.model) this.model = this.compute();
+            this.stale = false;
+            for (const [name, w] of Object.entries(this.widgets)) {
+                const slice = w.select(this.model);
+                if (name in this.last && RenderScheduler.same(this.last[name], slice)) continue;
+                this.last[name] = slice;
+                try { w.render(slice, this.model); }
+                catch (e) { console.error('Render failed for ' + name + ':', e); }
+            }
+        }
+
+        // Structural equality for plain data (numbers, strings, arrays, plain objects)
+        static same(a, b) {
+            if (a === b) return true;
+            if (typeof a !== 'object' || typeof b !== 'object' || !a || !b) return a !== a && b !== b;
+            if (Array.isArray(a) !== Array.isArray(b)) return false;
+            const ka = Object.keys(a), kb = Object.keys(b);
+            if (ka.length !== kb.length) return false;
+            for (const k of ka) if (!RenderScheduler.same(a[k], b[k])) return false;
+            return true;
+        }
+    }
+'''
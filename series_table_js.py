@@ -0,0 +1,60 @@
+"""JS builder for packed numeric series (payload.dumps_series).
+
+Per-store and per-director time series (LK_MONTHLY, HIST_TIT, HIST_ROR)
+ship as one base64 buffer instead of thousands of small JSON arrays.
+The buffer is decoded once; every column is a typed-array view on it and
+a key's rows are subarray views on those, so nothing is copied per
+lookup. lazyData builds a SeriesTable for any block whose JSON carries
+enc: 'series'.
+"""
+
+
+def build_series_table_js():
+    """Return the SeriesTable class (no dependencies)."""
+    return '''
+    // ── Packed numeric series ─────────────────────────────────────
+    // LK_MONTHLY.get('1234')      → {length, y: Int16Array, m: Uint8Array, q: Float32Array} (views, no copy) or null
+    //                               a column holding nulls (NaN / SeriesTable.NULLS) comes back as an Array with null
+    // HIST_TIT.dicts.d[r.d[i]]    → the string behind a 'str' column code (dictionaries are sorted)
+    // HIST_TIT.keys               → keys in payload order
+    class SeriesTable {
+        constructor(packed) {
+            const bin = atob(packed.buf);
+            const bytes = new Uint8Array(bin.length);
+            for (let i = 0; i < bin.length; i++) bytes[i] = bin.charCodeAt(i);
+            this.keys = packed.keys;
+            this.dicts = packed.dicts;
+            this.index = new Map(packed.keys.map((k, i) => [k, i]));
+            this.offsets = new Int32Array(bytes.buffer, 0, packed.keys.length + 1);
+            this.cols = {};
+            this.nulls = {};            // column → its null sentinel, only for columns that hold one
+            let at = this.offsets.byteLength;
+            packed.cols.forEach(([name, type]) => {
+                const T = SeriesTable.TYPES[type];
+                this.cols[name] = new T(bytes.buffer, at, packed.rows);
+                if (this.cols[name].includes(SeriesTable.NULLS[type])) this.nulls[name] = SeriesTable.NULLS[type];
+                at += Math.ceil(packed.rows * T.BYTES_PER_ELEMENT / 4) * 4;   // columns are padded to 4 bytes
+            });
+        }
+
+        get(key) {
+            const i = this.index.get(String(key));
+            if (i === undefined) return null;
+            const a = this.offsets[i], b = this.offsets[i + 1];
+            const rows = { length: b - a };
+            for (const name in this.cols) {
+                const view = this.cols[name].subarray(a, b);
+                if (!(name in this.nulls)) {
+                    rows[name] = view;
+                    continue;
+                }
+                const nul = this.nulls[name];
+                rows[name] = Array.from(view, v => v === nul || v !== v ? null : v);
+            }
+            return rows;
+        }
+    }
+    SeriesTable.TYPES = { u8: Uint8Array, i16: Int16Array, i32: Int32Array, f32: Float32Array, str: Uint16Array };
+    // payload.SERIES_NULLS: how dumps_series stores None (includes() matches NaN too)
+    SeriesTable.NULLS = { u8: 0xFF, i16: -0x8000, i32: -0x80000000, f32: NaN, str: 0xFFFF };
+'''
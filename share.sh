@@ -67,6 +67,9 @@ build_zip() {
         sed "s|</body>|${inject_script}</body>|" "${SOURCE_HTML}" > "${html_file}"
     fi
 
+    # The ZIP has no sibling .js files: inline the PDF export stack compressed (unpacked on first export)
+    python3 "${SCRIPT_DIR}/pdf_stack.py" "${html_file}"
+
     create_howto "${stage_dir}" "${person}" "${filter_desc}"
 
     rm -f "${zip_file}"
@@ -0,0 +1,59 @@
+"""Shared client-side engines, injected once into index.html.
+
+Every tab script calls inject_shared_js(html); the block is replaced in place
+between its markers, so whichever script runs last leaves the current version.
+It sits in <head> so the engines exist before any tab script runs. Static
+<script src> tags for the PDF export stack are dropped on the way; the
+block loads that stack when export is first used.
+"""
+import re
+
+from chart_manager_js import build_chart_manager_js
+from compute_engine_js import build_compute_engine_js
+from data_cache_js import build_data_cache_js
+from filter_engine_js import build_filter_engine_js
+from lazy_data_js import build_lazy_data_js
+from lru_cache_js import build_lru_cache_js
+from org_tree_js import build_org_tree_js
+from pdf_loader_js import build_pdf_loader_js
+from pdf_stack import strip_static_tags
+from query_engine_js import build_query_engine_js
+from render_scheduler_js import build_render_scheduler_js
+from series_table_js import build_series_table_js
+from sort_cache_js import build_sort_cache_js
+from store_index_js import build_store_index_js
+from url_state_js import build_url_state_js
+from virtual_table_js import build_virtual_table_js
+
+START = '<!-- Shared JS Start -->'
+END = '<!-- Shared JS End -->'
+
+
+def build_shared_js():
+    """Return the <script> block holding every shared engine."""
+    return f'''{START}
+<script>
+{build_series_table_js()}
+{build_lazy_data_js()}
+{build_data_cache_js()}
+{build_filter_engine_js()}
+{build_lru_cache_js()}
+{build_compute_engine_js()}
+{build_query_engine_js()}
+{build_org_tree_js()}
+{build_store_index_js()}
+{build_virtual_table_js()}
+{build_sort_cache_js()}
+{build_render_scheduler_js()}
+{build_chart_manager_js()}
+{build_url_state_js()}
+{build_pdf_loader_js()}
+</script>
+{END}'''
+
+
+def inject_shared_js(html):
+    """Insert (or refresh) the shared engine block just before </head>."""
+    html = strip_static_tags(html)
+    html = re.sub(re.escape(START) + r'.*?' + re.escape(END) + r'\n?', '', html, flags=re.DOTALL)
+    return html.replace('</head>', build_shared_js() + '\n</head>', 1)
@@ -0,0 +1,102 @@
+"""JS builder for the shared sort-permutation cache.
+
+Each sortable column is sorted once per dataset, on first use, into a
+permutation of row ids (typed keys: numeric, date, or collated string).
+A filtered view is then ordered by walking that permutation and keeping
+the rows in the current result, so re-sorting or re-filtering a table is
+a linear pass instead of a fresh O(n log n) sort with string work in the
+comparator. Given the dataset's JSON block name, permutations are also kept
+in the IndexedDB cache under the block's content hash and reused on the
+next visit.
+"""
+
+
+def build_sort_cache_js():
+    """Return the SortCache class (needs DATA_CACHE)."""
+    return '''
+    // ── Sort permutations ─────────────────────────────────────────
+    // const sc = new SortCache(() => rows, { s: 'num', exp: 'date', fm: 'str', burn: ['num', r => r.burn] });
+    // sc.sorted('s', asc, ids)   → rows of ids (Int32Array/array of row ids, or null = all) in column order
+    // new SortCache(() => WTW_DATA, columns, 'WTW_DATA')   also persist permutations by the block's content hash
+    // Ties keep dataset order in both directions; empty/unparseable values sort lowest.
+    class SortCache {
+        constructor(rows, columns, block = null) {
+            this.source = rows;
+            this.columns = columns;
+            this.block = block;
+            this.data = null;
+            this.perms = {};     // field → {order: Int32Array, brk: Uint8Array (1 = first of a run of equal keys)}
+            this.stored = {};    // field → permutation read back from DATA_CACHE, not yet used
+            this.keep = null;    // scratch membership bitmap
+            if (block) Object.keys(columns).forEach(f => {
+                DATA_CACHE.get(this.storeKey(f)).then(p => { if (p && !this.perms[f]) this.stored[f] = p; });
+            });
+        }
+
+        storeKey(field) {
+            return this.block ? DATA_CACHE.key(this.block, 'sort:' + field, this.columns[field] || 'str') : null;
+        }
+
+        rows() {
+            if (!this.data) this.data = this.source();
+            return this.data;
+        }
+
+        perm(field) {
+            if (this.perms[field]) return this.perms[field];
+            if (this.stored[field]) return (this.perms[field] = this.stored[field]);
+            const rows = this.rows(), n = rows.length;
+            const col = this.columns[field] || 'str';
+            const [type, get] = Array.isArray(col) ? col : [col, r => r[field]];
+            const order = new Int32Array(n);
+            for (let i = 0; i < n; i++) order[i] = i;
+            let same;
+            if (type === 'str') {
+                const keys = rows.map(r => { const v = get(r); return v == null ? '' : String(v); });
+                const collator = SortCache.collator;
+                order.sort((a, b) => collator.compare(keys[a], keys[b]) || a - b);
+                same = (a, b) => collator.compare(keys[a], keys[b]) === 0;
+            } else {
+                const keys = new Float64Array(n);
+                rows.forEach((r, i) => {
+                    const v = get(r);
+                    const x = v == null || v === '' ? NaN : type === 'date' ? Date.parse(v) : typeof v === 'number' ? v : parseFloat(v);
+                    keys[i] = x === x ? x : -Infinity;
+                });
+                order.sort((a, b) => (keys[a] - keys[b]) || a - b);
+                same = (a, b) => keys[a] === keys[b];
+            }
+            const brk = new Uint8Array(n);
+            for (let p = 0; p < n; p++) brk[p] = p === 0 || !same(order[p - 1], order[p]) ? 1 : 0;
+            this.perms[field] = { order, brk };
+            if (this.block) DATA_CACHE.put(this.storeKey(field), this.perms[field]);
+            return this.perms[field];
+        }
+
+        sorted(field, asc, ids = null) {
+            const rows = this.rows(), n = rows.length;
+            const { order, brk } = this.perm(field);
+            let keep = null;
+            if (ids) {
+                if (!this.keep || this.keep.length !== n) this.keep = new Uint8Array(n);
+                keep = this.keep;
+                keep.fill(0);
+                for (const i of ids) keep[i] = 1;
+            }
+            const out = [];
+            if (asc) {
+                for (let p = 0; p < n; p++) if (!keep || keep[order[p]]) out.push(rows[order[p]]);
+            } else {
+                // Runs of equal keys in reverse, each run still in dataset order
+                for (let end = n; end > 0;) {
+                    let start = end - 1;
+                    while (!brk[start]) start--;
+                    for (let p = start; p < end; p++) if (!keep || keep[order[p]]) out.push(rows[order[p]]);
+                    end = start;
+                }
+            }
+            return out;
+        }
+    }
+    SortCache.collator = new Intl.Collator(undefined, { numeric: true, sensitivity: 'base' });
+'''
@@ -1,79 +1,109 @@
 """Load and merge store asset data for the store detail view.
 
 Combines rack, HVAC, case, and terminal data into a single
-compact dict keyed by store number.
+compact dict keyed by store number. The page only needs one store at a
+time (the detail panel), so the embedded data is sharded by store-number
+range: a small STORE_ASSETS index plus STORE_ASSETS_<n> blocks, each
+parsed the first time a store in its range is expanded.
 """
 import json
+import re
 from pathlib import Path
 
+from payload import dumps, dumps_map, write_jsonl
+
 BQ = Path.home() / 'bigquery_results'
 
+SHARD_STORES = 500   # store numbers per STORE_ASSETS_<n> block
+
+# (summary file, section, {output key: source key}); None keeps the whole entry under 'terms'
+SOURCES = [
+    ('rack-store-summary.json', 'r', {
+        'rc': 'rc',     # rack count
+        'rs': 'rs',     # rack scorecard score
+        'cl': 'cl',     # compressor lockouts
+        'la': 'la',     # lockout alarms
+        'fa': 'fa',     # float alarms
+        'tf': 'tf',     # tests failed
+        'tp': 'tp',     # tests passed
+    }),
+    ('case-store-summary.json', 'r', {
+        'cc': 'cc',     # case count
+        'lt': 'lt',     # LT cases
+        'mt': 'mt',     # MT cases
+        'ctp': 'tp',    # case terminal %
+        'cow': 'ow',    # case open WOs
+        'cat': 'at',    # case avg temp
+    }),
+    ('hvac-store-summary.json', 'h', {
+        'u': 'u',       # total units
+        'ah': 'ah',     # AHU count
+        'rt': 'rt',     # RTU count
+        'tnt': 'tnt',   # HVAC TnT
+        'dp': 'dp',     # avg dewpoint
+        'al': 'al',     # alerts
+        'hdp': 'hdp',   # high dewpoint alerts
+        'cdp': 'cdp',   # critical dewpoint
+        'wo': 'wo',     # WOs last 30
+    }),
+    ('hvac-terminal-summary.json', 'h', None),   # terminal units by type
+]
+
+_SEP = re.compile(r'[\s,:]*')
+
 
-def _load(filename):
+def _items(filename):
+    """(store, summary) pairs from a {store: summary} file, decoded one entry at a time."""
     path = BQ / filename
     if not path.exists():
-        return {}
-    with open(path) as f:
-        return json.load(f)
+        return
+    text = path.read_text()
+    decoder = json.JSONDecoder()
+    pos = text.find('{') + 1
+    if not pos:
+        return
+    while True:
+        pos = _SEP.match(text, pos).end()
+        if pos >= len(text) or text[pos] == '}':
+            return
+        key, pos = decoder.raw_decode(text, pos)
+        pos = _SEP.match(text, pos).end()
+        value, pos = decoder.raw_decode(text, pos)
+        yield key, value
 
 
 def load_store_assets():
-    """Return {store_nbr: {refrig: {...}, hvac: {...}}} for all stores."""
-    rack = _load('rack-store-summary.json')
-    hvac = _load('hvac-store-summary.json')
-    cases = _load('case-store-summary.json')
-    terminals = _load('hvac-terminal-summary.json')
+    """Return {store_nbr: {r: {...}, h: {...}}} for all stores.
 
-    all_stores = set(rack) | set(hvac) | set(cases) | set(terminals)
+    Sources are merged one at a time, entry by entry, so only the compact
+    output is held in memory, never the four full source dicts.
+    """
     out = {}
-    for s in all_stores:
-        entry = {}
-        # Refrigeration
-        r = rack.get(s)
-        c = cases.get(s)
-        if r or c:
-            ref = {}
-            if r:
-                ref['rc'] = r['rc']        # rack count
-                ref['rs'] = r['rs']        # rack scorecard score
-                ref['cl'] = r['cl']        # compressor lockouts
-                ref['la'] = r['la']        # lockout alarms
-                ref['fa'] = r['fa']        # float alarms
-                ref['tf'] = r['tf']        # tests failed
-                ref['tp'] = r['tp']        # tests passed
-            if c:
-                ref['cc'] = c['cc']        # case count
-                ref['lt'] = c['lt']        # LT cases
-                ref['mt'] = c['mt']        # MT cases
-                ref['ctp'] = c['tp']       # case terminal %
-                ref['cow'] = c['ow']       # case open WOs
-                ref['cat'] = c['at']       # case avg temp
-            entry['r'] = ref
+    for filename, section, fields in SOURCES:
+        for s, src in _items(filename):
+            if not src:
+                continue
+            part = out.setdefault(s, {}).setdefault(section, {})
+            if fields is None:
+                part['terms'] = src
+            else:
+                part.update((k, src[f]) for k, f in fields.items())
+    return {s: out[s] for s in sorted(out, key=lambda x: (len(x), x))}
 
-        # HVAC
-        h = hvac.get(s)
-        t = terminals.get(s)
-        if h or t:
-            hv = {}
-            if h:
-                hv['u'] = h['u']           # total units
-                hv['ah'] = h['ah']         # AHU count
-                hv['rt'] = h['rt']         # RTU count
-                hv['tnt'] = h['tnt']       # HVAC TnT
-                hv['dp'] = h['dp']         # avg dewpoint
-                hv['al'] = h['al']         # alerts
-                hv['hdp'] = h['hdp']       # high dewpoint alerts
-                hv['cdp'] = h['cdp']       # critical dewpoint
-                hv['wo'] = h['wo']         # WOs last 30
-            if t:
-                hv['terms'] = t            # terminal units by type
-            entry['h'] = hv
 
-        if entry:
-            out[s] = entry
-    return out
+def shard_of(store):
+    """Shard id for a store number: its SHARD_STORES range, 'X' for anything non-numeric."""
+    return str(int(store) // SHARD_STORES) if store.isdigit() else 'X'
 
 
-def store_assets_json():
-    """Return minified JSON string for embedding."""
-    return json.dumps(load_store_assets(), separators=(',', ':'))
+def store_assets_blocks():
+    """Return {block name: JSON text}: the STORE_ASSETS index ({shard: [stores]}) and one block per shard."""
+    assets = load_store_assets()
+    write_jsonl('store_assets', assets)
+    shards = {}
+    for s, entry in assets.items():
+        shards.setdefault(shard_of(s), {})[s] = entry
+    order = sorted(shards, key=lambda n: (not n.isdigit(), len(n), n))
+    blocks = {'STORE_ASSETS': dumps({n: list(shards[n]) for n in order})}
+    blocks.update((f'STORE_ASSETS_{n}', dumps_map(shards[n])) for n in order)
+    return blocks
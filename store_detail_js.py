@@ -10,23 +10,43 @@ def build_store_detail_js():
     """Return the JS functions for the store detail panel.
 
     These functions rely on global vars from the leak tab:
-    - STORE_ASSETS, LK_WOS, WTW_DATA
-    - lkDetailFilter, lkExpandedStore
+    - STORE_ASSETS (shard index) + STORE_ASSETS_<n>, LK_WOS, STORE_INDEX (WTW rows per store)
+    - lkDetailFilter, lkExpandedStore, getLeakTable()
     """
     return f'''
+    // Store assets are sharded by store-number range (store_assets.py): STORE_ASSETS maps shard → stores,
+    // and a shard block is only parsed (then kept) when a store in it is checked or expanded
+    let storeAssetShard = null;
+    function storeAssetShardOf(storeNbr) {{
+        if (!storeAssetShard) {{
+            storeAssetShard = new Map();
+            for (const shard in STORE_ASSETS) STORE_ASSETS[shard].forEach(s => storeAssetShard.set(s, shard));
+        }}
+        return storeAssetShard.get(String(storeNbr));
+    }}
+
+    function hasStoreAssets(storeNbr) {{
+        return storeAssetShardOf(storeNbr) !== undefined;
+    }}
+
+    function getStoreAssets(storeNbr) {{
+        const shard = storeAssetShardOf(storeNbr);
+        return shard === undefined ? null : (window['STORE_ASSETS_' + shard] || {{}})[storeNbr] || null;
+    }}
+
     function toggleLeakWo(storeNbr) {{
         lkExpandedStore = lkExpandedStore === storeNbr ? null : storeNbr;
         lkDetailFilter = 'all';
-        renderLeakTable();
+        getLeakTable().refresh();
     }}
 
     function setDetailFilter(filter) {{
         lkDetailFilter = filter;
-        renderLeakTable();
+        getLeakTable().refresh();
     }}
 
     function buildStoreDetail(storeNbr) {{
-        const assets = STORE_ASSETS[storeNbr] || {{}};
+        const assets = getStoreAssets(storeNbr) || {{}};
         const wos = LK_WOS[storeNbr] || [];
         const ref = assets.r || null;
         const hv = assets.h || null;
@@ -35,8 +55,8 @@ def build_store_detail_js():
 
         // WTW PM cross-reference
         let wtwHtml = '';
-        if (typeof WTW_DATA !== 'undefined') {{
-            const wtwWos = WTW_DATA.filter(w => w.s === storeNbr);
+        if (STORE_INDEX.has('wtw')) {{
+            const wtwWos = STORE_INDEX.rows('wtw', storeNbr);
             if (wtwWos.length > 0) {{
                 const completed = wtwWos.filter(w => w.st === 'COMPLETED');
                 const latest = wtwWos[0];
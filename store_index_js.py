@@ -0,0 +1,92 @@
+"""JS builder for the shared per-store index.
+
+Every dataset is emitted sorted by store number (payload.store_key), so a
+store's rows form one contiguous run. The index records that run per store
+once, on first use, and any store panel can then pull a store's rows from
+every dataset without scanning. Datasets that are not store-sorted get a
+store-ordered permutation instead, so lookups stay the same.
+"""
+
+
+def build_store_index_js():
+    """Return the StoreIndex class and the STORE_INDEX instance (plain ES6)."""
+    return '''
+    // ── Store index (cross-tab lookups) ───────────────────────────
+    // STORE_INDEX.register('wtw', () => WTW_DATA, 's')   key = field name or (row) => store
+    // STORE_INDEX.rows('wtw', '1234')    → that store's rows, in dataset order
+    // STORE_INDEX.count('terminal', '1234'), STORE_INDEX.has('leak')
+    // STORE_INDEX.panel('1234')          → {wtw: [...], leak: [...], terminal: [...], ...}
+    class StoreIndex {
+        constructor() {
+            this.sets = {};   // name → {rows: () => [], key, data, ranges: Map(store → [start, end]), order}
+        }
+
+        register(name, rows, key) {
+            this.sets[name] = { rows, key: typeof key === 'function' ? key : r => r[key], data: null, ranges: null, order: null };
+        }
+
+        has(name) {
+            return !!this.sets[name];
+        }
+
+        build(name) {
+            const s = this.sets[name];
+            if (s.ranges) return s;
+            const data = s.data = s.rows() || [];
+            const ranges = new Map();
+            let contiguous = true;
+            for (let i = 0; i < data.length && contiguous; i++) {
+                const k = String(s.key(data[i]));
+                const r = ranges.get(k);
+                if (!r) ranges.set(k, [i, i + 1]);
+                else if (r[1] === i) r[1]++;
+                else contiguous = false;
+            }
+            if (!contiguous) {
+                // Not store-sorted: index a store-ordered permutation of the row ids
+                const buckets = new Map();
+                data.forEach((row, i) => {
+                    const k = String(s.key(row));
+                    (buckets.get(k) || buckets.set(k, []).get(k)).push(i);
+                });
+                s.order = new Int32Array(data.length);
+                ranges.clear();
+                let pos = 0;
+                buckets.forEach((ids, k) => {
+                    ranges.set(k, [pos, pos + ids.length]);
+                    ids.forEach(i => { s.order[pos++] = i; });
+                });
+            }
+            s.ranges = ranges;
+            return s;
+        }
+
+        range(name, store) {
+            if (!this.sets[name]) return null;
+            return this.build(name).ranges.get(String(store)) || null;
+        }
+
+        count(name, store) {
+            const r = this.range(name, store);
+            return r ? r[1] - r[0] : 0;
+        }
+
+        rows(name, store) {
+            const r = this.range(name, store);
+            if (!r) return [];
+            const s = this.sets[name];
+            if (!s.order) return s.data.slice(r[0], r[1]);
+            return Array.from(s.order.subarray(r[0], r[1]), i => s.data[i]);
+        }
+
+        panel(store) {
+            const out = {};
+            Object.keys(this.sets).forEach(name => { out[name] = this.rows(name, store); });
+            return out;
+        }
+    }
+
+    const STORE_INDEX = new StoreIndex();
+    // TnT store data comes with the base page rather than a tab script
+    STORE_INDEX.register('tnt', () => typeof EMBEDDED_STORE_DATA !== 'undefined' ? EMBEDDED_STORE_DATA : [], 'store_number');
+'''
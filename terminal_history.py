@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""Day-by-day history of terminal cases, kept locally.
+
+case_terminal_performance is a snapshot: consec_days / days_terminal_30
+say how long a case has been terminal, not what changed since yesterday.
+Each refresh folds that day's terminal case set into terminal_history.json
+as one bit per case per day (bit 0 = latest snapshot day, HISTORY_DAYS
+bits kept, hex-encoded). A new day costs one shift-and-set per case, and
+entries/exits and 7/30/90-day counts are bit counts on the mask.
+
+A separate 'observed' mask marks the days that actually had a snapshot.
+Days without a refresh carry each case's last known state forward, so a
+case terminal on both sides of a gap keeps its counts; a case only
+counts as newly terminal when the day before was observed, and exits
+are dated to the first observed day out. Re-running the same day
+replaces that day's bit, so a rebuild does not double count.
+"""
+import json
+from datetime import date
+from pathlib import Path
+
+from payload import atomic_write_text, dumps
+
+HISTORY_FILE = Path(__file__).parent / 'terminal_history.json'
+HISTORY_DAYS = 90
+WINDOWS = (7, 30, 90)
+EXIT_DAYS = 7   # exits listed in the payload
+
+
+def load_history():
+    """{'day': last snapshot day, 'depth': days recorded, 'observed': day mask, 'cases': {'sn|case': mask}}."""
+    try:
+        raw = json.loads(HISTORY_FILE.read_text(encoding='utf-8'))
+    except (OSError, json.JSONDecodeError):
+        return {'day': None, 'depth': 0, 'observed': 0, 'cases': {}}
+    observed = int(raw['observed'], 16) if 'observed' in raw else (1 << raw['depth']) - 1
+    return {'day': raw['day'], 'depth': raw['depth'], 'observed': observed,
+            'cases': {k: int(m, 16) for k, m in raw['cases'].items()}}
+
+
+def save_history(history):
+    cases = {k: format(m, 'x') for k, m in history['cases'].items()}
+    atomic_write_text(HISTORY_FILE, dumps({'day': history['day'], 'depth': history['depth'],
+                                           'observed': format(history['observed'], 'x'), 'cases': cases}) + '\n')
+
+
+def update_history(history, day, keys):
+    """Fold one snapshot day (ISO date, terminal case keys) into the history.
+
+    Only the delta is applied: existing masks shift by the days elapsed,
+    days skipped in between repeat each case's last state, and cases in
+    today's snapshot get bit 0. A snapshot older than the history is
+    ignored.
+    """
+    prev = history['day']
+    if prev and day < prev:
+        print(f'   ⚠️  Terminal snapshot {day} is older than history ({prev}), not recorded')
+        return history
+    shift = (date.fromisoformat(day) - date.fromisoformat(prev)).days if prev else 0
+    full = (1 << HISTORY_DAYS) - 1
+    gap = (1 << shift) - 2 if shift else 0   # bits 1..shift-1: days with no snapshot
+    cases = {}
+    for k, mask in history['cases'].items():
+        if shift:
+            mask <<= shift
+            if mask & (1 << shift):   # terminal on the last observed day: carry it through the gap
+                mask |= gap
+            mask &= full
+        else:
+            mask &= ~1
+        if mask:
+            cases[k] = mask
+    for k in keys:
+        cases[k] = cases.get(k, 0) | 1
+    depth = min(HISTORY_DAYS, history['depth'] + shift) if prev else 1
+    observed = ((history['observed'] << shift) | 1) & full if prev else 1
+    return {'day': day, 'depth': depth, 'observed': observed, 'cases': cases}
+
+
+def entered(history, mask):
+    """Terminal on the latest day and observed not terminal the day before."""
+    return bool(history['observed'] & 0b10) and mask & 0b11 == 0b01
+
+
+def window_count(mask, days):
+    return bin(mask & ((1 << days) - 1)).count('1')
+
+
+def case_metrics(history, key):
+    """Row fields for a case terminal on the latest day: 7/30/90-day counts, entered flag."""
+    mask = history['cases'].get(key, 0)
+    out = {f't{w}': window_count(mask, w) for w in WINDOWS}
+    if entered(history, mask):
+        out['nw'] = 1
+    return out
+
+
+def exits(history):
+    """Cases that left terminal state in the last EXIT_DAYS days: [(key, days ago)]."""
+    out = []
+    for k, mask in history['cases'].items():
+        if mask & 1:
+            continue
+        ago = (mask & -mask).bit_length() - 2   # last terminal day was bit i, so it exited i-1 days ago
+        if ago < EXIT_DAYS:
+            out.append((k, ago))
+    return out
+
+
+def record(day, keys):
+    """Load, fold in today's snapshot, save; returns the updated history."""
+    history = update_history(load_history(), day, keys)
+    save_history(history)
+    came = sum(1 for m in history['cases'].values() if entered(history, m))
+    left = sum(1 for _, ago in exits(history) if ago == 0)
+    print(f'   Terminal history: {history["depth"]} day(s) to {history["day"]}, '
+          f'{came} entered / {left} left terminal state')
+    return history
@@ -0,0 +1,5 @@
+"""The modules under test live at the repo root, next to refresh.py."""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
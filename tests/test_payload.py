@@ -0,0 +1,59 @@
+import base64
+import json
+import math
+import struct
+
+import pytest
+
+import payload
+from payload import SERIES_NULLS, dumps_series, json_script
+
+COLUMNS = [('d', 'str'), ('y', 'i16'), ('m', 'u8'), ('n', 'i32'), ('q', 'f32')]
+
+
+def unpack(text):
+    """Decode a dumps_series payload back to {column: [values]} in row order."""
+    packed = json.loads(text)
+    buf = base64.b64decode(packed['buf'])
+    at = 4 * (len(packed['keys']) + 1)
+    cols = {}
+    for name, kind in packed['cols']:
+        code = {'u8': 'B', 'i16': 'h', 'i32': 'i', 'f32': 'f', 'str': 'H'}[kind]
+        cols[name] = list(struct.unpack_from(f'<{packed["rows"]}{code}', buf, at))
+        at += -(-packed['rows'] * struct.calcsize(code) // 4) * 4
+    return packed, cols
+
+
+def test_series_round_trip():
+    packed, cols = unpack(dumps_series({'12': [('2026-01-02', 2026, 1, 7, 1.5)], '3': [('2026-01-01', 2025, 12, 9, 2.0)]},
+                                       COLUMNS))
+    assert packed['keys'] == ['3', '12']
+    assert packed['dicts'] == {'d': ['2026-01-01', '2026-01-02']}
+    assert cols == {'d': [0, 1], 'y': [2025, 2026], 'm': [12, 1], 'n': [9, 7], 'q': [2.0, 1.5]}
+
+
+def test_series_none_uses_null_sentinels():
+    # csv_to_json turns empty cells into None; every column type must survive one
+    packed, cols = unpack(dumps_series({'1': [('2026-01-01', 2026, 1, 4, 1.0), (None, None, None, None, None)]}, COLUMNS))
+    assert packed['dicts'] == {'d': ['2026-01-01']}
+    assert math.isnan(cols['q'][1])
+    assert [cols[c][1] for c in ('d', 'y', 'm', 'n')] == [SERIES_NULLS[k] for k in ('str', 'i16', 'u8', 'i32')]
+    assert [cols[c][0] for c in ('d', 'y', 'm', 'n', 'q')] == [0, 2026, 1, 4, 1.0]
+
+
+def test_series_rejects_sentinel_values():
+    with pytest.raises(ValueError):
+        dumps_series({'1': [(255,)]}, [('m', 'u8')])
+
+
+def test_stamp_moves_with_embedded_blocks(tmp_path, monkeypatch):
+    # LK_BURN and friends have no data/*.jsonl mirror; a change to the block alone must move the stamp
+    monkeypatch.setattr(payload, 'DATA_DIR', tmp_path)
+    monkeypatch.setattr(payload, 'MANIFEST', tmp_path / 'MANIFEST.json')
+    page = lambda burn: f'<head>{json_script("LK_BURN", burn)}</head>'
+    assert payload.fingerprint(page('{"days":1}')) == payload.fingerprint(page('{"days":1}'))
+    assert payload.fingerprint(page('{"days":1}')) != payload.fingerprint(page('{"days":2}'))
+    stamp = payload.data_stamp(page('{"days":1}'))
+    assert payload.data_stamp(page('{"days":1}')) == stamp
+    payload.data_stamp(page('{"days":2}'))
+    assert json.loads((tmp_path / 'MANIFEST.json').read_text())['fingerprint'] == payload.fingerprint(page('{"days":2}'))
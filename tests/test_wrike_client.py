@@ -0,0 +1,55 @@
+import pytest
+
+import wrike_client
+import wrike_mock
+from wrike_client import WrikeClient
+
+
+@pytest.fixture
+def wrike(monkeypatch):
+    """Mock Wrike on a free port answering 20% of requests with 429 (Retry-After: 0)."""
+    monkeypatch.setattr(wrike_client, 'BACKOFF', 0.0)
+    monkeypatch.setattr(wrike_client, 'RETRIES', 8)
+    monkeypatch.setattr(wrike_mock.MockWrike, 'retry_after', '0')
+    monkeypatch.setattr(wrike_mock.MockWrike, 'stats', {'requests': 0, 'connections': 0, 'throttled': 0})
+    server = wrike_mock.serve(port=0, projects=250, throttle=0.2)
+    client = WrikeClient('test-token', api=f'http://127.0.0.1:{server.server_address[1]}/api/v4',
+                         proxy=None, rate_per_min=60000)
+    yield client, wrike_mock.MockWrike
+    client.close()
+    server.shutdown()
+    server.server_close()
+
+
+def test_folders_batches_every_id(wrike):
+    client, mock = wrike
+    ids = sorted(mock.data['projects'])
+    folders = client.folders(ids, fields=['customColumnIds'])
+    assert [f['id'] for f in folders] == ids   # 3 batches of <= 100, results in input order
+    assert folders[0]['customFields'] == mock.data['projects'][ids[0]]['customFields']
+
+
+def test_get_all_follows_pages(wrike):
+    client, mock = wrike
+    tasks = client.get_all('tasks', {'title': 'Facilities Services', 'pageSize': 40})
+    assert len(tasks) == len(mock.data['tasks']) == 500
+    assert {t['id'] for t in tasks} == set(mock.data['tasks'])
+
+
+def test_throttled_requests_are_retried(wrike):
+    client, mock = wrike
+    client.folders(sorted(mock.data['projects']))
+    client.get_all('tasks', {'title': 'Facilities Services', 'pageSize': 25})
+    assert mock.stats['throttled'] > 0
+    assert client.retries >= mock.stats['throttled']
+    assert client.requests == mock.stats['requests']
+    assert mock.stats['connections'] <= client.workers   # pooled keep-alive connections
+
+
+def test_client_errors_are_not_retried(wrike, monkeypatch):
+    client, mock = wrike
+    monkeypatch.setattr(mock, 'throttle', 0.0)
+    client.headers = {'Accept': 'application/json'}   # no bearer token: 401
+    with pytest.raises(wrike_client.WrikeError, match='HTTP 401'):
+        client.get('workflows')
+    assert client.retries == 0
@@ -0,0 +1,85 @@
+"""JS builder for per-tab filter state in the URL hash.
+
+The TnT page already round-trips its filters through the hash
+(decodeStateFromURL / encodeStateToURL, used by share.sh links). The tabs
+add their own state next to it under a prefix (w.fm=..., lk.ban=...), push
+a history entry per filter change, and re-apply it on back/forward. With
+the result caches, stepping through history is served from memory.
+"""
+
+
+def build_url_state_js():
+    """Return the UrlState class and the URL_STATE instance (needs canonicalState)."""
+    return '''
+    // ── Tab filter state in the URL hash ──────────────────────────
+    // URL_STATE.register('w', { read: () => state, apply: state => {...}, ready: () => wtwInitialized, tab: 'wtw' })
+    // URL_STATE.read('w')   → that tab's state from the current hash ({} if none)
+    // URL_STATE.save('w')   after a filter change: pushState, or replaceState if only the search text (q) moved
+    // Back/forward re-applies every initialized tab; a shared link opens the first tab it carries state for.
+    class UrlState {
+        constructor() {
+            this.tabs = {};
+            this.applying = false;
+            window.addEventListener('popstate', () => this.restore());
+        }
+
+        register(prefix, handlers) {
+            this.tabs[prefix] = handlers;
+        }
+
+        params() {
+            return new URLSearchParams(location.hash.slice(1));
+        }
+
+        read(prefix, params = this.params()) {
+            const out = {};
+            params.forEach((v, k) => { if (k.startsWith(prefix + '.')) out[k.slice(prefix.length + 1)] = v; });
+            return out;
+        }
+
+        save(prefix) {
+            if (this.applying) return;
+            const state = this.tabs[prefix].read();
+            const params = this.params();
+            const prev = this.read(prefix, params);
+            if (canonicalState(state) === canonicalState(prev)) return;
+            [...params.keys()].filter(k => k.startsWith(prefix + '.')).forEach(k => params.delete(k));
+            Object.keys(state).sort().forEach(k => {
+                if (state[k] !== '' && state[k] != null && state[k] !== false) params.set(prefix + '.' + k, state[k]);
+            });
+            const textOnly = canonicalState({ ...state, q: '' }) === canonicalState({ ...prev, q: '' });
+            const hash = params.toString();
+            const url = location.pathname + location.search + (hash ? '#' + hash : '');
+            if (textOnly) history.replaceState(history.state, '', url);
+            else history.pushState(null, '', url);
+        }
+
+        restore() {
+            const params = this.params();
+            this.applying = true;
+            try {
+                Object.entries(this.tabs).forEach(([prefix, h]) => {
+                    if (h.ready()) h.apply(this.read(prefix, params));
+                });
+            } finally {
+                this.applying = false;
+            }
+        }
+
+        // Select a value even if the cascade has not offered it yet (the next cascade validates it)
+        static setSelect(id, value) {
+            const sel = document.getElementById(id);
+            if (!sel) return;
+            value = value || '';
+            if (value && ![...sel.options].some(o => o.value === value)) sel.add(new Option(value, value));
+            sel.value = value;
+        }
+    }
+
+    const URL_STATE = new UrlState();
+    window.addEventListener('load', () => {
+        const params = URL_STATE.params();
+        const shared = Object.entries(URL_STATE.tabs).find(([prefix]) => Object.keys(URL_STATE.read(prefix, params)).length);
+        if (shared && typeof switchTab === 'function') switchTab(shared[1].tab);
+    });
+'''
@@ -0,0 +1,202 @@
+"""JS builder for the shared virtualized table used by every tab.
+
+Only the rows inside the scroll window (plus a small overscan) exist in the
+DOM. Two spacer rows stand in for everything above and below, row nodes are
+recycled as the window moves, and expanded detail rows are measured so the
+spacers stay exact. Headers stay put via the existing sticky <thead>.
+"""
+
+
+def build_virtual_table_js():
+    """Return the VirtualTable class (no dependencies, plain ES6)."""
+    return '''
+    // ── Virtualized table ─────────────────────────────────────────
+    // new VirtualTable(tbody, {
+    //   colspan: 10,                        // columns (for spacer/detail rows)
+    //   row: (r, i) => '<td>..</td>...',     // cell HTML for a data row
+    //   rowClass: (r, i) => 'hover:bg-..',   // className for the <tr>
+    //   onClick: (r, i, event) => {},        // row click (delegated)
+    //   isOpen: r => bool,                  // row has its detail expanded
+    //   detail: (r, i) => '<tr>..</tr>',     // detail row(s) HTML when open; several <tr>s move and measure as one item
+    //   key: r => r.s,                      // identity for detail height cache
+    //   rowHeight: 36, overscan: 8          // estimate (re-measured), extra rows
+    // })
+    // vt.setRows(rows) — new data/sort (scrolls to top); vt.refresh() — same rows, redraw
+    class VirtualTable {
+        constructor(tbody, opts) {
+            this.tbody = typeof tbody === 'string' ? document.getElementById(tbody) : tbody;
+            this.opts = Object.assign({ rowHeight: 36, overscan: 8, detailHeight: 320,
+                rowClass: () => '', isOpen: () => false, key: r => r }, opts);
+            this.rowHeight = this.opts.rowHeight;
+            this.rows = [];
+            this.items = [];            // [rowIndex, isDetail]
+            this.offsets = new Float64Array(1);
+            this.detailHeights = new Map();
+            this.live = new Map();      // item index → <tr> currently showing it
+            this.pool = [];             // detached <tr>s ready for reuse
+            this.measured = false;
+            this.pending = false;
+
+            this.top = this.spacer();
+            this.bottom = this.spacer();
+            this.tbody.textContent = '';
+            this.tbody.append(this.top, this.bottom);
+
+            this.scroller = this.findScroller();
+            const target = this.scroller === document.scrollingElement ? window : this.scroller;
+            target.addEventListener('scroll', () => this.schedule(), { passive: true });
+            if (window.ResizeObserver) new ResizeObserver(() => this.schedule()).observe(this.scroller);
+            this.tbody.addEventListener('click', e => {
+                const tr = e.target.closest('tr');
+                if (!tr || !this.opts.onClick || tr.dataset.vi === undefined || !this.tbody.contains(tr)) return;
+                const [ri, isDetail] = this.items[+tr.dataset.vi] || [];
+                if (ri !== undefined && !isDetail) this.opts.onClick(this.rows[ri], ri, e);
+            });
+        }
+
+        spacer() {
+            const tr = document.createElement('tr');
+            tr.setAttribute('aria-hidden', 'true');
+            tr.innerHTML = `<td colspan="${this.opts.colspan || 1}" style="padding:0;border:0;height:0"></td>`;
+            return tr;
+        }
+
+        findScroller() {
+            for (let el = this.tbody.parentElement; el && el !== document.body; el = el.parentElement) {
+                const oy = getComputedStyle(el).overflowY;
+                if (oy === 'auto' || oy === 'scroll') return el;
+            }
+            return document.scrollingElement;
+        }
+
+        setRows(rows) {
+            this.rows = rows;
+            if (this.scroller !== document.scrollingElement) this.scroller.scrollTop = 0;
+            this.refresh();
+        }
+
+        // Rebuild the item list (detail rows may have opened/closed) and redraw everything
+        refresh() {
+            this.items = [];
+            for (let i = 0; i < this.rows.length; i++) {
+                this.items.push([i, false]);
+                if (this.opts.detail && this.opts.isOpen(this.rows[i])) this.items.push([i, true]);
+            }
+            this.live.forEach(tr => this.release(tr));
+            this.live.clear();
+            this.layout();
+            this.render();
+        }
+
+        heightOf(item) {
+            if (!item[1]) return this.rowHeight;
+            const h = this.detailHeights.get(this.opts.key(this.rows[item[0]]));
+            return h === undefined ? this.opts.detailHeight : h;
+        }
+
+        layout() {
+            const n = this.items.length;
+            this.offsets = new Float64Array(n + 1);
+            for (let k = 0; k < n; k++) this.offsets[k + 1] = this.offsets[k] + this.heightOf(this.items[k]);
+        }
+
+        // First item whose bottom edge is below y
+        indexAt(y) {
+            let lo = 0, hi = this.items.length;
+            while (lo < hi) {
+                const mid = (lo + hi) >> 1;
+                if (this.offsets[mid + 1] <= y) lo = mid + 1;
+                else hi = mid;
+            }
+            return lo;
+        }
+
+        schedule() {
+            if (this.pending) return;
+            this.pending = true;
+            requestAnimationFrame(() => { this.pending = false; this.render(); });
+        }
+
+        release(tr) {
+            tr.remove();
+            if (tr.rest) tr.rest.forEach(x => x.remove());
+            else if (!tr.dataset.detail) this.pool.push(tr);
+        }
+
+        render() {
+            const sc = this.scroller;
+            const view = sc === document.scrollingElement ? window.innerHeight : sc.clientHeight;
+            let start = 0, end = Math.min(this.items.length, 50);
+            if (view > 0) {
+                const origin = this.top.getBoundingClientRect().top
+                    - (sc === document.scrollingElement ? 0 : sc.getBoundingClientRect().top);
+                const y0 = Math.max(0, -origin);
+                start = Math.max(0, this.indexAt(y0) - this.opts.overscan);
+                end = Math.min(this.items.length, this.indexAt(y0 + view) + 1 + this.opts.overscan);
+            }
+
+            this.live.forEach((tr, k) => {
+                if (k < start || k >= end) { this.release(tr); this.live.delete(k); }
+            });
+            let prev = this.top;
+            for (let k = start; k < end; k++) {
+                let tr = this.live.get(k);
+                if (!tr) {
+                    tr = this.draw(k);
+                    this.live.set(k, tr);
+                }
+                if (prev.nextSibling !== tr) prev.after(tr, ...(tr.rest || []));
+                prev = tr.rest && tr.rest.length ? tr.rest[tr.rest.length - 1] : tr;
+            }
+            this.top.firstChild.style.height = this.offsets[start] + 'px';
+            this.bottom.firstChild.style.height = (this.offsets[this.items.length] - this.offsets[end]) + 'px';
+            if (view > 0) this.measure(start, end);
+        }
+
+        draw(k) {
+            const [ri, isDetail] = this.items[k];
+            const r = this.rows[ri];
+            let tr;
+            if (isDetail) {
+                const tmp = document.createElement('tbody');
+                tmp.innerHTML = this.opts.detail(r, ri);
+                const trs = Array.from(tmp.children);
+                tr = trs.shift() || this.spacer();
+                tr.dataset.detail = '1';
+                tr.rest = trs;          // further detail rows ride along with the first
+                trs.forEach(x => { x.dataset.detail = '1'; x.dataset.vi = k; });
+            } else {
+                tr = this.pool.pop() || document.createElement('tr');
+                tr.className = this.opts.rowClass(r, ri);
+                tr.innerHTML = this.opts.row(r, ri);
+            }
+            tr.dataset.vi = k;
+            return tr;
+        }
+
+        // Re-measure row height (mean of drawn rows) and detail heights; re-layout if they moved
+        measure(start, end) {
+            let sum = 0, n = 0, changed = false;
+            for (let k = start; k < end; k++) {
+                const tr = this.live.get(k);
+                const h = tr.rest ? tr.rest.reduce((s, x) => s + x.offsetHeight, tr.offsetHeight) : tr.offsetHeight;
+                if (!h) continue;
+                if (this.items[k][1]) {
+                    const key = this.opts.key(this.rows[this.items[k][0]]);
+                    if (this.detailHeights.get(key) !== h) { this.detailHeights.set(key, h); changed = true; }
+                } else { sum += h; n++; }
+            }
+            if (n && Math.abs(sum / n - this.rowHeight) > 0.5) {
+                this.rowHeight = sum / n;
+                changed = true;
+            }
+            if (changed) {
+                this.layout();
+                if (!this.measured) { this.measured = true; this.render(); return; }
+                this.top.firstChild.style.height = this.offsets[start] + 'px';
+                this.bottom.firstChild.style.height = (this.offsets[this.items.length] - this.offsets[end]) + 'px';
+            }
+            this.measured = true;
+        }
+    }
+'''
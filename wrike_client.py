@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""Wrike API v4 client for build_projects.py.
+
+One process, one small pool of keep-alive connections (tunnelled through
+the corporate proxy), instead of a curl subprocess per request. Batches
+run concurrently; a shared scheduler spaces request starts to stay under
+Wrike's per-user rate limit, and 429 / 5xx / dropped connections are
+retried with backoff (honouring Retry-After). Workflow statuses are
+fetched once per client and shared by every pull.
+
+Point it at wrike_mock.py for a dry run:
+    WRIKE_API=http://127.0.0.1:8766/api/v4 WRIKE_PROXY= python3 build_projects.py
+"""
+import http.client
+import json
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlencode, urlsplit
+
+API = os.environ.get('WRIKE_API', 'https://www.wrike.com/api/v4')
+PROXY = os.environ.get('WRIKE_PROXY', 'http://sysproxy.wal-mart.com:8080')
+
+WORKERS = 4             # concurrent requests (and pooled connections)
+RATE_PER_MIN = 300      # Wrike allows ~400/min per user; keep headroom
+BURST = 20              # requests that may start back to back before spacing kicks in
+TIMEOUT = 60
+RETRIES = 4
+BACKOFF = 1.0           # seconds, doubled per attempt
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class WrikeError(Exception):
+    pass
+
+
+class WrikeClient:
+    """GET-only Wrike client: pooled connections, rate-limited, retried."""
+
+    def __init__(self, token, api=API, proxy=PROXY, workers=WORKERS, rate_per_min=RATE_PER_MIN):
+        base = urlsplit(api)
+        self.scheme, self.host, self.port = base.scheme, base.hostname, base.port
+        self.prefix = base.path.rstrip('/')
+        self.proxy = urlsplit(proxy) if proxy else None
+        self.headers = {'Authorization': f'Bearer {token}', 'Accept': 'application/json'}
+        self.workers = workers
+        self.interval = 60.0 / rate_per_min
+        self.burst = BURST * self.interval
+        self._tat = 0.0   # theoretical arrival time of the next request (GCRA)
+        self._slot_lock = threading.Lock()
+        self._idle = queue.LifoQueue()
+        self._statuses = None
+        self._statuses_lock = threading.Lock()
+        self.requests = 0
+        self.retries = 0
+
+    @classmethod
+    def from_token_file(cls, path='.wrike_tokens.json', **kwargs):
+        with open(path) as f:
+            return cls(json.load(f)['access_token'], **kwargs)
+
+    # ── connections ──────────────────────────────────────────────
+    def _connect(self):
+        port = self.port or (443 if self.scheme == 'https' else 80)
+        conn_cls = http.client.HTTPSConnection if self.scheme == 'https' else http.client.HTTPConnection
+        if self.proxy:
+            conn = conn_cls(self.proxy.hostname, self.proxy.port or 8080, timeout=TIMEOUT)
+            conn.set_tunnel(self.host, port)
+        else:
+            conn = conn_cls(self.host, port, timeout=TIMEOUT)
+        return conn
+
+    def _checkout(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            return self._connect()
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+    # ── scheduling ───────────────────────────────────────────────
+    def _wait_for_slot(self):
+        """Rate limit shared by all threads: RATE_PER_MIN on average, up to BURST at once."""
+        with self._slot_lock:
+            now = time.monotonic()
+            tat = max(self._tat, now)
+            start = max(now, tat - self.burst)
+            self._tat = tat + self.interval
+        if start > now:
+            time.sleep(start - now)
+
+    def _hold_off(self, seconds):
+        """Push every thread's next request back after a 429."""
+        with self._slot_lock:
+            self._tat = max(self._tat, time.monotonic() + seconds + self.burst)
+
+    # ── requests ─────────────────────────────────────────────────
+    def get(self, path, params=None):
+        """GET <api>/<path>[?params] → parsed JSON. Raises WrikeError once retries run out."""
+        url = f'{self.prefix}/{path.lstrip("/")}'
+        if params:
+            url += '?' + urlencode({k: json.dumps(v) if isinstance(v, (list, dict)) else v for k, v in params.items()})
+        error = None
+        for attempt in range(RETRIES + 1):
+            if attempt:
+                self.retries += 1
+                time.sleep(BACKOFF * 2 ** (attempt - 1))
+            self._wait_for_slot()
+            conn = self._checkout()
+            try:
+                conn.request('GET', url, headers=self.headers)
+                resp = conn.getresponse()
+                body = resp.read()
+            except (OSError, http.client.HTTPException) as e:
+                conn.close()
+                error = f'{type(e).__name__}: {e}'
+                continue
+            self.requests += 1
+            if resp.will_close:
+                conn.close()
+            else:
+                self._idle.put(conn)
+            if resp.status == 200:
+                return json.loads(body)
+            error = f'HTTP {resp.status} {body[:200]!r}'
+            if resp.status not in RETRY_STATUSES:
+                break
+            if resp.status == 429:
+                self._hold_off(float(resp.getheader('Retry-After') or BACKOFF * 2 ** attempt))
+        raise WrikeError(f'GET {url}: {error}')
+
+    def get_many(self, requests):
+        """Run [(path, params), ...] concurrently; results in input order."""
+        if len(requests) <= 1:
+            return [self.get(path, params) for path, params in requests]
+        with ThreadPoolExecutor(min(self.workers, len(requests))) as pool:
+            return list(pool.map(lambda req: self.get(*req), requests))
+
+    def get_all(self, path, params=None):
+        """Every record of a paged list endpoint (tasks), following nextPageToken."""
+        params = dict(params or {})
+        records = []
+        while True:
+            page = self.get(path, params)
+            records.extend(page.get('data', []))
+            if not page.get('nextPageToken'):
+                return records
+            params['nextPageToken'] = page['nextPageToken']
+
+    def folders(self, ids, fields=None, batch=100):
+        """Folder / project records for ids, 100 per request, batches fetched concurrently."""
+        params = {'fields': fields} if fields else None
+        pages = self.get_many([('folders/' + ','.join(ids[i:i + batch]), params) for i in range(0, len(ids), batch)])
+        return [rec for page in pages for rec in page.get('data', [])]
+
+    def custom_statuses(self):
+        """{customStatusId: status record} across all workflows, fetched once per client."""
+        with self._statuses_lock:
+            if self._statuses is None:
+                self._statuses = {cs['id']: cs for wf in self.get('workflows').get('data', [])
+                                  for cs in wf.get('customStatuses', [])}
+            return self._statuses
+
+    def stats(self):
+        return f'{self.requests} requests, {self.retries} retries'
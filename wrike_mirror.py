@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""Local mirror of the Wrike data build_projects.py reads.
+
+wrike_mirror.json keeps the raw project folders (with their custom field
+values), the "Facilities Services" tasks and the workflow statuses. A sync
+only asks Wrike for what changed since the stored watermark:
+
+  - the root folder's childIds (1 request): new projects are fetched,
+    projects no longer under the root are dropped
+  - child folders with updatedDate >= watermark (1 request), re-fetched
+    with their custom fields in 100-id batches
+  - FS tasks with updatedDate >= watermark (usually 1 page)
+
+The watermark is the start time of the last successful sync, minus
+OVERLAP for clock skew and late writes. Every FULL_EVERY_DAYS (or with
+--full) the whole set is re-pulled and replaces the mirror, which also
+clears tasks that were deleted or renamed out of the title search.
+
+Usage:
+    python3 wrike_mirror.py          # incremental sync
+    python3 wrike_mirror.py --full   # full reconciliation
+"""
+import json
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from payload import atomic_write_text, dumps
+from wrike_client import WrikeClient
+
+MIRROR_FILE = Path(__file__).parent / 'wrike_mirror.json'
+TOKEN_FILE = Path(__file__).parent / '.wrike_tokens.json'
+
+ROOT_FOLDER = 'IEAFB7T7I5CT6NKV'        # North BU projects
+TASK_TITLE = 'Facilities Services'      # walk-off / pre-project forms
+FOLDER_FIELDS = ['customColumnIds']
+OVERLAP = timedelta(minutes=10)
+FULL_EVERY_DAYS = 7
+
+
+def _iso(dt):
+    return dt.strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def _parse(ts):
+    return datetime.strptime(ts, '%Y-%m-%dT%H:%M:%SZ').replace(tzinfo=timezone.utc)
+
+
+def load():
+    """{'watermark', 'full_at', 'statuses', 'children': root childIds, 'projects': {id: folder}, 'tasks': {id: task}}."""
+    try:
+        return json.loads(MIRROR_FILE.read_text(encoding='utf-8'))
+    except (OSError, json.JSONDecodeError):
+        return {'watermark': None, 'full_at': None, 'statuses': {}, 'children': [], 'projects': {}, 'tasks': {}}
+
+
+def save(mirror):
+    atomic_write_text(MIRROR_FILE, dumps(mirror) + '\n')
+
+
+def needs_full(mirror, now):
+    return (not mirror['watermark'] or not mirror['full_at']
+            or now - _parse(mirror['full_at']) >= timedelta(days=FULL_EVERY_DAYS))
+
+
+def sync(client, full=False):
+    """Bring the mirror up to date (incrementally unless full / due) and save it. Returns the mirror."""
+    mirror = load()
+    now = datetime.now(timezone.utc)
+    full = full or needs_full(mirror, now)
+    before = client.requests
+
+    children = client.get(f'folders/{ROOT_FOLDER}')['data'][0]['childIds']
+    mirror['statuses'] = {sid: {'name': cs.get('name', ''), 'group': cs.get('group', '')}
+                          for sid, cs in client.custom_statuses().items()}
+    task_params = {'title': TASK_TITLE, 'pageSize': 1000}
+    if full:
+        fetch = children
+    else:
+        since = {'start': _iso(_parse(mirror['watermark']) - OVERLAP)}
+        changed = client.get(f'folders/{ROOT_FOLDER}/folders', {'descendants': 'false', 'updatedDate': since})
+        child_set = set(children)
+        fetch = sorted({f['id'] for f in changed.get('data', []) if f['id'] in child_set}
+                       | (child_set - set(mirror['projects'])))
+        task_params['updatedDate'] = since
+
+    fetched = {p['id']: p for p in client.folders(fetch, fields=FOLDER_FIELDS)}
+    tasks = {t['id']: t for t in client.get_all('tasks', task_params)}
+    if full:
+        mirror['projects'], mirror['tasks'] = fetched, tasks
+        mirror['full_at'] = _iso(now)
+    else:
+        keep = set(children)
+        mirror['projects'] = {pid: p for pid, p in {**mirror['projects'], **fetched}.items() if pid in keep}
+        mirror['tasks'].update(tasks)
+    mirror['children'] = children
+    mirror['watermark'] = _iso(now)
+    save(mirror)
+    print(f'  Wrike mirror: {"full" if full else "incremental"} sync, {len(fetched)} projects / {len(tasks)} tasks '
+          f'updated ({len(mirror["projects"])} / {len(mirror["tasks"])} mirrored), {client.requests - before} requests')
+    return mirror
+
+
+def main():
+    client = WrikeClient.from_token_file(TOKEN_FILE)
+    try:
+        sync(client, full='--full' in sys.argv)
+    finally:
+        client.close()
+
+
+if __name__ == '__main__':
+    main()
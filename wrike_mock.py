@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""Local stand-in for the Wrike API v4, for dry runs of the Wrike pulls.
+
+Serves the endpoints build_projects.py uses (folders, workflows, tasks,
+updatedDate filters, task paging) from generated data, over keep-alive
+HTTP/1.1, with optional latency and injected 429s so pooling,
+concurrency, retries and the incremental mirror sync can be exercised
+without a token or the proxy. GET /_stats returns request and connection
+counts; GET /_touch?n=5 marks n projects and n tasks as just updated.
+
+Usage:
+    python3 wrike_mock.py [--port 8766] [--projects 400] [--latency 0.05] [--throttle 0.05]
+    WRIKE_API=http://127.0.0.1:8766/api/v4 WRIKE_PROXY= python3 build_projects.py
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+ROOT_FOLDER = 'IEAFB7T7I5CT6NKV'   # wrike_mirror.ROOT_FOLDER
+STATUSES = [('IEAFMOCKJMAAAAA1', 'Active', 'Active'), ('IEAFMOCKJMAAAAA2', 'In Construction', 'Active'),
+            ('IEAFMOCKJMAAAAA3', 'Completed', 'Completed'), ('IEAFMOCKJMAAAAA4', 'On Hold', 'Deferred')]
+
+
+def iso(dt):
+    return dt.strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def make_data(n_projects, seed=7):
+    """Projects under ROOT_FOLDER plus FS walk-off / pre-project tasks, one per store."""
+    rnd = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    projects, tasks = {}, {}
+    for i in range(n_projects):
+        pid, store = f'IEAFMOCKI{i:07d}', str(rnd.randint(2, 9999))
+        projects[pid] = {
+            'id': pid, 'title': f'{store} - {"ZERO EMISSIONS" if i % 9 == 0 else "HVAC REPLACEMENT"}',
+            'updatedDate': iso(now - timedelta(hours=rnd.randint(1, 24 * 90))),
+            'project': {'customStatusId': rnd.choice(STATUSES)[0], 'startDate': '2026-03-01', 'endDate': '2026-11-30'},
+            'customFields': [
+                {'id': 'IEAFB7T7JUADF3LD', 'value': store},
+                {'id': 'IEAFB7T7JUADF3LS', 'value': f'PM {i}'},
+                {'id': 'IEAFB7T7JUADF3LT', 'value': f'555-01{i % 100:02d}'},
+                {'id': 'IEAFB7T7JUADF3LV', 'value': f'MCM {i % 40}'},
+            ],
+        }
+        for kind in ('FS Walk-Off Report', 'Rack Verification Pre-Project Form'):
+            tid = f'IEAFMOCKK{len(tasks):07d}'
+            tasks[tid] = {
+                'id': tid, 'title': f'Facilities Services {kind} [{store}]',
+                'status': 'Active', 'customStatusId': rnd.choice(STATUSES)[0],
+                'updatedDate': iso(now - timedelta(hours=rnd.randint(1, 24 * 90))),
+                'dates': {'due': '2026-12-01'}, 'completedDate': '',
+                'permalink': f'https://www.wrike.com/open.htm?id={i}',
+            }
+    root = {'id': ROOT_FOLDER, 'title': 'North BU Projects', 'childIds': sorted(projects)}
+    return {'root': root, 'projects': projects, 'tasks': tasks}
+
+
+class MockWrike(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'   # keep-alive, so client pooling is visible in /_stats
+    data = None
+    latency = 0.0
+    throttle = 0.0
+    retry_after = '1'   # seconds sent with each injected 429
+    stats = {'requests': 0, 'connections': 0, 'throttled': 0}
+    lock = threading.Lock()
+
+    def setup(self):
+        super().setup()
+        with self.lock:
+            self.stats['connections'] += 1
+
+    def send_json(self, status, obj, headers=None):
+        body = json.dumps(obj).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        parts = url.path.strip('/').split('/')
+        if parts == ['_stats']:
+            return self.send_json(200, self.stats)
+        if parts == ['_touch']:
+            return self.send_json(200, self.touch(int(query.get('n', 5))))
+        with self.lock:
+            self.stats['requests'] += 1
+            throttled = random.random() < self.throttle
+            if throttled:
+                self.stats['throttled'] += 1
+        time.sleep(self.latency)
+        if throttled:
+            return self.send_json(429, {'error': 'rate_limit_exceeded'}, {'Retry-After': self.retry_after})
+        if not self.headers.get('Authorization', '').startswith('Bearer '):
+            return self.send_json(401, {'error': 'not_authorized'})
+        if parts[:2] != ['api', 'v4'] or len(parts) < 3:
+            return self.send_json(404, {'error': 'not_found'})
+        resource = parts[2]
+        if resource == 'workflows':
+            statuses = [{'id': sid, 'name': name, 'group': group} for sid, name, group in STATUSES]
+            return self.send_json(200, {'kind': 'workflows', 'data': [{'id': 'IEAFMOCKK4AAAAA1', 'customStatuses': statuses}]})
+        since = json.loads(query['updatedDate'])['start'] if 'updatedDate' in query else ''
+        if resource == 'folders' and parts[4:] == ['folders'] and parts[3] == ROOT_FOLDER:
+            rows = [{'id': p['id'], 'title': p['title'], 'updatedDate': p['updatedDate']}
+                    for p in self.data['projects'].values() if p['updatedDate'] >= since]
+            return self.send_json(200, {'kind': 'folderTree', 'data': rows})
+        if resource == 'folders' and len(parts) == 4:
+            ids = parts[3].split(',')
+            if len(ids) > 100:
+                return self.send_json(400, {'error': 'invalid_parameter', 'errorDescription': 'too many ids'})
+            out = [self.data['root'] if fid == ROOT_FOLDER else self.data['projects'][fid]
+                   for fid in ids if fid == ROOT_FOLDER or fid in self.data['projects']]
+            return self.send_json(200, {'kind': 'folders', 'data': out})
+        if resource == 'tasks':
+            rows = [t for t in self.data['tasks'].values()
+                    if query.get('title', '') in t['title'] and t['updatedDate'] >= since]
+            start, size = int(query.get('nextPageToken', 0)), int(query.get('pageSize', 100))
+            page = {'kind': 'tasks', 'data': rows[start:start + size]}
+            if start + size < len(rows):
+                page['nextPageToken'] = str(start + size)
+            return self.send_json(200, page)
+        return self.send_json(404, {'error': 'not_found'})
+
+    @classmethod
+    def touch(cls, n):
+        """Simulate a day's edits: n projects get a new PM, n tasks a new status, both stamped now."""
+        now = iso(datetime.now(timezone.utc))
+        with cls.lock:
+            projects = random.sample(sorted(cls.data['projects']), min(n, len(cls.data['projects'])))
+            tasks = random.sample(sorted(cls.data['tasks']), min(n, len(cls.data['tasks'])))
+            for pid in projects:
+                p = cls.data['projects'][pid]
+                p['updatedDate'] = now
+                p['customFields'][1]['value'] = f'PM {pid[-4:]} (edited)'
+            for tid in tasks:
+                t = cls.data['tasks'][tid]
+                t['updatedDate'] = now
+                t['customStatusId'] = random.choice(STATUSES)[0]
+        return {'projects': projects, 'tasks': tasks}
+
+    def log_message(self, *a):
+        pass
+
+
+def serve(port=8766, projects=400, latency=0.0, throttle=0.0):
+    """Start the mock in a background thread; returns the server (call .shutdown() to stop)."""
+    MockWrike.data = make_data(projects)
+    MockWrike.latency, MockWrike.throttle = latency, throttle
+    server = ThreadingHTTPServer(('127.0.0.1', port), MockWrike)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    ap.add_argument('--port', type=int, default=8766)
+    ap.add_argument('--projects', type=int, default=400)
+    ap.add_argument('--latency', type=float, default=0.05, help='seconds added to every response')
+    ap.add_argument('--throttle', type=float, default=0.0, help='fraction of requests answered 429')
+    args = ap.parse_args()
+    server = serve(args.port, args.projects, args.latency, args.throttle)
+    print(f'Mock Wrike on http://127.0.0.1:{args.port}/api/v4 ({args.projects} projects), Ctrl-C to stop')
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()